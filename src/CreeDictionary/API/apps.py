@@ -3,8 +3,6 @@ import os
 
 from django.apps import AppConfig
 
-from CreeDictionary import cvd
-
 logger = logging.getLogger(__name__)
 
 
@@ -31,12 +29,6 @@ class APIConfig(AppConfig):
             self.perform_time_consuming_initializations()
 
     def perform_time_consuming_initializations(self):
-        from CreeDictionary.API.search import affix
-        from morphodict.lexicon.models import wordform_cache
-
-        logger.debug("preloading caches")
-        affix.cache.preload()
-        wordform_cache.preload()
-        cvd.preload_models()
+        from CreeDictionary.API import preload
 
-        logger.debug("done")
+        preload.preload()
@@ -0,0 +1,181 @@
+"""
+Loading everything read-only before web server workers are forked
+
+uWSGI loads wsgi.py once, in its master process, and then forks the workers
+(unless `lazy-apps` is set). A forked worker shares the master’s memory pages
+until it writes to them. Everything loaded before the fork is loaded once
+instead of once per worker, and takes up memory once instead of once per
+worker.
+
+preload() loads every structure that doesn’t change once loaded, and logs how
+long each took and how much resident memory it added. prepare_to_fork() then
+closes the database connections, which must not be shared between processes.
+It also moves every object loaded so far into the garbage collector’s
+permanent generation, so that collections in the workers don’t write to their
+headers and unshare their pages.
+
+Touching a Python object still writes its reference count, so pages of small
+objects get unshared bit by bit as workers use them. That is why the big
+search indexes are memory-mapped files instead of dicts: those pages are only
+ever read.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PreloadReport:
+    name: str
+    seconds: float
+    # None where the resident set size can’t be read
+    resident_bytes: Optional[int]
+    ok: bool = True
+
+
+def _preloaders() -> list[tuple[str, Callable[[], object]]]:
+    from morphodict import analysis
+    from morphodict.lexicon.models import wordform_cache
+    from CreeDictionary import cvd
+    from CreeDictionary.API.search import (
+        affix,
+        fuzzy,
+        infix,
+        keyword_index,
+        presentation,
+        surface_forms,
+    )
+    from CreeDictionary.CreeDictionary.paradigm.generation import (
+        default_paradigm_manager,
+    )
+    from CreeDictionary.CreeDictionary.relabelling import read_labels
+    from CreeDictionary.phrase_translate import translate
+
+    ret = [
+        ("morpheme rankings", wordform_cache.preload),
+        ("relabellings", read_labels),
+        ("affix indexes", affix.cache.preload),
+        ("English keyword index", keyword_index.preload),
+        ("surface form index", surface_forms.preload),
+        ("fuzzy lemma index", fuzzy.preload),
+    ]
+    if settings.INFIX_SEARCH:
+        ret.append(("infix indexes", infix.preload))
+    ret += [
+        (
+            "analyzers",
+            lambda: (analysis.strict_analyzer(), analysis.relaxed_analyzer()),
+        ),
+        ("paradigm layouts and generator", default_paradigm_manager),
+        (
+            "phrase translation FSTs",
+            lambda: (
+                translate.eng_noun_entry_to_inflected_phrase_fst(),
+                translate.eng_verb_entry_to_inflected_phrase_fst(),
+                translate.eng_phrase_to_crk_features_fst(),
+            ),
+        ),
+        ("preverb table", presentation.preload),
+        ("definition vectors", cvd.preload_models),
+    ]
+    return ret
+
+
+def preload(
+    preloaders: Optional[Iterable[tuple[str, Callable[[], object]]]] = None
+) -> list[PreloadReport]:
+    """
+    Load every read-only structure that would otherwise be loaded on first use
+
+    Something that fails to load is logged and skipped; it will be tried
+    again, and fail properly, when it is first used.
+    """
+    if preloaders is None:
+        preloaders = _preloaders()
+
+    reports = []
+    for name, load in preloaders:
+        resident_before = _resident_bytes()
+        start = time.perf_counter()
+        ok = True
+        try:
+            load()
+        except Exception:
+            logger.exception("Could not preload %s", name)
+            ok = False
+        seconds = time.perf_counter() - start
+        resident_after = _resident_bytes()
+
+        report = PreloadReport(
+            name,
+            seconds,
+            None
+            if resident_before is None or resident_after is None
+            else resident_after - resident_before,
+            ok,
+        )
+        logger.info("Preloaded %s", describe(report))
+        reports.append(report)
+
+    logger.info(
+        "Preloaded everything in %.2f s; %s resident",
+        sum(r.seconds for r in reports),
+        _mebibytes(_resident_bytes()),
+    )
+    return reports
+
+
+def prepare_to_fork():
+    """
+    Call in the uWSGI master process once preloading is done
+
+    Does no harm in a process that never forks.
+    """
+    # Each worker opens its own connections as it needs them
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+
+
+def describe(report: PreloadReport) -> str:
+    """
+    >>> describe(PreloadReport("morpheme rankings", 0.1234, 3 * 1024 * 1024))
+    'morpheme rankings in 0.12 s, +3.0 MiB resident'
+    >>> describe(PreloadReport("vectors", 2, None, ok=False))
+    'vectors (failed) in 2.00 s, ? MiB resident'
+    """
+    failed = "" if report.ok else " (failed)"
+    if report.resident_bytes is None:
+        resident = "? MiB"
+    else:
+        resident = f"{report.resident_bytes / 1024 / 1024:+.1f} MiB"
+    return f"{report.name}{failed} in {report.seconds:.2f} s, {resident} resident"
+
+
+def _mebibytes(n: Optional[int]) -> str:
+    if n is None:
+        return "? MiB"
+    return f"{n / 1024 / 1024:.1f} MiB"
+
+
+def _resident_bytes() -> Optional[int]:
+    """
+    The resident set size of this process, on Linux
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
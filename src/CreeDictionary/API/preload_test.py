@@ -0,0 +1,24 @@
+from .preload import preload
+
+
+def test_preload_reports_each_structure():
+    loaded = []
+
+    def fail():
+        raise FileNotFoundError("no such FST")
+
+    reports = preload(
+        [
+            ("rankings", lambda: loaded.append("rankings")),
+            ("analyzer", fail),
+            ("index", lambda: loaded.append("index")),
+        ]
+    )
+
+    assert loaded == ["rankings", "index"]
+    assert [(r.name, r.ok) for r in reports] == [
+        ("rankings", True),
+        ("analyzer", False),
+        ("index", True),
+    ]
+    assert all(r.seconds >= 0 for r in reports)
@@ -1,4 +1,9 @@
-from .runner import search
+from typing import Iterable
+
+# runner has to be imported first: core imports it indirectly, through query
+from .runner import search, search_many
+from .core import SerializedResultPage
+from .presentation import prefetch_for_serialization
 
 
 def search_with_affixes(query: str, include_auto_definitions=False):
@@ -25,3 +30,35 @@ def simple_search(query: str, include_auto_definitions=False):
         include_affixes=False,
         include_auto_definitions=include_auto_definitions,
     ).serialized_presentation_results()
+
+
+def simple_search_many(
+    queries: Iterable[str], *, page_size: int, include_auto_definitions=False
+) -> dict[str, SerializedResultPage]:
+    """
+    Like simple_search(), but for many queries at once, returning the first page
+    of results for each query.
+
+    Shares as much work as possible between the queries; see search_many().
+    """
+    search_runs = search_many(
+        queries=queries,
+        include_affixes=False,
+        include_auto_definitions=include_auto_definitions,
+    )
+    unique_runs = {id(run): run for run in search_runs.values()}
+
+    prefetched = prefetch_for_serialization(
+        [
+            result
+            for run in unique_runs.values()
+            for result in run.top_results(page_size)
+        ]
+    )
+    pages = {
+        run_id: run.serialized_presentation_results_page(
+            1, page_size, prefetched=prefetched
+        )
+        for run_id, run in unique_runs.items()
+    }
+    return {query: pages[id(run)] for query, run in search_runs.items()}
@@ -7,26 +7,60 @@ This was originally intended to suggest compound words, so that searching for
 But the current implementation, developed as a step towards that, is more like
 tab-completion. It uses tries to expand queries, so that searching for ‘snowm’
 also returns results for ‘snowmobile’
+
+Building the tries means reading every lemma and English keyword from the
+database, which used to happen in every web server process when it started.
+Instead, `manage.py buildsearchindexes` writes them to memory-mapped index
+files, which processes open almost instantly and share with each other. Until
+the files have been written for the current import, searches fall back to
+querying the database, which is slower and only matches affixes as spelled.
+
+Short affixes can match thousands of words. Each wordform in the index files
+has a weight, from how common it is and how long it is, so that only the best
+few matches are looked at and fetched from the database.
 """
 
+import heapq
+import logging
+import math
 from collections import defaultdict
-from functools import cached_property
+from functools import partial
 from itertools import chain
-from typing import Dict, Iterable, List, NewType, Tuple
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NewType,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import dawg
 from django.conf import settings
+from django.db.models import Q, QuerySet
 
-from morphodict.lexicon.models import Wordform, TargetLanguageKeyword
-from CreeDictionary.utils import get_modified_distance
+from morphodict.lexicon.generation import PerGeneration
+from morphodict.lexicon.id_index import IdIndex, IdIndexError, write_id_index
+from morphodict.lexicon.models import Wordform, TargetLanguageKeyword, wordform_cache
+from CreeDictionary.CreeDictionary.paradigm.crkeng_corpus_frequency import (
+    wordform_frequencies,
+)
+from CreeDictionary.utils import get_modified_distances_to
 from CreeDictionary.utils.cree_lev_dist import remove_cree_diacritics
 from morphodict.lexicon.util import to_source_language_keyword
+from .index_files import search_index_path
 from .types import (
     InternalForm,
     Result,
 )
 from . import core
 
+logger = logging.getLogger(__name__)
+
 # A simplified form intended to be used within the affix search trie.
 SimplifiedForm = NewType("SimplifiedForm", str)
 
@@ -34,10 +68,18 @@ SimplifiedForm = NewType("SimplifiedForm", str)
 class AffixSearcher:
     """
     Enables prefix and suffix searches given a list of words and their wordform IDs.
+
+    The best matches, as returned when searching with k, are the ones with the
+    highest weights; see affix_weight().
     """
 
-    def __init__(self, words: Iterable[Tuple[str, int]]):
+    def __init__(
+        self,
+        words: Iterable[Tuple[str, int]],
+        weights: Optional[Mapping[int, float]] = None,
+    ):
         self.text_to_ids: Dict[str, List[int]] = defaultdict(list)
+        self._weights = weights or {}
 
         words_marked_for_indexing = [
             (simplified_text, wordform_id)
@@ -55,22 +97,37 @@ class AffixSearcher:
             [_reverse(text) for text, _ in words_marked_for_indexing]
         )
 
-    def search_by_prefix(self, prefix: str) -> Iterable[int]:
+    def search_by_prefix(self, prefix: str, k: Optional[int] = None) -> Iterable[int]:
         """
-        :return: an iterable of Wordform IDs that match the prefix
+        :return: an iterable of Wordform IDs that match the prefix, or only
+            the best k of them
         """
         term = self.to_simplified_form(prefix)
         matched_words = self._prefixes.keys(term)
-        return chain.from_iterable(self.text_to_ids[t] for t in matched_words)
+        return self._best(
+            chain.from_iterable(self.text_to_ids[t] for t in matched_words), k
+        )
 
-    def search_by_suffix(self, suffix: str) -> Iterable[int]:
+    def search_by_suffix(self, suffix: str, k: Optional[int] = None) -> Iterable[int]:
         """
-        :return: an iterable of Wordform IDs that match the suffix
+        :return: an iterable of Wordform IDs that match the suffix, or only
+            the best k of them
         """
         term = self.to_simplified_form(suffix)
         matched_reversed_words = self._suffixes.keys(_reverse(term))
-        return chain.from_iterable(
-            self.text_to_ids[_reverse(t)] for t in matched_reversed_words
+        return self._best(
+            chain.from_iterable(
+                self.text_to_ids[_reverse(t)] for t in matched_reversed_words
+            ),
+            k,
+        )
+
+    def _best(self, wordform_ids: Iterable[int], k: Optional[int]) -> Iterable[int]:
+        # Unlike MappedAffixSearcher, this still looks at every match.
+        if k is None:
+            return wordform_ids
+        return heapq.nlargest(
+            k, set(wordform_ids), key=lambda i: self._weights.get(i, -math.inf)
         )
 
     @staticmethod
@@ -83,16 +140,179 @@ class AffixSearcher:
         return SimplifiedForm(to_source_language_keyword(query.lower()))
 
 
+class MappedAffixSearcher:
+    """
+    Does the same searches as AffixSearcher, using index files written by
+    build_affix_index() instead of in-memory tries.
+
+    The prefix index maps the simplified form of each word to its wordform
+    IDs, and the suffix index does the same for the reversed simplified forms.
+    Both are weighted, so the best k matches are found without going through
+    the rest.
+    """
+
+    def __init__(self, prefixes: IdIndex, suffixes: IdIndex):
+        self._prefixes = prefixes
+        self._suffixes = suffixes
+
+    def search_by_prefix(self, prefix: str, k: Optional[int] = None) -> Iterable[int]:
+        """
+        :return: an iterable of Wordform IDs that match the prefix, or only
+            the best k of them
+        """
+        term = AffixSearcher.to_simplified_form(prefix)
+        return self._search(self._prefixes, term, k)
+
+    def search_by_suffix(self, suffix: str, k: Optional[int] = None) -> Iterable[int]:
+        """
+        :return: an iterable of Wordform IDs that match the suffix, or only
+            the best k of them
+        """
+        term = AffixSearcher.to_simplified_form(suffix)
+        return self._search(self._suffixes, _reverse(term), k)
+
+    @staticmethod
+    def _search(index: IdIndex, term: str, k: Optional[int]) -> Iterable[int]:
+        if k is None:
+            return chain.from_iterable(ids for _, ids in index.items_with_prefix(term))
+        return index.best_ids_with_prefix(term, k)
+
+
+class DatabaseAffixSearcher:
+    """
+    Does the same searches as AffixSearcher by querying the database, for when
+    the index files are not available.
+
+    Affixes are matched case-insensitively against the text as stored, so
+    unlike the other searchers, a query without diacritics will not match text
+    with them, and the matches are not ordered by weight.
+    """
+
+    def __init__(self, texts_with_ids: Callable[[], QuerySet]):
+        self._texts_with_ids = texts_with_ids
+
+    def search_by_prefix(self, prefix: str, k: Optional[int] = None) -> Iterable[int]:
+        """
+        :return: an iterable of Wordform IDs that match the prefix, or at most k
+            of them
+        """
+        return self._search(Q(text__istartswith=prefix), k)
+
+    def search_by_suffix(self, suffix: str, k: Optional[int] = None) -> Iterable[int]:
+        """
+        :return: an iterable of Wordform IDs that match the suffix, or at most k
+            of them
+        """
+        return self._search(Q(text__iendswith=suffix), k)
+
+    def _search(self, condition: Q, k: Optional[int]) -> Iterable[int]:
+        matches = self._texts_with_ids().filter(condition)
+        if k is not None:
+            matches = matches[:k]
+        return [wordform_id for _, wordform_id in matches]
+
+
+AnyAffixSearcher = Union[AffixSearcher, MappedAffixSearcher, DatabaseAffixSearcher]
+
+
 def _reverse(text: SimplifiedForm) -> SimplifiedForm:
     return SimplifiedForm(text[::-1])
 
 
-def do_affix_search(query: InternalForm, affixes: AffixSearcher) -> Iterable[Wordform]:
+def affix_index_paths(name: str) -> tuple[Path, Path]:
+    """
+    Return the paths of the prefix and suffix index files with this name
+    """
+    return (
+        search_index_path(f"{name}_prefixes.idx"),
+        search_index_path(f"{name}_suffixes.idx"),
+    )
+
+
+def build_affix_index(
+    name: str,
+    words: Iterable[Tuple[str, int]],
+    generation: str,
+    weights: Mapping[int, float],
+) -> int:
+    """
+    Write the prefix and suffix index files for the given (text, wordform ID)
+    pairs, weighting each wordform ID as given.
+
+    :return: the number of distinct simplified forms in the index
+    """
+    prefixes: dict[str, list[int]] = defaultdict(list)
+    suffixes: dict[str, list[int]] = defaultdict(list)
+    for raw_text, wordform_id in words:
+        if text := AffixSearcher.to_simplified_form(raw_text):
+            prefixes[text].append(wordform_id)
+            suffixes[_reverse(text)].append(wordform_id)
+
+    prefix_path, suffix_path = affix_index_paths(name)
+    write_id_index(prefix_path, prefixes, generation=generation, weights=weights)
+    write_id_index(suffix_path, suffixes, generation=generation, weights=weights)
+    return len(prefixes)
+
+
+def build_affix_indexes(generation: str) -> dict[str, int]:
+    """
+    Write all the affix index files for the current contents of the database.
+
+    :return: the number of distinct forms in each index, by index name
+    """
+    weights = fetch_wordform_weights()
+    return {
+        name: build_affix_index(name, fetch_words(), generation, weights)
+        for name, fetch_words in AFFIX_INDEXES.items()
+    }
+
+
+def affix_weight(text: str, frequency: int, morpheme_ranking: Optional[float]) -> float:
+    """
+    How good a match the wordform with this text is, for any affix of it.
+
+    Higher is better.
+    """
+    # Like the coefficients in ranking.py, these are guesses. They favour words
+    # seen often in the corpus, then words made of common morphemes (a low
+    # morpheme ranking), then shorter words, which are closer to the query.
+    return (
+        math.log1p(frequency)
+        - 0.1 * (morpheme_ranking if morpheme_ranking is not None else 20)
+        - 0.01 * len(text)
+    )
+
+
+def fetch_wordform_weights() -> dict[int, float]:
+    """
+    Return the affix_weight() of every wordform in any affix index, by ID
+    """
+    frequencies = wordform_frequencies()
+    rankings = wordform_cache.MORPHEME_RANKINGS
+    wordforms = (
+        Wordform.objects.filter(
+            Q(is_lemma=True) | Q(target_language_keyword__isnull=False)
+        )
+        .values_list("id", "text")
+        .distinct()
+    )
+    return {
+        wordform_id: affix_weight(text, frequencies.get(text, 0), rankings.get(text))
+        for wordform_id, text in wordforms
+    }
+
+
+def do_affix_search(
+    query: InternalForm, affixes: AnyAffixSearcher
+) -> Iterable[Wordform]:
     """
     Augments the given set with results from performing both a suffix and prefix search on the wordforms.
+
+    Only the best AFFIX_SEARCH_MAX_RESULTS matches of each are returned.
     """
-    matched_ids = set(affixes.search_by_prefix(query))
-    matched_ids |= set(affixes.search_by_suffix(query))
+    k = settings.AFFIX_SEARCH_MAX_RESULTS or None
+    matched_ids = set(affixes.search_by_prefix(query, k))
+    matched_ids |= set(affixes.search_by_suffix(query, k))
     return Wordform.objects.filter(id__in=matched_ids)
 
 
@@ -106,18 +326,21 @@ def do_target_language_affix_search(search_run: core.SearchRun):
 
 
 def do_source_language_affix_search(search_run: core.SearchRun):
-    matching_words = do_affix_search(
-        search_run.internal_query,
-        cache.source_language_affix_searcher,
+    matching_words = list(
+        do_affix_search(
+            search_run.internal_query,
+            cache.source_language_affix_searcher,
+        )
     )
-    for word in matching_words:
+    distances = get_modified_distances_to(
+        [word.text for word in matching_words], search_run.internal_query
+    )
+    for word, distance in zip(matching_words, distances):
         search_run.add_result(
             Result(
                 word,
                 source_language_affix_match=True,
-                query_wordform_edit_distance=get_modified_distance(
-                    word.text, search_run.internal_query
-                ),
+                query_wordform_edit_distance=distance,
             )
         )
 
@@ -130,14 +353,26 @@ def query_would_return_too_many_results(query: InternalForm) -> bool:
     return len(query) <= settings.AFFIX_SEARCH_THRESHOLD
 
 
+def target_language_keywords_with_ids() -> QuerySet:
+    """
+    Return a query for (text, Wordform ID) pairs for all target-language keywords
+    """
+    return TargetLanguageKeyword.objects.all().values_list("text", "wordform__id")
+
+
+def source_language_lemmas_with_ids() -> QuerySet:
+    """
+    Return a query for (text, id) pairs for all lemma Wordforms
+    """
+    return Wordform.objects.filter(is_lemma=True).values_list("text", "id")
+
+
 def fetch_target_language_keywords_with_ids():
     """
     Return tuple of (text, Wordform ID) pairs for all target-language keywords
     """
     # Slurp up all the results to prevent walking the database multiple times
-    return tuple(
-        TargetLanguageKeyword.objects.all().values_list("text", "wordform__id")
-    )
+    return tuple(target_language_keywords_with_ids())
 
 
 def fetch_source_language_lemmas_with_ids():
@@ -145,7 +380,37 @@ def fetch_source_language_lemmas_with_ids():
     Return tuple of (text, id) pairs for all lemma Wordforms
     """
     # Slurp up all the results to prevent walking the database multiple times
-    return tuple(Wordform.objects.filter(is_lemma=True).values_list("text", "id"))
+    return tuple(source_language_lemmas_with_ids())
+
+
+# The name of each affix index, and how to get the words to put into it
+AFFIX_INDEXES: dict[str, Callable[[], Iterable[Tuple[str, int]]]] = {
+    "source_language_affixes": fetch_source_language_lemmas_with_ids,
+    "target_language_affixes": fetch_target_language_keywords_with_ids,
+}
+
+# How to query the same words when the index files can’t be used
+AFFIX_QUERIES: dict[str, Callable[[], QuerySet]] = {
+    "source_language_affixes": source_language_lemmas_with_ids,
+    "target_language_affixes": target_language_keywords_with_ids,
+}
+
+
+def _load_affix_searcher(name: str, generation: str) -> Optional[MappedAffixSearcher]:
+    prefix_path, suffix_path = affix_index_paths(name)
+    try:
+        return MappedAffixSearcher(
+            IdIndex(prefix_path, expected_generation=generation),
+            IdIndex(suffix_path, expected_generation=generation),
+        )
+    except FileNotFoundError as e:
+        logger.warning(
+            "%s not found; run `manage.py buildsearchindexes` for faster affix search",
+            e.filename,
+        )
+    except IdIndexError as e:
+        logger.warning("Not using affix index: %s", e)
+    return None
 
 
 class _Cache:
@@ -155,20 +420,33 @@ class _Cache:
     file.
     """
 
-    @cached_property
-    def source_language_affix_searcher(self) -> AffixSearcher:
+    def __init__(self):
+        self._searchers = {
+            name: PerGeneration(partial(_load_affix_searcher, name))
+            for name in AFFIX_INDEXES
+        }
+
+    def _searcher(self, name: str) -> AnyAffixSearcher:
+        # The fallback is made anew for each search, so that the index files
+        # are used as soon as they have been written for the current import.
+        if (searcher := self._searchers[name].get()) is not None:
+            return searcher
+        return DatabaseAffixSearcher(AFFIX_QUERIES[name])
+
+    @property
+    def source_language_affix_searcher(self) -> AnyAffixSearcher:
         """
         Returns the affix searcher that matches source language lemmas
         """
-        return AffixSearcher(fetch_source_language_lemmas_with_ids())
+        return self._searcher("source_language_affixes")
 
-    @cached_property
-    def target_language_affix_searcher(self) -> AffixSearcher:
+    @property
+    def target_language_affix_searcher(self) -> AnyAffixSearcher:
         """
         Returns the affix searcher that matches target language keywords mined from the dictionary
         definitions
         """
-        return AffixSearcher(fetch_target_language_keywords_with_ids())
+        return self._searcher("target_language_affixes")
 
     def preload(self):
         """Preload caches by accessing cached properties
@@ -0,0 +1,92 @@
+import pytest
+
+from morphodict.lexicon.id_index import IdIndex
+from morphodict.lexicon.models import Wordform
+from . import affix
+from .affix import AffixSearcher, DatabaseAffixSearcher, MappedAffixSearcher
+
+WORDS = [
+    ("nipâw", 1),
+    ("nipâwin", 2),
+    ("kinipâw", 3),
+    ("wâpamêw", 4),
+    ("Nipâw", 5),
+    ("maci-nipâw", 6),
+]
+WEIGHTS = {1: 3.0, 2: 1.0, 3: 2.5, 4: 0.0, 5: -1.0, 6: 2.0}
+
+
+@pytest.fixture
+def mapped_searcher(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        affix, "search_index_path", lambda filename: tmp_path / filename
+    )
+    assert affix.build_affix_index("test", WORDS, "1", WEIGHTS) == 5
+
+    prefix_path, suffix_path = affix.affix_index_paths("test")
+    return MappedAffixSearcher(IdIndex(prefix_path), IdIndex(suffix_path))
+
+
+@pytest.mark.parametrize("query", ["nip", "nipaw", "NIPÂ", "paw", "win", "maci", ""])
+def test_mapped_searcher_matches_in_memory_searcher(mapped_searcher, query):
+    searcher = AffixSearcher(WORDS, WEIGHTS)
+
+    assert sorted(mapped_searcher.search_by_prefix(query)) == sorted(
+        searcher.search_by_prefix(query)
+    )
+    assert sorted(mapped_searcher.search_by_suffix(query)) == sorted(
+        searcher.search_by_suffix(query)
+    )
+    for k in [0, 1, 2, 10]:
+        assert list(mapped_searcher.search_by_prefix(query, k)) == list(
+            searcher.search_by_prefix(query, k)
+        )
+        assert list(mapped_searcher.search_by_suffix(query, k)) == list(
+            searcher.search_by_suffix(query, k)
+        )
+
+
+def test_mapped_searcher(mapped_searcher):
+    assert sorted(mapped_searcher.search_by_prefix("nipa")) == [1, 2, 5]
+    assert sorted(mapped_searcher.search_by_suffix("nipaw")) == [1, 3, 5, 6]
+    assert list(mapped_searcher.search_by_prefix("xyz")) == []
+
+
+def test_best_matches_come_first(mapped_searcher):
+    assert mapped_searcher.search_by_prefix("nipa", 2) == [1, 2]
+    assert mapped_searcher.search_by_suffix("nipaw", 3) == [1, 3, 6]
+
+
+@pytest.mark.django_db
+def test_database_searcher_is_used_without_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        affix, "search_index_path", lambda filename: tmp_path / filename
+    )
+    cache = affix._Cache()
+
+    searcher = cache.source_language_affix_searcher
+    assert isinstance(searcher, DatabaseAffixSearcher)
+    nipaw_ids = set(
+        Wordform.objects.filter(text="nipâw", is_lemma=True).values_list(
+            "id", flat=True
+        )
+    )
+    assert nipaw_ids
+    assert nipaw_ids <= set(searcher.search_by_prefix("nipâ"))
+    assert nipaw_ids <= set(searcher.search_by_suffix("pâw"))
+    assert len(searcher.search_by_prefix("n", 3)) == 3
+
+
+@pytest.mark.parametrize(
+    ("frequency", "morpheme_ranking", "text", "better_than"),
+    [
+        (100, None, "nipâw", (1, None, "nipâw")),
+        (0, 5.0, "nipâw", (0, 30.0, "nipâw")),
+        (0, None, "nipâw", (0, None, "nipâwin")),
+    ],
+)
+def test_affix_weight(frequency, morpheme_ranking, text, better_than):
+    other_frequency, other_ranking, other_text = better_than
+    assert affix.affix_weight(text, frequency, morpheme_ranking) > affix.affix_weight(
+        other_text, other_frequency, other_ranking
+    )
@@ -1,9 +1,16 @@
-from typing import Any, Iterable
+from __future__ import annotations
+
+import copy
+import heapq
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
 
 from django.db.models import prefetch_related_objects
 
 from . import types, presentation
 from .query import Query
+from .timing import StageTiming, report_timings, timed_stage
 from .util import first_non_none_value
 from morphodict.lexicon.models import Wordform, wordform_cache, WordformKey
 
@@ -24,15 +31,28 @@ class SearchRun:
         )
         self._results = {}
         self._verbose_messages = []
+        self._add_count = 0
+        self._stage_stack = []
+        self._timings = []
+        self.lookup_batch = None
 
     include_auto_definition: bool
     _results: dict[WordformKey, types.Result]
     VerboseMessage = dict[str, str]
     _verbose_messages: list[VerboseMessage]
+    # How many times add_result() has been called, to count each stage’s
+    # candidates
+    _add_count: int
+    # Names of the stages currently running, outermost first
+    _stage_stack: list[str]
+    _timings: list[StageTiming]
+    # A lookup.LookupBatch, if this run is one of many searched together
+    lookup_batch: Any
 
     def add_result(self, result: types.Result):
         if not isinstance(result, types.Result):
             raise TypeError(f"{result} is {type(result)}, not Result")
+        self._add_count += 1
         key = result.wordform.key
         if key in self._results:
             self._results[key].add_features_from(result)
@@ -45,9 +65,78 @@ class SearchRun:
     def remove_result(self, result: types.Result):
         del self._results[result.wordform.key]
 
+    def fork(self) -> SearchRun:
+        """
+        Return a new SearchRun for the same query, but with no results.
+
+        Lets a search method gather its results on its own, e.g., in another
+        thread, for merging back into this search run later.
+        """
+        forked = copy.copy(self)
+        forked._results = {}
+        forked._verbose_messages = []
+        forked._add_count = 0
+        forked._stage_stack = list(self._stage_stack)
+        forked._timings = []
+        return forked
+
+    def merge(self, other: SearchRun):
+        """
+        Add all results, verbose messages and timings from other into this
+        search run.
+
+        Merging the forks of a search run in the same order that their search
+        methods would otherwise have run gives exactly the same results as
+        running them all on this search run.
+        """
+        for result in other.unsorted_results():
+            self.add_result(result)
+        self._verbose_messages.extend(other.verbose_messages)
+        self._timings.extend(other._timings)
+
+    @contextmanager
+    def timed_stage(self, name: str) -> Iterator[StageTiming]:
+        """
+        Record how long the body of the with statement takes, as a stage of
+        this search run.
+
+        Stages started inside other stages are named after them, e.g.,
+        `search.fetch_results.relaxed_fst`. Unless the body sets the yielded
+        timing’s candidates, they are the number of results it added.
+        """
+        self._stage_stack.append(name)
+        add_count_before = self._add_count
+        try:
+            with timed_stage(".".join(self._stage_stack)) as timing:
+                yield timing
+        finally:
+            self._stage_stack.pop()
+        if timing.candidates is None:
+            timing.candidates = self._add_count - add_count_before
+        self._timings.append(timing)
+
+    @property
+    def timings(self) -> list[StageTiming]:
+        """
+        Timings of the stages of the search.
+
+        Presentation timings aren’t kept here: finished search runs are cached
+        and presented many times, concurrently. See SerializedResultPage.
+        """
+        return self._timings
+
+    def report_timings(self):
+        """
+        Log the search stage timings, and add them to the stage histograms.
+        """
+        report_timings(self.internal_query, "search", self._timings)
+
     def unsorted_results(self) -> Iterable[types.Result]:
         return self._results.values()
 
+    def result_count(self) -> int:
+        return len(self._results)
+
     def sorted_results(self) -> list[types.Result]:
         results = list(self._results.values())
         for r in results:
@@ -55,18 +144,114 @@ class SearchRun:
         results.sort()
         return results
 
-    def presentation_results(self) -> list[presentation.PresentationResult]:
-        results = self.sorted_results()
-        prefetch_related_objects(
-            [r.wordform for r in results],
-            "lemma__definitions__citations",
-            "definitions__citations",
-        )
-        return [presentation.PresentationResult(r, search_run=self) for r in results]
+    def top_results(self, limit: int, *, offset: int = 0) -> list[types.Result]:
+        """
+        Return sorted_results()[offset:offset + limit], without sorting all results.
+
+        A query can gather hundreds of results of which only the first screenful
+        is shown, so a partial heap-based selection is much cheaper than a full
+        sort.
+        """
+        results = self._results.values()
+        for r in results:
+            r.assign_default_relevance_score()
+        # nsmallest is stable, just like sort()
+        return heapq.nsmallest(offset + limit, results)[offset:]
+
+    def presentation_results(
+        self, *, offset: int = 0, limit: Optional[int] = None
+    ) -> list[presentation.PresentationResult]:
+        """
+        Return presentation results in order, only prefetching and presenting
+        the results from offset to offset + limit if limit is given.
+        """
+        results, _ = self._present(offset=offset, limit=limit, serialize=False)
+        return results
+
+    def serialized_presentation_results(
+        self, *, offset: int = 0, limit: Optional[int] = None
+    ):
+        results, _ = self._present(offset=offset, limit=limit, serialize=True)
+        return results
+
+    def _present(
+        self,
+        *,
+        offset: int,
+        limit: Optional[int],
+        serialize: bool,
+        prefetched: Optional[presentation.PrefetchedForSerialization] = None,
+    ) -> tuple[list[Any], list[StageTiming]]:
+        """
+        Return the presentation results, and the timings of the presentation
+        stages, which are reported but not stored on this search run.
+
+        prefetched is as returned by presentation.prefetch_for_serialization()
+        for at least the results being serialized; it is fetched if not given.
+        """
+        timings = []
+        with timed_stage("presentation") as total:
+            with timed_stage("presentation.rank") as timing:
+                if limit is None:
+                    results = self.sorted_results()[offset:]
+                else:
+                    results = self.top_results(limit, offset=offset)
+                timing.candidates = self.result_count()
+            timings.append(timing)
+
+            with timed_stage("presentation.prefetch") as timing:
+                if serialize:
+                    if prefetched is None:
+                        prefetched = presentation.prefetch_for_serialization(results)
+                    lemma_snapshots, definitions = prefetched
+                else:
+                    prefetch_for_presentation(results)
+                timing.candidates = len(results)
+            timings.append(timing)
+
+            with timed_stage("presentation.build") as timing:
+                ret: list[Any] = [
+                    presentation.PresentationResult(r, search_run=self) for r in results
+                ]
+                timing.candidates = len(ret)
+            timings.append(timing)
+
+            if serialize:
+                with timed_stage("presentation.serialize") as timing:
+                    ret = [r.serialize(definitions, lemma_snapshots) for r in ret]
+                    timing.candidates = len(ret)
+                timings.append(timing)
+        total.candidates = len(ret)
 
-    def serialized_presentation_results(self):
-        results = self.presentation_results()
-        return [r.serialize() for r in results]
+        timings.insert(0, total)
+        report_timings(self.internal_query, "presentation", timings)
+        return ret, timings
+
+    def serialized_presentation_results_page(
+        self,
+        page: int,
+        page_size: int,
+        *,
+        prefetched: Optional[presentation.PrefetchedForSerialization] = None,
+    ) -> SerializedResultPage:
+        """
+        Return one page of serialized results, pages being numbered from 1.
+
+        To serialize pages of several search runs with fewer queries, pass what
+        presentation.prefetch_for_serialization() returns for all their results.
+        """
+        if page < 1:
+            raise ValueError(f"page must be at least 1, not {page}")
+        offset = (page - 1) * page_size
+        results, timings = self._present(
+            offset=offset, limit=page_size, serialize=True, prefetched=prefetched
+        )
+        return SerializedResultPage(
+            results=results,
+            page=page,
+            next_page=page + 1 if offset + page_size < self.result_count() else None,
+            presentation_timings=timings,
+        )
 
     def add_verbose_message(self, message=None, **messages):
         """
@@ -101,3 +286,28 @@ class SearchRun:
 
     def __repr__(self):
         return f"SearchRun<query={self.query!r}>"
+
+
+def prefetch_for_presentation(results: Iterable[types.Result]):
+    """
+    Fetch everything presenting results needs from the database up front.
+
+    Wordforms that already have what they need are skipped. Serializing the
+    results then reuses the prefetched definitions, instead of fetching them
+    again.
+    """
+    prefetch_related_objects(
+        [r.wordform for r in results],
+        "lemma__definitions__citations",
+        "definitions__citations",
+    )
+
+
+@dataclass
+class SerializedResultPage:
+    results: list[presentation.SerializedPresentationResult]
+    page: int
+    # The page to ask for to see more results, or None if this is the last page
+    next_page: Optional[int]
+    # How long presenting this page took, stage by stage
+    presentation_timings: list[StageTiming]
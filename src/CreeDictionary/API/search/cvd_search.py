@@ -33,7 +33,9 @@ def do_cvd_search(search_run: SearchRun):
     query_vector = vector_for_keys(google_news_vectors(), keys)
 
     try:
-        closest = definition_vectors().similar_by_vector(query_vector, 50)
+        with search_run.timed_stage("similar_by_vector") as timing:
+            closest = definition_vectors().similar_by_vector(query_vector, 50)
+            timing.candidates = len(closest)
     except DefinitionVectorsNotFoundException:
         logger.exception("")
         return
@@ -82,19 +82,25 @@ class EsptSearch:
         if not self.query_analyzed_ok:
             return
 
-        inflected_results = self._generate_inflected_results()
+        with self.search_run.timed_stage("generate") as timing:
+            inflected_results = self._generate_inflected_results()
+            timing.candidates = len(inflected_results)
 
         # aggregating queries for performance
         possible_wordforms = Wordform.objects.filter(
-            text__in=[r.inflected_text for r in inflected_results]
+            smushed_analysis__in={r.analysis.smushed() for r in inflected_results}
         )
         wordform_lookup = {}
         for wf in possible_wordforms:
-            wordform_lookup[(wf.text, wf.lemma_id)] = wf
+            wordform_lookup[(wf.text, wf.smushed_analysis, wf.lemma_id)] = wf
 
         for result in inflected_results:
             wordform = wordform_lookup.get(
-                (result.inflected_text, result.original_result.lemma_wordform.id)
+                (
+                    result.inflected_text,
+                    result.analysis.smushed(),
+                    result.original_result.lemma_wordform.id,
+                )
             )
             if wordform is None:
                 # inflected form not found in DB, so create a synthetic one. Can
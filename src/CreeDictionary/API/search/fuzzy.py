@@ -0,0 +1,192 @@
+"""
+Typo-tolerant search for lemmas
+
+A misspelled Cree word usually can’t be analyzed by the relaxed FST, and so
+gets no source-language results at all, unless it happens to be a prefix or
+suffix that affix search catches. This finds the lemmas that are close to the
+query by get_modified_distance(), without comparing the query against every
+lemma.
+
+It uses a symmetric-delete index: every string made by deleting up to
+MAX_DELETIONS characters from the simplified form of each lemma is mapped to
+the lemma. Two strings within MAX_DELETIONS plain edits of each other always
+have a deletion variant in common, so looking up the deletion variants of the
+query finds every lemma within that many edits, plus some that aren’t. The
+candidates are then checked with the real, Cree-aware distance.
+
+Simplified forms have no diacritics, so changing diacritics is free in the
+index, but inserting or deleting an ‘h’ costs a whole edit there and only ½ in
+get_modified_distance(). Matches within FUZZY_SEARCH_MAX_DISTANCE that need
+more than MAX_DELETIONS edits to the simplified form are missed;
+`manage.py benchmarkfuzzysearch` measures how many.
+
+Like the English keyword index, the index is a memory-mapped file written by
+`manage.py buildsearchindexes`. If it is missing or stale, this search finds
+nothing.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+
+from CreeDictionary.utils import get_modified_distances
+from morphodict.lexicon.generation import PerGeneration
+from morphodict.lexicon.id_index import IdIndex, IdIndexError, write_id_index
+from morphodict.lexicon.models import Wordform
+from morphodict.lexicon.util import to_source_language_keyword
+from . import core
+from .index_files import search_index_path
+from .types import Result
+
+logger = logging.getLogger(__name__)
+
+# How many characters to delete from indexed forms and queries. The index has
+# about (1 + n + n²/2) entries for every n-character lemma, so 2 is as far as
+# this can reasonably go. Changing this requires rebuilding the index.
+MAX_DELETIONS = 2
+
+
+def fuzzy_lemma_index_path() -> Path:
+    return search_index_path("fuzzy_lemmas.idx")
+
+
+def deletion_variants(text: str, max_deletions: int = MAX_DELETIONS) -> set[str]:
+    """
+    Return every string made by deleting up to max_deletions characters from text
+
+    >>> sorted(deletion_variants("abc", 1))
+    ['ab', 'abc', 'ac', 'bc']
+    >>> sorted(deletion_variants("aa", 2))
+    ['', 'a', 'aa']
+    """
+    variants = {text}
+    previous = {text}
+    for _ in range(max_deletions):
+        previous = {
+            variant[:i] + variant[i + 1 :]
+            for variant in previous
+            for i in range(len(variant))
+        }
+        variants |= previous
+    return variants
+
+
+def build_fuzzy_lemma_index(generation: str) -> int:
+    """
+    Write the index file for the current contents of the database.
+
+    Inflected wordforms are indexed too if settings.FUZZY_SEARCH_INCLUDE_INFLECTIONS
+    is set, at the cost of a much larger file.
+
+    :return: the number of distinct deletion variants in the index
+    """
+    wordforms = Wordform.objects.all()
+    if not settings.FUZZY_SEARCH_INCLUDE_INFLECTIONS:
+        wordforms = wordforms.filter(is_lemma=True)
+
+    variant_to_ids = defaultdict(list)
+    for text, wordform_id in wordforms.values_list("text", "id").iterator():
+        simplified = to_source_language_keyword(text)
+        if not simplified:
+            continue
+        for variant in deletion_variants(simplified):
+            if variant:
+                variant_to_ids[variant].append(wordform_id)
+
+    write_id_index(fuzzy_lemma_index_path(), variant_to_ids, generation=generation)
+    return len(variant_to_ids)
+
+
+def _load_index(generation: str) -> Optional[IdIndex]:
+    path = fuzzy_lemma_index_path()
+    try:
+        return IdIndex(path, expected_generation=generation)
+    except FileNotFoundError:
+        logger.warning(
+            "%s not found; run `manage.py buildsearchindexes` to search for misspellings",
+            path,
+        )
+    except IdIndexError as e:
+        logger.warning("Not using fuzzy lemma index: %s", e)
+    return None
+
+
+_fuzzy_lemma_index = PerGeneration(_load_index)
+
+
+def preload():
+    """Open the index now, instead of on the first search"""
+    _fuzzy_lemma_index.get()
+
+
+def fuzzy_lemma_candidates(query: str) -> Optional[set[int]]:
+    """
+    Return the IDs of the indexed wordforms that might be close to query
+
+    This is every wordform whose simplified form is within MAX_DELETIONS edits
+    of the simplified query, plus some that aren’t. Returns None if the index is
+    not available for the current lexicon.
+    """
+    index = _fuzzy_lemma_index.get()
+    if index is None:
+        return None
+
+    ret: set[int] = set()
+    for variant in deletion_variants(to_source_language_keyword(query)):
+        if variant:
+            ret.update(index.get(variant))
+    return ret
+
+
+def find_fuzzy_lemma_matches(
+    query: str, *, max_distance: Optional[float] = None
+) -> Optional[list[tuple[Wordform, float]]]:
+    """
+    Return the indexed wordforms within max_distance of query, with their distances
+
+    The distance is get_modified_distance(query, wordform.text), and
+    max_distance defaults to settings.FUZZY_SEARCH_MAX_DISTANCE. Returns None if
+    the index is not available for the current lexicon.
+    """
+    if max_distance is None:
+        max_distance = settings.FUZZY_SEARCH_MAX_DISTANCE
+
+    candidate_ids = fuzzy_lemma_candidates(query)
+    if candidate_ids is None:
+        return None
+
+    wordforms = list(
+        Wordform.objects.filter(id__in=candidate_ids).select_related("lemma")
+    )
+    distances = get_modified_distances(query, [wf.text for wf in wordforms])
+    return [
+        (wordform, distance)
+        for wordform, distance in zip(wordforms, distances)
+        if distance <= max_distance
+    ]
+
+
+def do_fuzzy_lemma_search(search_run: core.SearchRun):
+    """
+    Add results for lemmas that are spelled almost like the query
+    """
+    with search_run.timed_stage("lookup") as timing:
+        matches = find_fuzzy_lemma_matches(search_run.internal_query)
+        if matches is not None:
+            timing.candidates = len(matches)
+    if matches is None:
+        return
+
+    for wordform, distance in matches:
+        search_run.add_result(
+            Result(
+                wordform,
+                source_language_fuzzy_match=True,
+                query_wordform_edit_distance=distance,
+            )
+        )
@@ -0,0 +1,53 @@
+import pytest
+
+from CreeDictionary.API.search import search
+from CreeDictionary.API.search.fuzzy import find_fuzzy_lemma_matches
+from CreeDictionary.utils import get_modified_distance
+from morphodict.lexicon.models import Wordform
+
+
+@pytest.mark.django_db
+def test_misspelled_lemma_is_found():
+    # Not analyzable, and not a prefix or suffix of anything
+    query = "wapamewk"
+
+    results = search(query=query).sorted_results()
+
+    assert results[0].wordform.text == "wâpamêw"
+    assert results[0].source_language_fuzzy_match
+    assert results[0].query_wordform_edit_distance == 1.5
+
+
+@pytest.mark.django_db
+def test_no_fuzzy_matches_when_query_matches():
+    results = search(query="wâpamêw").unsorted_results()
+
+    assert not any(r.source_language_fuzzy_match for r in results)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["wapamewk wapamewk", "wapamewk" * 5])
+def test_no_fuzzy_search_for_several_words_or_long_queries(query):
+    results = search(query=query).unsorted_results()
+
+    assert not any(r.source_language_fuzzy_match for r in results)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["wapamewk", "nipaww", "acahkoz", "asawapamiw"])
+def test_fuzzy_matches_are_exhaustive(query, settings):
+    """
+    The index finds every lemma that comparing against all of them finds.
+    """
+    settings.FUZZY_SEARCH_MAX_DISTANCE = 2
+
+    matches = find_fuzzy_lemma_matches(query)
+    assert matches is not None
+
+    expected = {
+        wordform.id
+        for wordform in Wordform.objects.filter(is_lemma=True)
+        if get_modified_distance(query, wordform.text) <= 2
+    }
+    assert expected
+    assert {wordform.id for wordform, _ in matches} == expected
@@ -0,0 +1,15 @@
+from pathlib import Path
+
+from django.conf import settings
+
+
+def search_index_path(filename: str) -> Path:
+    """
+    Where `manage.py buildsearchindexes` puts the index file with this name
+
+    Indexes built from the test database get their own files, so that running
+    the tests doesn’t clobber the indexes for the real database.
+    """
+    if settings.USE_TEST_DB:
+        filename = "test_db_" + filename
+    return settings.BASE_DIR / "db" / filename
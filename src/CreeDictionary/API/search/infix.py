@@ -0,0 +1,155 @@
+"""
+Infix search
+
+Affix search only finds words that start or end with the query. This finds the
+words that contain it anywhere, so that someone who remembers ‘nipâ’ from the
+middle of ‘maci-nipâw’ still gets it.
+
+It uses substring index files, which are suffix arrays over the same simplified
+forms of lemmas and English keywords that affix search uses, written by
+`manage.py buildsearchindexes`. If they are missing or stale, this search finds
+nothing.
+
+Like affix search, it is skipped for short queries. It only runs at all if
+settings.INFIX_SEARCH is set.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+from collections import defaultdict
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from CreeDictionary.utils import get_modified_distances_to
+from morphodict.lexicon.generation import PerGeneration
+from morphodict.lexicon.id_index import (
+    IdIndexError,
+    SubstringIndex,
+    write_substring_index,
+)
+from morphodict.lexicon.models import Wordform
+from . import core
+from .affix import (
+    AffixSearcher,
+    fetch_source_language_lemmas_with_ids,
+    fetch_target_language_keywords_with_ids,
+)
+from .index_files import search_index_path
+from .types import Result
+
+logger = logging.getLogger(__name__)
+
+# The name of each infix index, and how to get the words to put into it
+INFIX_INDEXES = {
+    "source_language_infixes": fetch_source_language_lemmas_with_ids,
+    "target_language_infixes": fetch_target_language_keywords_with_ids,
+}
+
+
+def infix_index_path(name: str) -> Path:
+    return search_index_path(f"{name}.idx")
+
+
+def build_infix_index(
+    name: str, words: Iterable[Tuple[str, int]], generation: str
+) -> int:
+    """
+    Write the substring index file for the given (text, wordform ID) pairs.
+
+    :return: the number of distinct simplified forms in the index
+    """
+    text_to_ids: defaultdict[str, list[int]] = defaultdict(list)
+    for raw_text, wordform_id in words:
+        if text := AffixSearcher.to_simplified_form(raw_text):
+            text_to_ids[text].append(wordform_id)
+
+    write_substring_index(infix_index_path(name), text_to_ids, generation=generation)
+    return len(text_to_ids)
+
+
+def build_infix_indexes(generation: str) -> dict[str, int]:
+    """
+    Write all the infix index files for the current contents of the database.
+
+    :return: the number of distinct forms in each index, by index name
+    """
+    return {
+        name: build_infix_index(name, fetch_words(), generation)
+        for name, fetch_words in INFIX_INDEXES.items()
+    }
+
+
+def _load_index(name: str, generation: str) -> Optional[SubstringIndex]:
+    path = infix_index_path(name)
+    try:
+        return SubstringIndex(path, expected_generation=generation)
+    except FileNotFoundError:
+        logger.warning(
+            "%s not found; run `manage.py buildsearchindexes` for infix search", path
+        )
+    except IdIndexError as e:
+        logger.warning("Not using infix index: %s", e)
+    return None
+
+
+_infix_indexes = {
+    name: PerGeneration(partial(_load_index, name)) for name in INFIX_INDEXES
+}
+
+
+def preload():
+    """Open the indexes now, instead of on the first search"""
+    for index in _infix_indexes.values():
+        index.get()
+
+
+def best_infix_matches(index: SubstringIndex, query: str, k: Optional[int]) -> set[int]:
+    """
+    Return the IDs of the wordforms whose simplified forms contain query
+
+    If k is given, only the IDs of the k shortest matching forms are returned,
+    as they are the closest to the query.
+    """
+    items: Iterable[tuple[str, Sequence[int]]] = index.items_containing(
+        AffixSearcher.to_simplified_form(query)
+    )
+    if k is not None:
+        items = heapq.nsmallest(k, items, key=lambda item: len(item[0]))
+    return {wordform_id for _, ids in items for wordform_id in ids}
+
+
+def do_infix_search(query: str, name: str) -> Iterable[Wordform]:
+    index = _infix_indexes[name].get()
+    if index is None:
+        return []
+    matched_ids = best_infix_matches(
+        index, query, settings.AFFIX_SEARCH_MAX_RESULTS or None
+    )
+    return Wordform.objects.filter(id__in=matched_ids)
+
+
+def do_target_language_infix_search(search_run: core.SearchRun):
+    for word in do_infix_search(search_run.internal_query, "target_language_infixes"):
+        search_run.add_result(Result(word, target_language_infix_match=True))
+
+
+def do_source_language_infix_search(search_run: core.SearchRun):
+    matching_words = list(
+        do_infix_search(search_run.internal_query, "source_language_infixes")
+    )
+    distances = get_modified_distances_to(
+        [word.text for word in matching_words], search_run.internal_query
+    )
+    for word, distance in zip(matching_words, distances):
+        search_run.add_result(
+            Result(
+                word,
+                source_language_infix_match=True,
+                query_wordform_edit_distance=distance,
+            )
+        )
@@ -0,0 +1,41 @@
+import pytest
+
+from morphodict.lexicon.id_index import SubstringIndex
+from . import infix
+
+WORDS = [
+    ("nipâw", 1),
+    ("nipâwin", 2),
+    ("kinipâw", 3),
+    ("wâpamêw", 4),
+    ("Nipâw", 5),
+    ("maci-nipâw", 6),
+]
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        infix, "search_index_path", lambda filename: tmp_path / filename
+    )
+    assert infix.build_infix_index("test", WORDS, generation="1") == 5
+    return SubstringIndex(infix.infix_index_path("test"))
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("ipa", {1, 2, 3, 5, 6}),
+        ("NIPÂWI", {2}),
+        ("ci-nip", {6}),
+        ("apam", {4}),
+        ("xyz", set()),
+    ],
+)
+def test_infix_matches(index, query, expected):
+    assert infix.best_infix_matches(index, query, None) == expected
+
+
+def test_only_the_shortest_infix_matches(index):
+    assert infix.best_infix_matches(index, "ipa", 1) == {1, 5}
+    assert infix.best_infix_matches(index, "ipa", 2) == {1, 3, 5}
@@ -0,0 +1,89 @@
+"""
+An inverted index from stemmed English keywords to wordform IDs.
+
+English queries are the most common kind, and matching their keywords against
+the TargetLanguageKeyword table was the main database work they caused. The
+table only changes on import, so `manage.py buildsearchindexes`, which
+`importjsondict` runs, dumps it into a memory-mapped file that every web server
+process can search without going through the ORM.
+
+If the index file is missing, or was built from an older import, lookups return
+None and callers should fall back to querying the database.
+"""
+
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from morphodict.lexicon.generation import PerGeneration, current_lexicon_generation
+from morphodict.lexicon.id_index import IdIndex, IdIndexError, write_id_index
+from morphodict.lexicon.models import TargetLanguageKeyword
+from .index_files import search_index_path
+
+logger = logging.getLogger(__name__)
+
+
+def target_language_keyword_index_path() -> Path:
+    return search_index_path("target_language_keywords.idx")
+
+
+def build_target_language_keyword_index(generation: str) -> int:
+    """
+    Write the index file for the current contents of the database.
+
+    :return: the number of distinct keywords in the index
+    """
+    keyword_to_ids = defaultdict(list)
+    for text, wordform_id in TargetLanguageKeyword.objects.values_list(
+        "text", "wordform_id"
+    ).iterator():
+        keyword_to_ids[text].append(wordform_id)
+
+    write_id_index(
+        target_language_keyword_index_path(), keyword_to_ids, generation=generation
+    )
+    return len(keyword_to_ids)
+
+
+def _load_index(generation: str) -> Optional[IdIndex]:
+    path = target_language_keyword_index_path()
+    try:
+        return IdIndex(path, expected_generation=generation)
+    except FileNotFoundError:
+        logger.warning(
+            "%s not found; run `manage.py buildsearchindexes` for faster English search",
+            path,
+        )
+    except IdIndexError as e:
+        logger.warning("Not using English keyword index: %s", e)
+    return None
+
+
+_target_language_keyword_index = PerGeneration(_load_index)
+
+
+def preload():
+    """Open the index now, instead of on the first search"""
+    _target_language_keyword_index.get()
+
+
+def lookup_target_language_keywords(
+    keywords: Iterable[str],
+) -> Optional[dict[str, Sequence[int]]]:
+    """
+    Return the IDs of wordforms with each of the given stemmed keywords.
+
+    Keywords that match nothing are left out of the returned dict. Returns None
+    if the index is not available for the current lexicon.
+    """
+    index = _target_language_keyword_index.get()
+    if index is None:
+        return None
+
+    ret = {}
+    for keyword in keywords:
+        ids = index.get(keyword)
+        if ids:
+            ret[keyword] = ids
+    return ret
@@ -1,46 +1,228 @@
 from __future__ import annotations
 
 import logging
-
-from django.db.models import Q
+from collections import defaultdict
+from functools import cached_property
+from typing import Callable, ContextManager, Iterable, Mapping, Optional, Sequence
 
 from CreeDictionary.utils import (
     get_modified_distance,
+    get_modified_distances,
+    get_modified_distances_to,
 )
 from CreeDictionary.utils.english_keyword_extraction import stem_keywords
 from morphodict.analysis import (
+    RichAnalysis,
     strict_generator,
     rich_analyze_relaxed,
 )
-from morphodict.lexicon.models import Wordform, SourceLanguageKeyword
+from morphodict.lexicon.models import (
+    Wordform,
+    SourceLanguageKeyword,
+    TargetLanguageKeyword,
+)
 from morphodict.lexicon.util import to_source_language_keyword
-from . import core
+from . import core, timing
+from .keyword_index import lookup_target_language_keywords
+from .surface_forms import lookup_surface_forms
 from .types import Result
 
 logger = logging.getLogger(__name__)
 
 
+TimedStage = Callable[[str], ContextManager[timing.StageTiming]]
+
+
+class LookupBatch:
+    """
+    The keyword, FST and database lookups that fetch_results needs, done once
+    for a whole batch of queries.
+
+    Searching many queries at once, e.g., every word of a paragraph for
+    click-in-text, then costs a fixed number of database queries instead of a
+    few for every word, and no work is repeated for duplicate queries.
+
+    Each kind of lookup is done for all the queries the first time any query
+    needs it.
+    """
+
+    def __init__(
+        self,
+        internal_queries: Iterable[str],
+        *,
+        timed_stage: TimedStage = timing.timed_stage,
+    ):
+        self.queries = set(internal_queries)
+        self._timed_stage = timed_stage
+
+    def target_language_keyword_matches(
+        self, query: str
+    ) -> list[tuple[Wordform, list[str]]]:
+        """
+        Return the wordforms with definitions containing any keyword in the
+        query, along with the stemmed keywords they matched.
+        """
+        stemmed_keywords, keyword_ids, wordforms = self._target_language_keywords
+        matched_keywords = defaultdict(set)
+        for keyword in stemmed_keywords[query]:
+            for wordform_id in keyword_ids.get(keyword, ()):
+                matched_keywords[wordform_id].add(keyword)
+        return [
+            (wordforms[wordform_id], sorted(matched_keywords[wordform_id]))
+            for wordform_id in sorted(matched_keywords)
+        ]
+
+    def source_language_keyword_matches(
+        self, query: str
+    ) -> list[SourceLanguageKeyword]:
+        return self._source_language_keywords.get(to_source_language_keyword(query), [])
+
+    def analyses(self, query: str) -> set[RichAnalysis]:
+        """
+        Return the relaxed FST’s analyses of query, which for a form in the
+        surface form index are those of the wordforms spelled exactly like it.
+        """
+        return set(self._analyses[query])
+
+    def wordforms_with_analyses(self, analyses: set[RichAnalysis]) -> list[Wordform]:
+        smushed_analyses = {a.smushed() for a in analyses}
+        return [
+            wf
+            for wf in self._analysis_wordforms
+            if wf.smushed_analysis in smushed_analyses
+        ]
+
+    @cached_property
+    def _target_language_keywords(
+        self,
+    ) -> tuple[dict[str, set[str]], Mapping[str, Sequence[int]], dict[int, Wordform]]:
+        """
+        Returns the stemmed keywords of each query, the IDs of the wordforms
+        matching each keyword, and the wordforms with those IDs.
+        """
+        with self._timed_stage("target_language_keywords") as t:
+            stemmed_keywords = {query: stem_keywords(query) for query in self.queries}
+            all_stems = {stem for stems in stemmed_keywords.values() for stem in stems}
+
+            keyword_ids: Mapping[str, Sequence[int]] = {}
+            wordforms: dict[int, Wordform] = {}
+            if all_stems:
+                index_ids = lookup_target_language_keywords(all_stems)
+                if index_ids is not None:
+                    keyword_ids = index_ids
+                    all_ids = {id for ids in index_ids.values() for id in ids}
+                    if all_ids:
+                        wordforms = Wordform.objects.in_bulk(list(all_ids))
+                else:
+                    db_ids: dict[str, list[int]] = defaultdict(list)
+                    for keyword in TargetLanguageKeyword.objects.filter(
+                        text__in=all_stems
+                    ).select_related("wordform__lemma"):
+                        db_ids[keyword.text].append(keyword.wordform_id)
+                        wordforms[keyword.wordform_id] = keyword.wordform
+                    keyword_ids = db_ids
+            t.candidates = len(wordforms)
+        return stemmed_keywords, keyword_ids, wordforms
+
+    @cached_property
+    def _source_language_keywords(self) -> dict[str, list[SourceLanguageKeyword]]:
+        with self._timed_stage("source_language_keywords") as t:
+            ret = defaultdict(list)
+            for kw in SourceLanguageKeyword.objects.filter(
+                text__in={to_source_language_keyword(q) for q in self.queries}
+            ).select_related("wordform__lemma"):
+                ret[kw.text].append(kw)
+            t.candidates = sum(len(kws) for kws in ret.values())
+        return ret
+
+    @cached_property
+    def _known_analyses(self) -> dict[str, set[RichAnalysis]]:
+        """
+        The analyses of the wordforms spelled exactly like each query, for the
+        queries that have any
+        """
+        with self._timed_stage("surface_forms") as t:
+            ids_by_query = lookup_surface_forms(self.queries)
+            if not ids_by_query:
+                return {}
+
+            all_ids = {id for ids in ids_by_query.values() for id in ids}
+            analyses_by_text = defaultdict(set)
+            for text, raw_analysis in Wordform.objects.filter(
+                id__in=list(all_ids)
+            ).values_list("text", "raw_analysis"):
+                analyses_by_text[text].add(RichAnalysis(raw_analysis))
+
+            # Wordforms that differ from the query in diacritics share its key
+            # in the index, but not its analyses
+            ret = {
+                query: analyses_by_text[query]
+                for query in ids_by_query
+                if query in analyses_by_text
+            }
+            t.candidates = len(ret)
+        return ret
+
+    @cached_property
+    def _analyses(self) -> dict[str, set[RichAnalysis]]:
+        known = self._known_analyses
+        unknown = [query for query in self.queries if query not in known]
+        if not unknown:
+            return known
+
+        # Use the spelling relaxation to try to decipher the query
+        #   e.g., "atchakosuk" becomes "acâhkos+N+A+Pl" --
+        #         thus, we can match "acâhkos" in the dictionary!
+        with self._timed_stage("relaxed_fst") as t:
+            ret = {query: set(rich_analyze_relaxed(query)) for query in unknown}
+            t.candidates = sum(len(analyses) for analyses in ret.values())
+        return known | ret
+
+    @cached_property
+    def _analysis_wordforms(self) -> list[Wordform]:
+        """
+        All wordforms with any of the analyses of any query, in one indexed
+        database query.
+        """
+        all_analyses = {
+            a.smushed() for analyses in self._analyses.values() for a in analyses
+        }
+        with self._timed_stage("analysis_wordforms") as t:
+            ret = list(Wordform.objects.filter(smushed_analysis__in=list(all_analyses)))
+            t.candidates = len(ret)
+        return ret
+
+
+def lookup_batch_for(search_run: core.SearchRun) -> LookupBatch:
+    """
+    Return the lookups done for search_run as part of a batch, or do them now.
+    """
+    batch: Optional[LookupBatch] = search_run.lookup_batch
+    if batch is None or search_run.internal_query not in batch.queries:
+        batch = LookupBatch(
+            [search_run.internal_query], timed_stage=search_run.timed_stage
+        )
+    return batch
+
+
 def fetch_results(search_run: core.SearchRun):
-    fetch_results_from_target_language_keywords(search_run)
-    fetch_results_from_source_language_keywords(search_run)
+    batch = lookup_batch_for(search_run)
 
-    # Use the spelling relaxation to try to decipher the query
-    #   e.g., "atchakosuk" becomes "acâhkos+N+A+Pl" --
-    #         thus, we can match "acâhkos" in the dictionary!
-    fst_analyses = set(rich_analyze_relaxed(search_run.internal_query))
+    fetch_results_from_target_language_keywords(search_run, batch)
+    fetch_results_from_source_language_keywords(search_run, batch)
 
-    db_matches = list(
-        Wordform.objects.filter(raw_analysis__in=[a.tuple for a in fst_analyses])
+    fst_analyses = batch.analyses(search_run.internal_query)
+    db_matches = batch.wordforms_with_analyses(fst_analyses)
+    distances = get_modified_distances_to(
+        [wf.text for wf in db_matches], search_run.internal_query
     )
 
-    for wf in db_matches:
+    for wf, distance in zip(db_matches, distances):
         search_run.add_result(
             Result(
                 wf,
                 source_language_match=wf.text,
-                query_wordform_edit_distance=get_modified_distance(
-                    wf.text, search_run.internal_query
-                ),
+                query_wordform_edit_distance=distance,
             )
         )
 
@@ -50,13 +232,36 @@ def fetch_results(search_run: core.SearchRun):
     # fst_analyses has now been thinned by calls to `fst_analyses.remove()`
     # above; remaining items are analyses which are not in the database,
     # although their lemmas should be.
-    for analysis in fst_analyses:
-        # When the user query is outside of paradigm tables
-        # e.g. mad preverb and reduplication: ê-mâh-misi-nâh-nôcihikocik
-        # e.g. Initial change: nêpât: {'IC+nipâw+V+AI+Cnj+3Sg'}
+    #
+    # When the user query is outside of paradigm tables
+    # e.g. mad preverb and reduplication: ê-mâh-misi-nâh-nôcihikocik
+    # e.g. Initial change: nêpât: {'IC+nipâw+V+AI+Cnj+3Sg'}
+    if fst_analyses:
+        fetch_results_for_unknown_analyses(search_run, fst_analyses)
+
 
-        normatized_form_for_analysis = strict_generator().lookup(analysis.smushed())
-        if len(normatized_form_for_analysis) == 0:
+def fetch_results_for_unknown_analyses(
+    search_run: core.SearchRun, analyses: Iterable[RichAnalysis]
+):
+    """
+    Add synthetic results for analyses of the query that are not in the database
+
+    All the analyses are generated in one call to the FST, and all of their
+    possible lemmas are fetched in a single database query.
+    """
+    analyses = list(analyses)
+
+    normatized_forms = strict_generator().bulk_lookup([a.smushed() for a in analyses])
+
+    lemmas_by_text = defaultdict(list)
+    for lemma in Wordform.objects.filter(
+        text__in={a.lemma for a in analyses}, is_lemma=True
+    ):
+        lemmas_by_text[lemma.text].append(lemma)
+
+    for analysis in analyses:
+        normatized_form_for_analysis = normatized_forms.get(analysis.smushed())
+        if not normatized_form_for_analysis:
             logger.error(
                 "Cannot generate normative form for analysis: %s (query: %s)",
                 analysis,
@@ -65,14 +270,15 @@ def fetch_results(search_run: core.SearchRun):
             continue
 
         # If there are multiple forms for this analysis, use the one that is
-        # closest to what the user typed.
+        # closest to what the user typed. Sorting first breaks ties the same
+        # way every time.
         normatized_user_query = min(
-            normatized_form_for_analysis,
+            sorted(normatized_form_for_analysis),
             key=lambda f: get_modified_distance(f, search_run.internal_query),
         )
 
         possible_lemma_wordforms = best_lemma_matches(
-            analysis, Wordform.objects.filter(text=analysis.lemma, is_lemma=True)
+            analysis, lemmas_by_text[analysis.lemma]
         )
 
         for lemma_wordform in possible_lemma_wordforms:
@@ -131,27 +337,40 @@ def best_lemma_matches(analysis, possible_lemmas) -> list[Wordform]:
     ]
 
 
-def fetch_results_from_target_language_keywords(search_run):
-    for stemmed_keyword in stem_keywords(search_run.internal_query):
-        for wordform in Wordform.objects.filter(
-            target_language_keyword__text__iexact=stemmed_keyword
-        ):
-            search_run.add_result(
-                Result(wordform, target_language_keyword_match=[stemmed_keyword])
-            )
+def fetch_results_from_target_language_keywords(
+    search_run, batch: Optional[LookupBatch] = None
+):
+    """
+    Add results for wordforms with definitions containing any keyword in the query
+
+    Keywords are stored stemmed and lowercased, exactly as stem_keywords()
+    returns them, so they can be matched exactly: using the in-memory index
+    when it is available, or else the text index in a single database query.
+    """
+    if batch is None:
+        batch = lookup_batch_for(search_run)
+
+    for wordform, keywords in batch.target_language_keyword_matches(
+        search_run.internal_query
+    ):
+        search_run.add_result(Result(wordform, target_language_keyword_match=keywords))
+
 
+def fetch_results_from_source_language_keywords(
+    search_run, batch: Optional[LookupBatch] = None
+):
+    if batch is None:
+        batch = lookup_batch_for(search_run)
 
-def fetch_results_from_source_language_keywords(search_run):
-    res = SourceLanguageKeyword.objects.filter(
-        Q(text=to_source_language_keyword(search_run.internal_query))
+    keywords = batch.source_language_keyword_matches(search_run.internal_query)
+    distances = get_modified_distances(
+        search_run.internal_query, [kw.wordform.text for kw in keywords]
     )
-    for kw in res:
+    for kw, distance in zip(keywords, distances):
         search_run.add_result(
             Result(
                 kw.wordform,
                 source_language_keyword_match=[kw.text],
-                query_wordform_edit_distance=get_modified_distance(
-                    search_run.internal_query, kw.wordform.text
-                ),
+                query_wordform_edit_distance=distance,
             )
         )
@@ -1,16 +1,49 @@
 from __future__ import annotations
 
-from typing import List, Tuple, Optional, TypedDict, Iterable, Any, cast
-
+import hashlib
+from collections import defaultdict
+from functools import cached_property
+from itertools import chain
+from typing import (
+    List,
+    Tuple,
+    Optional,
+    TypedDict,
+    Iterable,
+    Any,
+    NamedTuple,
+    Sequence,
+    Union,
+    cast,
+)
+
+from django.conf import settings
+from django.db import transaction
 from django.forms import model_to_dict
 
 from CreeDictionary.utils import get_modified_distance
+from CreeDictionary.utils.bounded_cache import BoundedCache
 from . import types, core, lookup
 from CreeDictionary.utils.fst_analysis_parser import partition_analysis
-from CreeDictionary.CreeDictionary.relabelling import read_labels
-from CreeDictionary.utils.types import FSTTag, Label, ConcatAnalysis
+from CreeDictionary.CreeDictionary.relabelling import (
+    CRK_ALTERNATE_LABELS_FILE,
+    read_labels,
+)
+from CreeDictionary.utils.types import (
+    FSTTag,
+    Label,
+    ConcatAnalysis,
+    cast_away_optional,
+)
 from .types import Preverb, LinguisticTag, linguistic_tag_from_fst_tags
-from morphodict.lexicon.models import Wordform, wordform_cache
+from morphodict.lexicon.generation import PerGeneration
+from morphodict.lexicon.models import (
+    Definition,
+    LemmaSnapshot,
+    Wordform,
+    wordform_cache,
+)
+from morphodict.site.util import cache_unless
 from ..schema import SerializedWordform, SerializedDefinition, SerializedLinguisticTag
 
 
@@ -50,31 +83,62 @@ class PresentationResult:
             self.linguistic_breakdown_tail,
         ) = analysis
 
-        self.preverbs = get_preverbs_from_head_breakdown(self.linguistic_breakdown_head)
+        self._resolved_preverbs = resolve_preverbs(self.linguistic_breakdown_head)
+        self.preverbs = tuple(preverb.wordform for preverb in self._resolved_preverbs)
 
-        self.friendly_linguistic_breakdown_head = replace_user_friendly_tags(
-            list(t.strip("+") for t in self.linguistic_breakdown_head)
-        )
-        self.friendly_linguistic_breakdown_tail = replace_user_friendly_tags(
-            list(t.strip("+") for t in self.linguistic_breakdown_tail)
+        self._breakdown = get_breakdown(
+            self.linguistic_breakdown_head, self.linguistic_breakdown_tail
         )
+        self.friendly_linguistic_breakdown_head = list(self._breakdown.friendly_head)
+        self.friendly_linguistic_breakdown_tail = list(self._breakdown.friendly_tail)
+
+    def serialize(
+        self,
+        definitions: Optional[SerializedDefinitions] = None,
+        lemma_snapshots: Optional[SerializedLemmas] = None,
+    ) -> SerializedPresentationResult:
+        """
+        :param definitions: the serialized definitions of this result’s
+            wordform, unless it is a lemma, and of its lemma, unless the lemma
+            is in lemma_snapshots; as returned by serialize_definitions_of().
+        :param lemma_snapshots: as returned by read_lemma_snapshots().
+            Both are fetched if not given. Pass them in to serialize many
+            results with only a few queries.
+        """
+        if lemma_snapshots is None:
+            lemma_snapshots = read_lemma_snapshots([self.lemma_wordform])
+        if definitions is None:
+            definitions = serialize_definitions_of(
+                definitions_to_serialize(self, lemma_snapshots)
+            )
 
-    def serialize(self) -> SerializedPresentationResult:
-        ret: SerializedPresentationResult = {
-            "lemma_wordform": serialize_wordform(self.lemma_wordform),
-            "wordform_text": self.wordform.text,
-            "is_lemma": self.is_lemma,
-            "definitions": serialize_definitions(
-                self.wordform.definitions.all(),
+        lemma = lemma_snapshots.get(self.lemma_wordform.id)
+        if lemma is None:
+            lemma = serialize_wordform(
+                self.lemma_wordform,
+                definitions=definitions.get(self.lemma_wordform.id, []),
+            )
+
+        if self.is_lemma:
+            wordform_definitions = lemma["definitions"]
+        else:
+            wordform_definitions = without_auto_definitions(
+                definitions.get(self.wordform.id, []),
                 # This is the only place include_auto_definitions is used,
                 # because we only auto-translate non-lemmas, and this is the
                 # only place where a non-lemma search result appears.
                 include_auto_definitions=self._search_run.include_auto_definitions,
-            ),
-            "preverbs": [serialize_wordform(pv) for pv in self.preverbs],
+            )
+
+        ret: SerializedPresentationResult = {
+            "lemma_wordform": lemma,
+            "wordform_text": self.wordform.text,
+            "is_lemma": self.is_lemma,
+            "definitions": wordform_definitions,
+            "preverbs": [pv.serialized for pv in self._resolved_preverbs],
             "friendly_linguistic_breakdown_head": self.friendly_linguistic_breakdown_head,
             "friendly_linguistic_breakdown_tail": self.friendly_linguistic_breakdown_tail,
-            "relevant_tags": tuple(t.serialize() for t in self.relevant_tags),
+            "relevant_tags": self._breakdown.serialized_relevant_tags,
         }
         if self._search_run.query.verbose:
             cast(Any, ret)["verbose_info"] = self._result
@@ -89,25 +153,121 @@ class PresentationResult:
         In itwêwina, these tags are derived from the suffix features exclusively.
         We chunk based on the English relabelleings!
         """
-        return tuple(
-            linguistic_tag_from_fst_tags(tuple(cast(FSTTag, t) for t in fst_tags))
-            for fst_tags in read_labels().english.chunk(
-                t.strip("+") for t in self.linguistic_breakdown_tail
-            )
-        )
+        return self._breakdown.relevant_tags
 
     def __str__(self):
         return f"PresentationResult<{self.wordform}:{self.wordform.id}>"
 
 
-def serialize_wordform(wordform) -> SerializedWordform:
+class Breakdown(NamedTuple):
+    """
+    Everything about presenting a result that depends only on the tags of its
+    analysis
+    """
+
+    friendly_head: Tuple[Label, ...]
+    friendly_tail: Tuple[Label, ...]
+    relevant_tags: Tuple[LinguisticTag, ...]
+    # Shared between all results with these tags, so must not be modified
+    serialized_relevant_tags: Tuple[SerializedLinguisticTag, ...]
+
+
+# There are only a few thousand different analysis prefixes and suffixes in
+# the whole lexicon, so this holds nearly all of them.
+BREAKDOWN_CACHE_SIZE = 8192
+
+
+class _Cache:
+    """A holder for cached properties since caching module attributes is messy"""
+
+    @cached_property
+    def breakdowns(
+        self,
+    ) -> BoundedCache[tuple[Tuple[FSTTag, ...], Tuple[FSTTag, ...]], Breakdown]:
+        # Breakdowns are made of labels, so throw them away whenever the labels
+        # are reloaded
+        return BoundedCache(BREAKDOWN_CACHE_SIZE, generation=read_labels)
+
+
+_cache = _Cache()
+
+
+def get_breakdown(
+    head_tags: Iterable[FSTTag], tail_tags: Iterable[FSTTag]
+) -> Breakdown:
+    """
+    Return the breakdown of an analysis with these prefix and suffix tags
+    """
+    key = (tuple(head_tags), tuple(tail_tags))
+    return _cache.breakdowns.get_or_compute(key, lambda: _make_breakdown(*key))
+
+
+def _make_breakdown(
+    head_tags: Tuple[FSTTag, ...], tail_tags: Tuple[FSTTag, ...]
+) -> Breakdown:
+    stripped_tail = [cast(FSTTag, t.strip("+")) for t in tail_tags]
+    relevant_tags = tuple(
+        linguistic_tag_from_fst_tags(tuple(cast(FSTTag, t) for t in fst_tags))
+        for fst_tags in read_labels().english.chunk(stripped_tail)
+    )
+    return Breakdown(
+        friendly_head=tuple(
+            replace_user_friendly_tags([cast(FSTTag, t.strip("+")) for t in head_tags])
+        ),
+        friendly_tail=tuple(replace_user_friendly_tags(stripped_tail)),
+        relevant_tags=relevant_tags,
+        serialized_relevant_tags=tuple(t.serialize() for t in relevant_tags),
+    )
+
+
+def definitions_to_serialize(
+    result: Union[types.Result, PresentationResult], lemma_snapshots: SerializedLemmas
+) -> list[Wordform]:
+    """
+    Return the wordforms whose definitions serializing result needs, given
+    these lemma snapshots
+    """
+    ret = []
+    if not result.is_lemma:
+        ret.append(result.wordform)
+    if result.lemma_wordform.id not in lemma_snapshots:
+        ret.append(result.lemma_wordform)
+    return ret
+
+
+def prefetch_for_serialization(
+    results: Sequence[Union[types.Result, PresentationResult]]
+) -> PrefetchedForSerialization:
+    """
+    Fetch the lemma snapshots and definitions that serializing results needs,
+    in a few queries however many results there are.
+
+    :return: what to pass to PresentationResult.serialize() for any of results
+    """
+    lemma_snapshots = read_lemma_snapshots(r.lemma_wordform for r in results)
+    definitions = serialize_definitions_of(
+        chain.from_iterable(
+            definitions_to_serialize(r, lemma_snapshots) for r in results
+        )
+    )
+    return lemma_snapshots, definitions
+
+
+def serialize_wordform(
+    wordform, *, definitions: Optional[list[SerializedDefinition]] = None
+) -> SerializedWordform:
     """
     Intended to be passed in a JSON API or into templates.
 
+    :param definitions: the wordform’s serialized definitions, from
+        serialize_definitions_of(); fetched if not given
     :return: json parsable result
     """
+    if definitions is None:
+        definitions = serialize_definitions_of([wordform]).get(wordform.id, [])
+
     result = model_to_dict(wordform)
-    result["definitions"] = serialize_definitions(wordform.definitions.all())
+    result["definitions"] = without_auto_definitions(definitions)
     result["lemma_url"] = wordform.get_absolute_url()
 
     if wordform.linguist_info:
@@ -134,15 +294,160 @@ def serialize_wordform(wordform) -> SerializedWordform:
     return result
 
 
-def serialize_definitions(definitions, include_auto_definitions=False):
-    ret = []
-    for definition in definitions:
-        serialized = definition.serialize()
-        if include_auto_definitions or "auto" not in serialized["source_ids"]:
-            ret.append(serialized)
+def serialize_wordforms(wordforms: Iterable[Wordform]) -> list[SerializedWordform]:
+    """
+    Serialize all of wordforms, fetching their definitions all at once.
+    """
+    wordforms = list(wordforms)
+    definitions = serialize_definitions_of(wordforms)
+    return [
+        serialize_wordform(wordform, definitions=definitions.get(wordform.id, []))
+        for wordform in wordforms
+    ]
+
+
+# Change this whenever serialize_wordform() changes what it returns, so that
+# snapshots made by older code are ignored.
+SNAPSHOT_FORMAT = "2"
+
+# Lemma ID → serialized lemma
+SerializedLemmas = dict[int, SerializedWordform]
+
+
+@cache_unless(settings.DEBUG_PARADIGM_TABLES)
+def lemma_snapshot_version() -> str:
+    """
+    Identify everything besides the lemma itself that its serialization
+    depends on: this code, and the labels in altlabel.tsv.
+    """
+    digest = hashlib.sha256(SNAPSHOT_FORMAT.encode("UTF-8"))
+    digest.update(CRK_ALTERNATE_LABELS_FILE.read_bytes())
+    return digest.hexdigest()
+
+
+def read_lemma_snapshots(lemmas: Iterable[Wordform]) -> SerializedLemmas:
+    """
+    Return the snapshots of whichever of lemmas have up-to-date ones, in one
+    query.
+
+    The snapshots are fresh from the database, so callers may modify them.
+    """
+    lemma_ids = {lemma.id for lemma in lemmas if lemma.id is not None}
+    if not lemma_ids:
+        return {}
+    return dict(
+        LemmaSnapshot.objects.filter(
+            lemma_id__in=lemma_ids, version=lemma_snapshot_version()
+        ).values_list("lemma_id", "serialized")
+    )
+
+
+def serialize_lemma(lemma: Wordform) -> SerializedWordform:
+    """
+    Return the same thing as serialize_wordform(lemma), from its snapshot if it
+    has an up-to-date one.
+    """
+    if snapshot := read_lemma_snapshots([lemma]).get(lemma.id):
+        return snapshot
+    return serialize_wordform(lemma)
+
+
+def build_lemma_snapshots(
+    slugs: Optional[Iterable[str]] = None, batch_size=1000
+) -> int:
+    """
+    Replace all lemma snapshots with ones for the current contents of the
+    database.
+
+    If slugs is given, only the snapshots of the lemmas with those slugs are
+    replaced.
+
+    :return: the number of snapshots written
+    """
+    version = lemma_snapshot_version()
+    lemmas = Wordform.objects.filter(is_lemma=True)
+    snapshots = LemmaSnapshot.objects.all()
+    if slugs is not None:
+        slugs = list(slugs)
+        lemmas = lemmas.filter(slug__in=slugs)
+        snapshots = snapshots.filter(lemma__slug__in=slugs)
+    lemma_ids = list(lemmas.order_by("id").values_list("id", flat=True))
+
+    with transaction.atomic():
+        snapshots.delete()
+        for start in range(0, len(lemma_ids), batch_size):
+            lemmas = list(
+                Wordform.objects.filter(id__in=lemma_ids[start : start + batch_size])
+            )
+            LemmaSnapshot.objects.bulk_create(
+                LemmaSnapshot(lemma=lemma, version=version, serialized=serialized)
+                for lemma, serialized in zip(lemmas, serialize_wordforms(lemmas))
+            )
+    return len(lemma_ids)
+
+
+# Wordform ID → serialized definitions of that wordform
+SerializedDefinitions = dict[int, list[SerializedDefinition]]
+
+
+def serialize_definitions_of(wordforms: Iterable[Wordform]) -> SerializedDefinitions:
+    """
+    Serialize the definitions of every one of wordforms, including any
+    auto-translations.
+
+    This takes two queries however many wordforms there are, and none at all
+    if all their definitions have already been prefetched, e.g., by
+    core.prefetch_for_presentation(). Unsaved wordforms, like the synthetic
+    ones some search methods create, have no definitions and are left out.
+    """
+    ret: SerializedDefinitions = {}
+    ids_to_fetch = set()
+    for wordform in wordforms:
+        if wordform.id is None or wordform.id in ret or wordform.id in ids_to_fetch:
+            continue
+        prefetched = getattr(wordform, "_prefetched_objects_cache", {}).get(
+            "definitions"
+        )
+        if prefetched is not None:
+            ret[wordform.id] = [definition.serialize() for definition in prefetched]
+        else:
+            ids_to_fetch.add(wordform.id)
+
+    if not ids_to_fetch:
+        return ret
+
+    source_ids = defaultdict(set)
+    for definition_id, source_id in Definition.citations.through.objects.filter(
+        definition__wordform_id__in=ids_to_fetch
+    ).values_list("definition_id", "dictionarysource_id"):
+        source_ids[definition_id].add(source_id)
+
+    for wordform_id in ids_to_fetch:
+        ret[wordform_id] = []
+    for definition_id, wordform_id, text in (
+        Definition.objects.filter(wordform_id__in=ids_to_fetch)
+        .order_by("id")
+        .values_list("id", "wordform_id", "text")
+    ):
+        # The same thing Definition.serialize() returns
+        ret[wordform_id].append(
+            {"text": text, "source_ids": sorted(source_ids[definition_id])}
+        )
     return ret
 
 
+# The lemma snapshots and definitions of some results, to serialize them with
+PrefetchedForSerialization = tuple[SerializedLemmas, SerializedDefinitions]
+
+
+def without_auto_definitions(
+    definitions: list[SerializedDefinition], include_auto_definitions=False
+) -> list[SerializedDefinition]:
+    if include_auto_definitions:
+        return definitions
+    return [d for d in definitions if "auto" not in d["source_ids"]]
+
+
 def safe_partition_analysis(analysis: ConcatAnalysis):
     try:
         (
@@ -181,46 +486,78 @@ def get_emoji_for_cree_wordclass(word_class: Optional[str]) -> Optional[str]:
     return read_labels().emoji.get_longest(tags)
 
 
-def get_preverbs_from_head_breakdown(
-    head_breakdown: List[FSTTag],
-) -> Tuple[Preverb, ...]:
-    results = []
+class ResolvedPreverb(NamedTuple):
+    wordform: Preverb
+    # Shared between all results with this preverb, so must not be modified
+    serialized: SerializedWordform
+
 
-    for tag in head_breakdown:
-        preverb_result: Optional[Preverb] = None
-        if tag.startswith("PV/"):
-            # use altlabel.tsv to figure out the preverb
+def _load_preverb_table(generation: str) -> dict[FSTTag, ResolvedPreverb]:
+    """
+    Resolve every preverb tag to its wordform, and serialize them all
 
+    This does all the database work for presenting preverbs, in a couple of
+    queries, so that presenting results doesn’t have to.
+    """
+    normative_texts = {}
+    for tag, ling_short in read_labels().linguistic_short.items():
+        if tag.startswith("PV/") and ling_short:
             # ling_short looks like: "Preverb: âpihci-"
-            ling_short = read_labels().linguistic_short.get(
-                cast(FSTTag, tag.rstrip("+"))
+            normative_texts[tag] = ling_short[len("Preverb: ") :]
+
+    preverbs_by_text = defaultdict(list)
+    for preverb in Wordform.objects.filter(
+        text__in=set(normative_texts.values()), raw_analysis__isnull=True
+    ):
+        preverbs_by_text[preverb.text].append(preverb)
+
+    resolved = {}
+    for tag, normative_preverb_text in normative_texts.items():
+        if preverb_results := preverbs_by_text[normative_preverb_text]:
+            # find the one that looks the most similar
+            preverb = min(
+                preverb_results,
+                key=lambda pr: get_modified_distance(
+                    normative_preverb_text,
+                    pr.text.strip("-"),
+                ),
             )
-            if ling_short is not None and ling_short != "":
-                # convert to "âpihci" by dropping prefix and last character
-                normative_preverb_text = ling_short[len("Preverb: ") :]
-                preverb_results = Wordform.objects.filter(
-                    text=normative_preverb_text, raw_analysis__isnull=True
-                )
-
-                # find the one that looks the most similar
-                if preverb_results:
-                    preverb_result = min(
-                        preverb_results,
-                        key=lambda pr: get_modified_distance(
-                            normative_preverb_text,
-                            pr.text.strip("-"),
-                        ),
-                    )
-
-                else:
-                    # Can't find a match for the preverb in the database.
-                    # This happens when searching against the test database for
-                    # ê-kî-nitawi-kâh-kîmôci-kotiskâwêyâhk, as the test database
-                    # lacks lacks ê and kî.
-                    preverb_result = Wordform(
-                        text=normative_preverb_text, is_lemma=True
-                    )
-
-        if preverb_result is not None:
-            results.append(preverb_result)
-    return tuple(results)
+        else:
+            # Can't find a match for the preverb in the database.
+            # This happens when searching against the test database for
+            # ê-kî-nitawi-kâh-kîmôci-kotiskâwêyâhk, as the test database
+            # lacks lacks ê and kî.
+            preverb = Wordform(text=normative_preverb_text, is_lemma=True)
+        resolved[tag] = preverb
+
+    return {
+        tag: ResolvedPreverb(preverb, serialized)
+        for (tag, preverb), serialized in zip(
+            resolved.items(), serialize_wordforms(resolved.values())
+        )
+    }
+
+
+_preverb_table = PerGeneration(_load_preverb_table)
+
+
+def preload():
+    """Build the preverb table now, instead of when first presenting results"""
+    _preverb_table.get()
+    lemma_snapshot_version()
+
+
+def resolve_preverbs(head_breakdown: List[FSTTag]) -> Tuple[ResolvedPreverb, ...]:
+    """
+    Return the preverbs for the PV/ tags in head_breakdown, in order
+
+    The preverbs are looked up in a table that is built once per lexicon
+    generation, from the linguistic short labels in altlabel.tsv.
+    """
+    table = cast_away_optional(_preverb_table.get())
+    return tuple(
+        preverb
+        for tag in head_breakdown
+        if tag.startswith("PV/")
+        and (preverb := table.get(cast(FSTTag, tag.rstrip("+")))) is not None
+    )
@@ -33,8 +33,27 @@ def assign_relevance_score(result: types.Result):
             - _default_if_none(result.morpheme_ranking, default=20)
             + (1 if result.is_lemma else 0)
         )
-    else:
+    elif result.source_language_fuzzy_match:
+        # Near misses are only looked for when nothing matched the query in
+        # the source language, and then they are probably what the user meant,
+        # so rank them the same way, below any real matches.
+        result.relevance_score = (
+            500
+            - 20 * _default_if_none(result.query_wordform_edit_distance, default=0)
+            - _default_if_none(result.morpheme_ranking, default=20)
+            + (1 if result.is_lemma else 0)
+        )
+    elif result.source_language_infix_match:
+        # Only the middle of the wordform matched, which is a weaker hint than
+        # a near miss, but still better than any English match.
         result.relevance_score = (
+            250
+            - 20 * _default_if_none(result.query_wordform_edit_distance, default=0)
+            - _default_if_none(result.morpheme_ranking, default=20)
+            + (1 if result.is_lemma else 0)
+        )
+    else:
+        score = (
             # See weighting.ipynb for the model that produced these coefficients.
             0.0559011609
             + -0.0005685605 * result.wordform_length
@@ -44,3 +63,12 @@ def assign_relevance_score(result: types.Result):
             + -0.1190890019
             * log(1 + _default_if_none(result.cosine_vector_distance, default=1.1))
         )
+        # Not in the model. Matching only inside an English keyword is a weak
+        # hint, so those results go below others with similar scores.
+        if result.target_language_infix_match and not (
+            result.target_language_keyword_match
+            or result.target_language_affix_match
+            or result.cosine_vector_distance is not None
+        ):
+            score -= 0.05
+        result.relevance_score = score
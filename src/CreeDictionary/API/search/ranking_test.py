@@ -52,3 +52,35 @@ def test_model_evaluation(expected, kwargs):
     result = build_result(**kwargs)
     assign_relevance_score(result)
     assert result.relevance_score == approx(expected, abs=1e-6)
+
+
+def test_fuzzy_matches_rank_between_source_and_target_language_matches():
+    source = build_result(source_language_match="x", query_wordform_edit_distance=2)
+    fuzzy = build_result(
+        source_language_fuzzy_match=True, query_wordform_edit_distance=0
+    )
+    target = build_result(target_language_keyword_match_len=5)
+    for result in [source, fuzzy, target]:
+        assign_relevance_score(result)
+
+    assert sorted([target, fuzzy, source]) == [source, fuzzy, target]
+
+
+def test_infix_matches_rank_between_fuzzy_and_target_language_matches():
+    fuzzy = build_result(
+        source_language_fuzzy_match=True, query_wordform_edit_distance=2
+    )
+    infix = build_result(
+        source_language_infix_match=True, query_wordform_edit_distance=0
+    )
+    target = build_result(target_language_keyword_match_len=1)
+    target_infix = build_result(target_language_infix_match=True)
+    for result in [fuzzy, infix, target, target_infix]:
+        assign_relevance_score(result)
+
+    assert sorted([target_infix, target, infix, fuzzy]) == [
+        fuzzy,
+        infix,
+        target,
+        target_infix,
+    ]
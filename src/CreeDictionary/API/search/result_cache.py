@@ -0,0 +1,52 @@
+"""
+Process-wide cache of finished searches.
+
+Query traffic is heavily skewed towards a few hundred popular queries, so
+remembering complete SearchRuns saves redoing FST analysis, keyword lookups,
+affix search, CVD and ranking for most requests.
+
+The cache is cleared automatically whenever `importjsondict` changes the
+lexicon; see morphodict.lexicon.generation.
+"""
+
+from functools import cached_property
+from typing import Hashable
+
+from django.conf import settings
+
+from CreeDictionary.utils.bounded_cache import BoundedCache
+from morphodict.lexicon.generation import current_lexicon_generation
+from . import core
+
+
+def search_cache_key(search_run: core.SearchRun, *, include_affixes: bool) -> Hashable:
+    """
+    Return a key identifying everything that can change the results of a search.
+
+    Two queries that only differ in case, whitespace, diacritic composition or
+    orthography normalize to the same query string and share a key.
+    """
+    query = search_run.query
+    return (
+        query.query_string,
+        include_affixes,
+        search_run.include_auto_definitions,
+        query.verbose,
+        query.cvd,
+        query.espt,
+    )
+
+
+class _Cache:
+    """A holder for cached properties since caching module attributes is messy"""
+
+    @cached_property
+    def search_results(self) -> BoundedCache[Hashable, core.SearchRun]:
+        return BoundedCache(
+            settings.SEARCH_RESULT_CACHE_SIZE,
+            ttl=settings.SEARCH_RESULT_CACHE_TTL_SECONDS,
+            generation=current_lexicon_generation,
+        )
+
+
+cache = _Cache()
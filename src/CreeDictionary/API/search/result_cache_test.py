@@ -0,0 +1,44 @@
+import pytest
+
+from CreeDictionary.API.search import search
+from CreeDictionary.API.search.result_cache import cache
+from morphodict.lexicon import generation
+
+
+@pytest.fixture
+def generation_file(tmp_path, monkeypatch):
+    path = tmp_path / "lexicon_generation"
+    monkeypatch.setattr(generation, "lexicon_generation_path", lambda: path)
+    generation.bump_lexicon_generation()
+    return path
+
+
+@pytest.mark.django_db
+def test_normalized_queries_share_cached_result(generation_file):
+    first = search(query="wâpamêw")
+    assert search(query="  WÂPAMÊW ") is first
+
+
+@pytest.mark.django_db
+def test_flags_are_part_of_the_key(generation_file):
+    plain = search(query="wâpamêw")
+    assert search(query="wâpamêw verbose:1") is not plain
+    assert search(query="wâpamêw", include_affixes=False) is not plain
+    assert search(query="wâpamêw", include_auto_definitions=True) is not plain
+
+
+@pytest.mark.django_db
+def test_use_cache_false_bypasses_cache(generation_file):
+    first = search(query="wâpamêw")
+    assert search(query="wâpamêw", use_cache=False) is not first
+
+
+@pytest.mark.django_db
+def test_import_invalidates_cache(generation_file):
+    first = search(query="wâpamêw")
+    invalidations = cache.search_results.stats().invalidations
+
+    generation.bump_lexicon_generation()
+
+    assert search(query="wâpamêw") is not first
+    assert cache.search_results.stats().invalidations == invalidations + 1
@@ -1,4 +1,9 @@
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
 
 from CreeDictionary.API.search.affix import (
     do_source_language_affix_search,
@@ -8,8 +13,14 @@ from CreeDictionary.API.search.affix import (
 from CreeDictionary.API.search.core import SearchRun
 from CreeDictionary.API.search.cvd_search import do_cvd_search
 from CreeDictionary.API.search.espt import EsptSearch
-from CreeDictionary.API.search.lookup import fetch_results
+from CreeDictionary.API.search.fuzzy import do_fuzzy_lemma_search
+from CreeDictionary.API.search.infix import (
+    do_source_language_infix_search,
+    do_target_language_infix_search,
+)
+from CreeDictionary.API.search.lookup import LookupBatch, fetch_results
 from CreeDictionary.API.search.query import CvdSearchType
+from CreeDictionary.API.search import result_cache
 from CreeDictionary.API.search.util import first_non_none_value
 from CreeDictionary.utils.types import cast_away_optional
 
@@ -17,21 +28,119 @@ CREE_LONG_VOWEL = re.compile("[êîôâēīōā]")
 
 
 def search(
-    *, query: str, include_affixes=True, include_auto_definitions=False
+    *,
+    query: str,
+    include_affixes=True,
+    include_auto_definitions=False,
+    use_cache=True,
+    concurrent: Optional[bool] = None,
 ) -> SearchRun:
     """
     Perform an actual search, using the provided options.
 
-    This class encapsulates the logic of which search methods to try, and in
-    which order, to build up results in a SearchRun.
+    Finished searches are cached, so the returned SearchRun may be shared with
+    other callers and must not be modified. Pass use_cache=False to always run
+    a fresh search, e.g., when timing searches.
+
+    If concurrent is True, the independent search stages run at the same time
+    in a thread pool; the results are identical either way. The default comes
+    from the SEARCH_CONCURRENT_STAGES setting.
     """
     search_run = SearchRun(
         query=query, include_auto_definitions=include_auto_definitions
     )
+    if concurrent is None:
+        concurrent = settings.SEARCH_CONCURRENT_STAGES
+
+    def run():
+        return _run_search(
+            search_run, include_affixes=include_affixes, concurrent=concurrent
+        )
+
+    if not use_cache:
+        return run()
+
+    return result_cache.cache.search_results.get_or_compute(
+        result_cache.search_cache_key(search_run, include_affixes=include_affixes),
+        run,
+    )
+
+
+def search_many(
+    *,
+    queries: Iterable[str],
+    include_affixes=True,
+    include_auto_definitions=False,
+    use_cache=True,
+    concurrent: Optional[bool] = None,
+) -> dict[str, SearchRun]:
+    """
+    Search for every one of queries, returning a dict from query to SearchRun.
+
+    The results are the same as calling search() for each query, but queries
+    that normalize to the same thing are only searched once, and the keyword,
+    FST and database lookups are done for all of the queries together.
+    """
+    if concurrent is None:
+        concurrent = settings.SEARCH_CONCURRENT_STAGES
+    cache = result_cache.cache.search_results
+
+    # cache key → (search run, the queries it answers)
+    unique_runs: dict[object, tuple[SearchRun, list[str]]] = {}
+    for query in queries:
+        search_run = SearchRun(
+            query=query, include_auto_definitions=include_auto_definitions
+        )
+        key = result_cache.search_cache_key(search_run, include_affixes=include_affixes)
+        unique_runs.setdefault(key, (search_run, []))[1].append(query)
+
+    batch = LookupBatch(
+        search_run.internal_query
+        for key, (search_run, _) in unique_runs.items()
+        if not (use_cache and key in cache)
+    )
+
+    ret = {}
+    for key, (search_run, queries_for_run) in unique_runs.items():
+
+        def run(search_run=search_run):
+            search_run.lookup_batch = batch
+            try:
+                return _run_search(
+                    search_run, include_affixes=include_affixes, concurrent=concurrent
+                )
+            finally:
+                # Don’t keep the whole batch alive in the result cache
+                search_run.lookup_batch = None
+
+        finished_run = cache.get_or_compute(key, run) if use_cache else run()
+        for query in queries_for_run:
+            ret[query] = finished_run
+    return ret
+
+
+def _run_search(
+    search_run: SearchRun, *, include_affixes: bool, concurrent: bool
+) -> SearchRun:
+    with search_run.timed_stage("search"):
+        _run_search_stages(
+            search_run, include_affixes=include_affixes, concurrent=concurrent
+        )
+    search_run.report_timings()
+    return search_run
+
 
+def _run_search_stages(
+    search_run: SearchRun, *, include_affixes: bool, concurrent: bool
+):
+    """
+    This function encapsulates the logic of which search methods to try, and in
+    which order, to build up results in a SearchRun.
+    """
     if search_run.query.espt:
         espt_search = EsptSearch(search_run)
-        espt_search.analyze_query()
+        with search_run.timed_stage("espt_analyze"):
+            espt_search.analyze_query()
 
     cvd_search_type = cast_away_optional(
         first_non_none_value(search_run.query.cvd, default=CvdSearchType.DEFAULT)
@@ -39,24 +148,100 @@ def search(
 
     # For when you type 'cvd:exclusive' in a query to debug ONLY CVD results!
     if cvd_search_type == CvdSearchType.EXCLUSIVE:
-        do_cvd_search(search_run)
-        return search_run
+        run_timed_stage(do_cvd_search, search_run)
+        return
 
-    fetch_results(search_run)
+    # None of these stages looks at the results of any other, so they can run
+    # in any order, or all at once.
+    stages: list[SearchStage] = [fetch_results]
 
     if include_affixes and not query_would_return_too_many_results(
         search_run.internal_query
     ):
-        do_source_language_affix_search(search_run)
-        do_target_language_affix_search(search_run)
+        stages.append(do_source_language_affix_search)
+        stages.append(do_target_language_affix_search)
+        if settings.INFIX_SEARCH:
+            stages.append(do_source_language_infix_search)
+            stages.append(do_target_language_infix_search)
 
-    if cvd_search_type.should_do_search() and not is_almost_certainly_cree(search_run):
-        do_cvd_search(search_run)
+    if cvd_search_type.should_do_search():
+        stages.append(do_cvd_search_unless_cree)
+
+    if concurrent:
+        run_stages_concurrently(search_run, stages)
+    else:
+        for stage in stages:
+            run_timed_stage(stage, search_run)
+
+    if include_affixes and should_do_fuzzy_search(search_run):
+        run_timed_stage(do_fuzzy_lemma_search, search_run)
 
     if search_run.query.espt:
-        espt_search.inflect_search_results()
+        with search_run.timed_stage("espt_inflect"):
+            espt_search.inflect_search_results()
 
-    return search_run
+
+SearchStage = Callable[[SearchRun], None]
+
+
+def run_timed_stage(stage: SearchStage, search_run: SearchRun):
+    with search_run.timed_stage(stage.__name__):
+        stage(search_run)
+
+
+def run_stages_concurrently(search_run: SearchRun, stages: list[SearchStage]):
+    """
+    Run each stage on its own fork of search_run in the stage thread pool.
+
+    The forks are merged back in the order the stages are listed, so the
+    results are exactly the same as running the stages one after another.
+    """
+    forks = [search_run.fork() for _ in stages]
+    futures = [
+        _stage_executor().submit(run_timed_stage, stage, fork)
+        for stage, fork in zip(stages, forks)
+    ]
+    for future, fork in zip(futures, forks):
+        # Re-raises any exception from the stage
+        future.result()
+        search_run.merge(fork)
+
+
+@cache
+def _stage_executor() -> ThreadPoolExecutor:
+    # Created on first use, and not at import time, so that server processes
+    # forked after startup don’t inherit a pool whose threads didn’t survive
+    # the fork.
+    #
+    # Each thread keeps its own database connection open for reuse.
+    return ThreadPoolExecutor(
+        max_workers=settings.SEARCH_STAGE_THREADS, thread_name_prefix="search-stage"
+    )
+
+
+def should_do_fuzzy_search(search_run: SearchRun) -> bool:
+    """
+    Whether to look for lemmas spelled almost like the query
+
+    Only when nothing matched the query itself, in either language: otherwise
+    it is probably not a misspelled source-language word. Nor for several words,
+    or for long queries, which take a lot of time and memory to find variants
+    of.
+    """
+    query = search_run.internal_query
+    if query_would_return_too_many_results(query):
+        return False
+    if len(query) > settings.FUZZY_SEARCH_MAX_QUERY_LENGTH or len(query.split()) > 1:
+        return False
+    return not any(
+        result.did_match_source_language or result.target_language_keyword_match
+        for result in search_run.unsorted_results()
+    )
+
+
+def do_cvd_search_unless_cree(search_run: SearchRun):
+    if not is_almost_certainly_cree(search_run):
+        do_cvd_search(search_run)
 
 
 def is_almost_certainly_cree(search_run: SearchRun) -> bool:
@@ -0,0 +1,134 @@
+"""
+An index from the surface forms of analyzed wordforms to their IDs.
+
+`importjsondict` stores every form in every paradigm, with its analysis. So
+when a Cree query is spelled exactly like one of those forms, which most are,
+its analyses can be read from the database instead of asking the relaxed FST,
+the slowest step of a Cree search. The FST is still used for everything else:
+misspellings, forms left out of the paradigms, and English queries.
+
+A form can also have readings that no paradigm cell stores, e.g., with initial
+change, reduplication or derivations, or spelling-relaxed readings of other
+words. So when the index is built, each stored form is run through the relaxed
+FST, and only the forms whose stored analyses are exactly the FST’s are
+indexed. Searching for any other form goes through the FST as before, so both
+ways give the same results.
+
+The index maps the to_source_language_keyword() form of each indexed
+wordform’s text to the IDs of the wordforms with that form. Wordforms that only
+differ in diacritics share a key, so callers check the exact text of what they
+fetch.
+
+Like the English keyword index, this is a memory-mapped file written by
+`manage.py buildsearchindexes`. If it is missing or stale, lookups return None
+and every query goes through the FST.
+"""
+
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from morphodict.analysis import RichAnalysis, relaxed_analyzer
+from morphodict.lexicon.generation import PerGeneration
+from morphodict.lexicon.id_index import IdIndex, IdIndexError, write_id_index
+from morphodict.lexicon.models import Wordform
+from morphodict.lexicon.util import to_source_language_keyword
+from .index_files import search_index_path
+
+logger = logging.getLogger(__name__)
+
+
+def surface_form_index_path() -> Path:
+    return search_index_path("surface_forms.idx")
+
+
+def build_surface_form_index(generation: str) -> int:
+    """
+    Write the index file for the current contents of the database.
+
+    :return: the number of distinct keys in the index
+    """
+    ids_by_text: dict[str, list[int]] = defaultdict(list)
+    analyses_by_text: dict[str, set[RichAnalysis]] = defaultdict(set)
+    for text, raw_analysis, wordform_id in (
+        Wordform.objects.filter(raw_analysis__isnull=False)
+        .values_list("text", "raw_analysis", "id")
+        .iterator()
+    ):
+        ids_by_text[text].append(wordform_id)
+        analyses_by_text[text].add(RichAnalysis(raw_analysis))
+
+    form_to_ids: dict[str, list[int]] = defaultdict(list)
+    left_to_fst = 0
+    for text, ids in ids_by_text.items():
+        if analyses_by_text[text] != fst_analyses(text):
+            left_to_fst += 1
+            continue
+        if form := to_source_language_keyword(text):
+            form_to_ids[form].extend(ids)
+    logger.info(
+        f"{left_to_fst:,} of {len(ids_by_text):,} surface forms have readings"
+        " that aren’t stored, and are left to the relaxed FST"
+    )
+
+    write_id_index(surface_form_index_path(), form_to_ids, generation=generation)
+    return len(form_to_ids)
+
+
+def fst_analyses(text: str) -> set[RichAnalysis]:
+    """
+    The relaxed FST’s analyses of text
+
+    This doesn’t go through the analysis cache, which is meant for queries.
+    """
+    return {
+        RichAnalysis(analysis)
+        for analysis in relaxed_analyzer().lookup_lemma_with_affixes(text)
+    }
+
+
+def _load_index(generation: str) -> Optional[IdIndex]:
+    path = surface_form_index_path()
+    try:
+        return IdIndex(path, expected_generation=generation)
+    except FileNotFoundError:
+        logger.warning(
+            "%s not found; run `manage.py buildsearchindexes` for faster Cree search",
+            path,
+        )
+    except IdIndexError as e:
+        logger.warning("Not using surface form index: %s", e)
+    return None
+
+
+_surface_form_index = PerGeneration(_load_index)
+
+
+def preload():
+    """Open the index now, instead of on the first search"""
+    _surface_form_index.get()
+
+
+def lookup_surface_forms(
+    queries: Iterable[str],
+) -> Optional[dict[str, Sequence[int]]]:
+    """
+    Return the IDs of the analyzed wordforms that might be spelled like each
+    query: those with the same to_source_language_keyword() form. If there
+    are any spelled exactly like the query, their analyses are all of the
+    relaxed FST’s analyses of the query.
+
+    Queries that match nothing are left out of the returned dict. Returns None
+    if the index is not available for the current lexicon.
+    """
+    index = _surface_form_index.get()
+    if index is None:
+        return None
+
+    ret = {}
+    for query in queries:
+        ids = index.get(to_source_language_keyword(query))
+        if ids:
+            ret[query] = ids
+    return ret
@@ -0,0 +1,156 @@
+"""
+Per-stage timing of searches.
+
+Every SearchRun records a StageTiming for each stage it goes through: the
+search methods run by runner.py, and presentation. Timings are:
+
+  - shown with the other verbose messages for `verbose:1` queries;
+  - logged as one JSON line per search, at WARNING level if the search took
+    longer than settings.SEARCH_SLOW_QUERY_SECONDS, and DEBUG level otherwise;
+  - added to per-process histograms, which staff can see at
+    /admin/search-stats.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import Lock
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageTiming:
+    name: str
+    seconds: float = 0.0
+    # How many things the stage came up with, e.g., results added, FST
+    # analyses, or nearest vectors
+    candidates: Optional[int] = None
+
+    def serialize(self):
+        return {
+            "stage": self.name,
+            "ms": round(self.seconds * 1000, 3),
+            "candidates": self.candidates,
+        }
+
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[StageTiming]:
+    """
+    Time the body of the with statement.
+
+    Prefer SearchRun.timed_stage(), which also records the timing.
+    """
+    timing = StageTiming(name)
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.seconds = time.perf_counter() - start
+
+
+class StageHistograms:
+    """
+    Thread-safe latency histograms, one per stage name.
+    """
+
+    # Upper bounds of the buckets, in milliseconds; anything slower goes into
+    # a final, unbounded bucket.
+    BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self._mutex = Lock()
+        self._stages: dict[str, _Histogram] = {}
+
+    def record(self, timings: Iterable[StageTiming]):
+        with self._mutex:
+            for timing in timings:
+                histogram = self._stages.get(timing.name)
+                if histogram is None:
+                    histogram = self._stages[timing.name] = _Histogram(
+                        len(self.BUCKET_BOUNDS_MS) + 1
+                    )
+                histogram.add(
+                    bisect.bisect_left(self.BUCKET_BOUNDS_MS, timing.seconds * 1000),
+                    timing,
+                )
+
+    def clear(self):
+        with self._mutex:
+            self._stages.clear()
+
+    def as_dict(self):
+        bucket_names = [f"<={bound}ms" for bound in self.BUCKET_BOUNDS_MS] + [
+            f">{self.BUCKET_BOUNDS_MS[-1]}ms"
+        ]
+        with self._mutex:
+            return {
+                name: {
+                    "count": histogram.count,
+                    "total_ms": round(histogram.total_seconds * 1000, 3),
+                    "max_ms": round(histogram.max_seconds * 1000, 3),
+                    "candidates": histogram.candidates,
+                    "buckets": dict(zip(bucket_names, histogram.buckets)),
+                }
+                for name, histogram in sorted(self._stages.items())
+            }
+
+
+class _Histogram:
+    def __init__(self, bucket_count: int):
+        self.buckets = [0] * bucket_count
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.candidates = 0
+
+    def add(self, bucket: int, timing: StageTiming):
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total_seconds += timing.seconds
+        self.max_seconds = max(self.max_seconds, timing.seconds)
+        if timing.candidates is not None:
+            self.candidates += timing.candidates
+
+
+stage_histograms = StageHistograms()
+
+
+def report_timings(query: str, kind: str, timings: list[StageTiming]):
+    """
+    Add timings to the histograms, and log them.
+
+    :param kind: "search" or "presentation"
+    """
+    stage_histograms.record(timings)
+
+    # Only top-level stages count towards the total; the other stages are
+    # nested inside them.
+    total_seconds = sum(t.seconds for t in timings if "." not in t.name)
+    is_slow = total_seconds >= settings.SEARCH_SLOW_QUERY_SECONDS
+    level = logging.WARNING if is_slow else logging.DEBUG
+    if logger.isEnabledFor(level):
+        logger.log(
+            level,
+            "%s %s timings: %s",
+            "slow" if is_slow else "normal",
+            kind,
+            json.dumps(
+                {
+                    "query": query,
+                    "kind": kind,
+                    "total_ms": round(total_seconds * 1000, 3),
+                    "stages": [t.serialize() for t in timings],
+                },
+                ensure_ascii=False,
+            ),
+        )
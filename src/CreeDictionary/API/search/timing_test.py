@@ -0,0 +1,93 @@
+import logging
+
+import pytest
+
+from CreeDictionary.API.search import search
+from CreeDictionary.API.search.timing import (
+    StageHistograms,
+    StageTiming,
+    report_timings,
+)
+
+
+def test_histogram_buckets():
+    histograms = StageHistograms()
+    histograms.record(
+        [
+            StageTiming("search", seconds=0.0005, candidates=3),
+            StageTiming("search", seconds=0.15, candidates=4),
+            StageTiming("search", seconds=60),
+            StageTiming("presentation", seconds=0.003),
+        ]
+    )
+
+    stats = histograms.as_dict()
+    assert list(stats) == ["presentation", "search"]
+
+    search_stats = stats["search"]
+    assert search_stats["count"] == 3
+    assert search_stats["candidates"] == 7
+    assert search_stats["max_ms"] == 60_000
+    assert search_stats["buckets"]["<=1ms"] == 1
+    assert search_stats["buckets"]["<=200ms"] == 1
+    assert search_stats["buckets"][">5000ms"] == 1
+    assert sum(search_stats["buckets"].values()) == 3
+
+    assert stats["presentation"]["buckets"]["<=5ms"] == 1
+
+
+def test_slow_searches_are_warnings(settings, caplog):
+    settings.SEARCH_SLOW_QUERY_SECONDS = 1
+    caplog.set_level(logging.DEBUG, logger="CreeDictionary.API.search.timing")
+
+    report_timings(
+        "fast",
+        "search",
+        [StageTiming("search", seconds=0.5), StageTiming("search.x", seconds=0.5)],
+    )
+    report_timings("slow", "search", [StageTiming("search", seconds=1.5)])
+
+    (fast, slow) = caplog.records
+    assert fast.levelno == logging.DEBUG
+    assert '"total_ms": 500.0' in fast.getMessage()
+    assert slow.levelno == logging.WARNING
+    assert '"query": "slow"' in slow.getMessage()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_search_records_stage_timings(concurrent):
+    search_run = search(query="wâpamêw", use_cache=False, concurrent=concurrent)
+    result_page = search_run.serialized_presentation_results_page(1, 10)
+
+    names = [t.name for t in search_run.timings + result_page.presentation_timings]
+    for expected in [
+        "search",
+        "search.fetch_results",
+        "search.fetch_results.relaxed_fst",
+        "search.do_source_language_affix_search",
+        "presentation",
+        "presentation.prefetch",
+        "presentation.serialize",
+    ]:
+        assert expected in names
+
+    (total,) = [t for t in search_run.timings if t.name == "search"]
+    assert total.candidates >= search_run.result_count() > 0
+
+
+@pytest.mark.django_db
+def test_presenting_leaves_cached_search_run_alone():
+    """
+    Finished search runs are cached and presented concurrently, so
+    presentation timings belong to the page, not to the search run.
+    """
+    search_run = search(query="wâpamêw", use_cache=False)
+    timings = list(search_run.timings)
+
+    first = search_run.serialized_presentation_results_page(1, 3)
+    second = search_run.serialized_presentation_results_page(2, 3)
+
+    assert search_run.timings == timings
+    assert first.presentation_timings[0].name == "presentation"
+    assert first.presentation_timings is not second.presentation_timings
@@ -123,7 +123,11 @@ class Result:
         self.lemma_wordform = self.wordform.lemma
         self.wordform_length = len(self.wordform.text)
 
-        if self.did_match_source_language and self.query_wordform_edit_distance is None:
+        if (
+            self.did_match_source_language
+            or self.source_language_fuzzy_match
+            or self.source_language_infix_match
+        ) and self.query_wordform_edit_distance is None:
             raise Exception("must include edit distance on source language matches")
 
         if self.morpheme_ranking is None:
@@ -187,7 +191,7 @@ class Result:
         return new_result
 
     wordform: Wordform
-    lemma_wordform: Lemma = field(init=False)
+    lemma_wordform: Wordform = field(init=False)
     is_lemma: bool = field(init=False)
     wordform_length: int = field(init=False)
 
@@ -198,6 +202,14 @@ class Result:
     source_language_affix_match: Optional[bool] = None
     target_language_affix_match: Optional[bool] = None
 
+    #: Was the wordform spelled almost like the query, without matching it?
+    source_language_fuzzy_match: Optional[bool] = None
+
+    #: Did the query appear somewhere inside the wordform, or inside one of its
+    #: target-language keywords?
+    source_language_infix_match: Optional[bool] = None
+    target_language_infix_match: Optional[bool] = None
+
     target_language_keyword_match: list[str] = field(default_factory=list)
 
     analyzable_inflection_match: Optional[bool] = None
@@ -1,8 +1,17 @@
+import json
+
 from django.conf import settings
 from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, Http404
 from django.shortcuts import render
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from CreeDictionary.CreeDictionary.utils import page_number_from_request
+from .search import search, simple_search_many
+from .search.query import Query
 
-from .search import simple_search
+# The most tokens one click-in-text batch request may ask about
+MAX_CLICK_IN_TEXT_BATCH_TOKENS = 2000
 
 
 def click_in_text(request) -> HttpResponse:
@@ -17,9 +26,75 @@ def click_in_text(request) -> HttpResponse:
     elif q == "":
         return HttpResponseBadRequest("query param q is an empty string")
 
-    results = simple_search(q, include_auto_definitions=False)
+    try:
+        page = page_number_from_request(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    result_page = search(
+        query=q, include_affixes=False, include_auto_definitions=False
+    ).serialized_presentation_results_page(page, settings.SEARCH_RESULTS_PAGE_SIZE)
+
+    # next_page is null on the last page; otherwise, pass it as the page
+    # parameter to get more results.
+    response = {"results": result_page.results, "next_page": result_page.next_page}
+
+    json_response = JsonResponse(response)
+    json_response["Access-Control-Allow-Origin"] = "*"
+    return json_response
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def click_in_text_batch(request) -> HttpResponse:
+    """
+    click-in-text api for many tokens at once, e.g., every word of a paragraph
+
+    Tokens are given either as repeated q query params, or as a POST with a
+    JSON body of the form {"q": ["token", ...]}. Cross-origin callers can send
+    the body as text/plain to avoid a CORS preflight request.
+
+    The response maps each token to the first page of its results, in the
+    same format as a single click-in-text response:
+
+        {"tokens": {"token": {"results": [...], "next_page": 2}, ...}}
+
+    Get more results for a token from the single-token click-in-text api.
+    """
+    if request.method == "POST":
+        try:
+            tokens = json.loads(request.body)["q"]
+        except (ValueError, KeyError, TypeError):
+            return HttpResponseBadRequest('expected a JSON body like {"q": [...]}')
+        if not isinstance(tokens, list) or not all(isinstance(t, str) for t in tokens):
+            return HttpResponseBadRequest("q must be a list of strings")
+    else:
+        tokens = request.GET.getlist("q")
+
+    if not tokens:
+        return HttpResponseBadRequest("query param q missing")
+    if len(tokens) > MAX_CLICK_IN_TEXT_BATCH_TOKENS:
+        return HttpResponseBadRequest(
+            f"at most {MAX_CLICK_IN_TEXT_BATCH_TOKENS} tokens may be looked up at once"
+        )
+
+    # Tokens like punctuation normalize to nothing, and have no results
+    searchable_tokens = [t for t in set(tokens) if Query(t).is_valid]
+    pages = simple_search_many(
+        searchable_tokens,
+        page_size=settings.SEARCH_RESULTS_PAGE_SIZE,
+        include_auto_definitions=False,
+    )
 
-    response = {"results": results}
+    response = {
+        "tokens": {
+            token: {
+                "results": pages[token].results if token in pages else [],
+                "next_page": pages[token].next_page if token in pages else None,
+            }
+            for token in tokens
+        }
+    }
 
     json_response = JsonResponse(response)
     json_response["Access-Control-Allow-Origin"] = "*"
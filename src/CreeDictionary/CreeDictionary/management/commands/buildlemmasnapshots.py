@@ -0,0 +1,26 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from CreeDictionary.API.search.presentation import build_lemma_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """Serialize every lemma ahead of time, for presentation to read back.
+
+    `importjsondict` runs this automatically. Run it after deploying changes to
+    the label files, too: until then, lemmas are serialized on the fly.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--slugs",
+            nargs="+",
+            help="Only redo the snapshots of the lemmas with these slugs",
+        )
+
+    def handle(self, *args, slugs, **options):
+        count = build_lemma_snapshots(slugs)
+        logger.info(f"Wrote {count:,} lemma snapshots")
@@ -0,0 +1,55 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from CreeDictionary.API.search.affix import affix_index_paths, build_affix_indexes
+from CreeDictionary.API.search.fuzzy import (
+    build_fuzzy_lemma_index,
+    fuzzy_lemma_index_path,
+)
+from CreeDictionary.API.search.infix import build_infix_indexes, infix_index_path
+from CreeDictionary.API.search.keyword_index import (
+    build_target_language_keyword_index,
+    target_language_keyword_index_path,
+)
+from CreeDictionary.API.search.surface_forms import (
+    build_surface_form_index,
+    surface_form_index_path,
+)
+from morphodict.lexicon.generation import current_lexicon_generation
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """Build the search index files from the current database.
+
+    `importjsondict` runs this automatically. Running web server processes pick
+    up the new files the next time they search; until then, they fall back to
+    searching the database.
+    """
+
+    def handle(self, *args, **options):
+        generation = current_lexicon_generation()
+
+        count = build_target_language_keyword_index(generation)
+        logger.info(
+            f"Wrote {count:,} English keywords to {target_language_keyword_index_path()}"
+        )
+
+        count = build_surface_form_index(generation)
+        logger.info(
+            f"Wrote {count:,} Cree surface forms to {surface_form_index_path()}"
+        )
+
+        count = build_fuzzy_lemma_index(generation)
+        logger.info(f"Wrote {count:,} spelling variants to {fuzzy_lemma_index_path()}")
+
+        for name, count in build_affix_indexes(generation).items():
+            prefix_path, suffix_path = affix_index_paths(name)
+            logger.info(
+                f"Wrote {count:,} affix forms to {prefix_path} and {suffix_path}"
+            )
+
+        for name, count in build_infix_indexes(generation).items():
+            logger.info(f"Wrote {count:,} infix forms to {infix_index_path(name)}")
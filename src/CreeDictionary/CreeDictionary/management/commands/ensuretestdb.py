@@ -4,6 +4,8 @@ from django.core.management.base import BaseCommand
 
 from CreeDictionary.cvd import definition_vectors_path
 from morphodict.lexicon import DEFAULT_TEST_IMPORTJSON_FILE
+from morphodict.lexicon.generation import current_lexicon_generation
+from morphodict.lexicon.id_index import IdIndex, IdIndexError, SubstringIndex
 
 
 class Command(BaseCommand):
@@ -15,7 +17,14 @@ class Command(BaseCommand):
     """
 
     def handle(self, *args, **options):
-        from morphodict.lexicon.models import Wordform
+        from morphodict.lexicon.models import LemmaSnapshot, Wordform
+        from CreeDictionary.API.search.affix import AFFIX_INDEXES, affix_index_paths
+        from CreeDictionary.API.search.fuzzy import fuzzy_lemma_index_path
+        from CreeDictionary.API.search.infix import INFIX_INDEXES, infix_index_path
+        from CreeDictionary.API.search.keyword_index import (
+            target_language_keyword_index_path,
+        )
+        from CreeDictionary.API.search.surface_forms import surface_form_index_path
 
         assert settings.USE_TEST_DB
 
@@ -33,4 +42,34 @@ class Command(BaseCommand):
             or importjson_newer_than_db()
         ):
             call_command("importjsondict", purge=True)
+        else:
+            indexes = [
+                (IdIndex, target_language_keyword_index_path()),
+                (IdIndex, fuzzy_lemma_index_path()),
+                (IdIndex, surface_form_index_path()),
+                *(
+                    (IdIndex, path)
+                    for name in AFFIX_INDEXES
+                    for path in affix_index_paths(name)
+                ),
+                *((SubstringIndex, infix_index_path(name)) for name in INFIX_INDEXES),
+            ]
+            generation = current_lexicon_generation()
+            if not all(
+                index_is_current(index_class, path, generation)
+                for index_class, path in indexes
+            ):
+                call_command("buildsearchindexes")
+            if not LemmaSnapshot.objects.exists():
+                call_command("buildlemmasnapshots")
         call_command("ensurecypressadminuser")
+
+
+def index_is_current(index_class, path, generation) -> bool:
+    """Whether the index file exists, and is in the current format and for the
+    current lexicon"""
+    try:
+        index_class(path, expected_generation=generation)
+    except (FileNotFoundError, IdIndexError):
+        return False
+    return True
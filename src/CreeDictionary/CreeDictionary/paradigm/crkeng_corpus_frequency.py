@@ -43,3 +43,11 @@ def observed_wordforms() -> set[str]:
     corpus_frequency.txt file that is checked-in to the repo.
     """
     return {wordform for wordform, _analysis, freq in import_tuples() if freq > 0}
+
+
+@cache
+def wordform_frequencies() -> dict[str, int]:
+    """
+    Return how many times each wordform has been observed in some corpus.
+    """
+    return {wordform: freq for wordform, _analysis, freq in import_tuples()}
@@ -8,6 +8,7 @@ from typing import Iterable, Optional, TextIO, Tuple, TypedDict
 from django.conf import settings
 
 from CreeDictionary.utils import shared_res_dir
+from CreeDictionary.utils.bounded_cache import BoundedCache
 from CreeDictionary.utils.types import FSTTag, Label, cast_away_optional
 from morphodict.site.util import cache_unless
 
@@ -48,13 +49,21 @@ class Relabelling:
     def __init__(self, data: _DataStructure) -> None:
         self._data = data
 
+        # Which tag sequences have relabellings doesn’t depend on the
+        # friendliness, so all the fetchers share one trie.
+        trie = _TagTrie()
+        for tags, labels in data.items():
+            trie.add(tags, labels)
+
         self.linguistic_short = _RelabelFetcher(
-            data, _LabelFriendliness.LINGUISTIC_SHORT
+            data, trie, _LabelFriendliness.LINGUISTIC_SHORT
+        )
+        self.linguistic_long = _RelabelFetcher(
+            data, trie, _LabelFriendliness.LINGUISTIC_LONG
         )
-        self.linguistic_long = _RelabelFetcher(data, _LabelFriendliness.LINGUISTIC_LONG)
-        self.english = _RelabelFetcher(data, _LabelFriendliness.ENGLISH)
-        self.cree = _RelabelFetcher(data, _LabelFriendliness.NEHIYAWEWIN)
-        self.emoji = _RelabelFetcher(data, _LabelFriendliness.EMOJI)
+        self.english = _RelabelFetcher(data, trie, _LabelFriendliness.ENGLISH)
+        self.cree = _RelabelFetcher(data, trie, _LabelFriendliness.NEHIYAWEWIN)
+        self.emoji = _RelabelFetcher(data, trie, _LabelFriendliness.EMOJI)
 
     def __contains__(self, key: object) -> bool:
         if isinstance(key, str):
@@ -87,18 +96,73 @@ class Relabelling:
         return cls(res)
 
 
+class _TagTrie:
+    """
+    A trie of the tag sequences that have relabellings, for finding the longest
+    one that a sequence of tags starts with in a single pass over it.
+    """
+
+    __slots__ = ("children", "labels")
+
+    def __init__(self):
+        self.children: dict[FSTTag, _TagTrie] = {}
+        # The relabellings of the tag sequence ending here, if it has any
+        self.labels: Optional[dict[_LabelFriendliness, Optional[Label]]] = None
+
+    def add(
+        self,
+        tags: Tuple[FSTTag, ...],
+        labels: dict[_LabelFriendliness, Optional[Label]],
+    ):
+        node = self
+        for tag in tags:
+            node = node.children.setdefault(tag, _TagTrie())
+        node.labels = labels
+
+    def longest_prefix(
+        self, tags: Tuple[FSTTag, ...], start: int = 0
+    ) -> tuple[int, Optional[dict[_LabelFriendliness, Optional[Label]]]]:
+        """
+        Return the length of the longest prefix of tags[start:] that has
+        relabellings, and those relabellings; or (0, None) if no prefix has any.
+        """
+        length, labels = 0, None
+        node = self
+        for i in range(start, len(tags)):
+            next_node = node.children.get(tags[i])
+            if next_node is None:
+                break
+            node = next_node
+            if node.labels is not None:
+                length, labels = i + 1 - start, node.labels
+        return length, labels
+
+
 class _RelabelFetcher:
     """
     Makes accessing relabellings for a particular label friendliness easier.
     """
 
+    # How many different tag sequences to remember the chunks and full
+    # relabellings of. Tags come from FST analyses, which only end in so many
+    # different ways.
+    CACHE_SIZE = 4096
+
     def __init__(
         self,
         data: Relabelling._DataStructure,
+        trie: _TagTrie,
         label: _LabelFriendliness,
     ):
         self._data = data
+        self._trie = trie
         self._friendliness = label
+        self._chunk_cache: BoundedCache[
+            Tuple[FSTTag, ...], tuple[Tuple[FSTTag, ...], ...]
+        ] = BoundedCache(self.CACHE_SIZE)
+        self._full_relabelling_cache: BoundedCache[
+            Tuple[FSTTag, ...], tuple[Label, ...]
+        ] = BoundedCache(self.CACHE_SIZE)
 
     def __getitem__(self, key: FSTTag) -> Optional[Label]:
         return self._data[(key,)][self._friendliness]
@@ -109,6 +173,15 @@ class _RelabelFetcher:
         """
         return self._data.get((key,), {}).get(self._friendliness, default)
 
+    def items(self) -> Iterable[tuple[FSTTag, Label]]:
+        """
+        Yield every single tag that has a relabelling, with that relabelling.
+        """
+        for tags, labels in self._data.items():
+            label = labels.get(self._friendliness)
+            if len(tags) == 1 and label is not None:
+                yield tags[0], label
+
     def get_longest(self, tags: Iterable[FSTTag]) -> Optional[Label]:
         """
         Get a relabelling for the longest prefix of the given tags.
@@ -121,23 +194,34 @@ class _RelabelFetcher:
         Chunk FST Labels that match relabellings and yield the tags.
         """
         tag_set = tuple(tags)
-        while tag_set:
-            unmatched, _ = self._get_longest(tag_set)
-            prefix_length = len(tag_set) - len(unmatched)
+        yield from self._chunk_cache.get_or_compute(
+            tag_set, lambda: tuple(self._chunk(tag_set))
+        )
+
+    def _chunk(self, tag_set: Tuple[FSTTag, ...]) -> Iterable[Tuple[FSTTag, ...]]:
+        start = 0
+        while start < len(tag_set):
+            prefix_length, _ = self._trie.longest_prefix(tag_set, start)
             if prefix_length == 0:
                 # There was no relabelling found, but we can just return the first tag.
                 prefix_length = 1
 
-            yield tag_set[:prefix_length]
-            tag_set = tag_set[prefix_length:]
+            yield tag_set[start : start + prefix_length]
+            start += prefix_length
 
     def get_full_relabelling(self, tags: Iterable[FSTTag]) -> list[Label]:
         """
         Relabels all tags, trying to match prefixes
         """
+        tag_set = tuple(tags)
+        return list(
+            self._full_relabelling_cache.get_or_compute(
+                tag_set, lambda: tuple(self._get_full_relabelling(tag_set))
+            )
+        )
 
+    def _get_full_relabelling(self, tag_set: Tuple[FSTTag, ...]) -> list[Label]:
         labels = []
-        tag_set = tuple(tags)
         while tag_set:
             unmatched, maybe_label = self._get_longest(tag_set)
             if maybe_label is None:
@@ -162,19 +246,11 @@ class _RelabelFetcher:
 
         Returns a tuple of all tags if no prefix matched.
         """
-
-        # TODO: better algorithm than this. Probably a trie
         try_tags = tuple(tags)
-        end = len(try_tags)
-        while end > 0:
-            try:
-                entry = self._data[try_tags[:end]]
-            except KeyError:
-                end -= 1
-            else:
-                return try_tags[end:], entry[self._friendliness]
-
-        return try_tags, None
+        length, labels = self._trie.longest_prefix(try_tags)
+        if labels is None:
+            return try_tags, None
+        return try_tags[length:], labels[self._friendliness]
 
 
 def _label_from_column_or_none(column_no: _LabelFriendliness, row) -> Optional[Label]:
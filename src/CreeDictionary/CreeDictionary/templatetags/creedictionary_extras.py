@@ -1,6 +1,7 @@
 """
 Template tags related to the Cree Dictionary specifically.
 """
+from typing import Optional
 from urllib.parse import quote
 from weakref import WeakKeyDictionary
 
@@ -46,7 +47,7 @@ def cree_example(context, example):
 
 
 @register.simple_tag(name="url_for_query")
-def url_for_query_tag(user_query: str) -> str:
+def url_for_query_tag(user_query: str, page: Optional[int] = None) -> str:
     """
     Same as url_for_query(query), but usable in a template:
 
@@ -57,8 +58,16 @@ def url_for_query_tag(user_query: str) -> str:
     yields:
 
         /search?q=w%C3%A2pam%C3%AAw
+
+    and
+
+        {% url_for_query 'wâpamêw' page=2 %}
+
+    yields:
+
+        /search?q=w%C3%A2pam%C3%AAw&page=2
     """
-    return url_for_query(user_query)
+    return url_for_query(user_query, page=page)
 
 
 @register.simple_tag(takes_context=True)
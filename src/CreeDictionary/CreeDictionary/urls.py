@@ -33,6 +33,7 @@ urlpatterns = [
     path("legend", views.legend, name="cree-dictionary-legend"),
     path("settings", views.settings_page, name="cree-dictionary-settings"),
     path("admin/fst-tool", views.fst_tool, name="cree-dictionary-fst-tool"),
+    path("admin/search-stats", views.search_stats, name="cree-dictionary-search-stats"),
     ################################# Internal API #################################
     # internal use to render boxes of search results
     path(
@@ -65,6 +66,11 @@ urlpatterns = [
         api_views.click_in_text,
         name="cree-dictionary-word-click-in-text-api",
     ),
+    path(
+        "click-in-text/batch/",
+        api_views.click_in_text_batch,
+        name="cree-dictionary-word-click-in-text-batch-api",
+    ),
     path(
         "click-in-text-embedded-test/",
         api_views.click_in_text_embedded_test,
@@ -5,21 +5,40 @@
 Utilities that depend on the CreeDictionary Django application.
 """
 
+from typing import Optional
 from urllib.parse import ParseResult, urlencode, urlunparse
 
+from django.http import HttpRequest
 from django.urls import reverse
 
 
-def url_for_query(user_query: str) -> str:
+def url_for_query(user_query: str, page: Optional[int] = None) -> str:
     """
     Produces a relative URL to search for the given user query.
     """
+    query: list[tuple[str, object]] = [("q", user_query)]
+    if page is not None and page != 1:
+        query.append(("page", page))
     parts = ParseResult(
         scheme="",
         netloc="",
         params="",
         path=reverse("cree-dictionary-search"),
-        query=urlencode((("q", user_query),)),
+        query=urlencode(query),
         fragment="",
     )
     return urlunparse(parts)
+
+
+def page_number_from_request(request: HttpRequest) -> int:
+    """
+    Returns the page of search results asked for, defaulting to the first.
+
+    :raise ValueError: if the page parameter is not a positive integer
+    """
+    page = request.GET.get("page")
+    if page is None:
+        return 1
+    if not page.isdecimal() or int(page) < 1:
+        raise ValueError(f"page must be a positive integer, not {page!r}")
+    return int(page)
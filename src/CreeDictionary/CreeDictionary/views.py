@@ -2,16 +2,23 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 from typing import Any, Dict, Literal, Optional
 
 from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotFound
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotFound,
+    JsonResponse,
+)
 from django.shortcuts import redirect, render
 from django.views.decorators.http import require_GET
 
 import morphodict.analysis
-from CreeDictionary.API.search import presentation, search_with_affixes
+from CreeDictionary.API.search import presentation, result_cache, search_with_affixes
+from CreeDictionary.API.search.timing import stage_histograms
 from CreeDictionary.CreeDictionary.forms import WordSearchForm
 from CreeDictionary.CreeDictionary.paradigm.generation import default_paradigm_manager
 from CreeDictionary.phrase_translate.translate import (
@@ -24,7 +31,7 @@ from morphodict.lexicon.models import Wordform
 from morphodict.preference.views import ChangePreferenceView
 from .paradigm.manager import ParadigmDoesNotExistError
 from .paradigm.panes import Paradigm
-from .utils import url_for_query
+from .utils import page_number_from_request, url_for_query
 
 # The index template expects to be rendered in the following "modes";
 # The mode dictates which variables MUST be present in the context.
@@ -82,7 +89,7 @@ def entry_details(request, slug: str):
         # TODO: remove this parameter in favour of...
         lemma=lemma,
         # ...this parameter
-        wordform=presentation.serialize_wordform(lemma),
+        wordform=presentation.serialize_lemma(lemma),
         **paradigm_context,
     )
     return render(request, "CreeDictionary/index.html", context)
@@ -99,13 +106,23 @@ def index(request):  # pragma: no cover
 
     user_query = request.GET.get("q", None)
     search_run = None
+    next_page = None
 
     if user_query:
+        try:
+            page = page_number_from_request(request)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
         search_run = search_with_affixes(
             user_query,
             include_auto_definitions=should_include_auto_definitions(request),
         )
-        search_results = search_run.serialized_presentation_results()
+        result_page = search_run.serialized_presentation_results_page(
+            page, settings.SEARCH_RESULTS_PAGE_SIZE
+        )
+        search_results = result_page.results
+        next_page = result_page.next_page
         did_search = True
     else:
         search_results = []
@@ -122,12 +139,11 @@ def index(request):  # pragma: no cover
         # when we have initial query word to search and display
         query_string=user_query,
         search_results=search_results,
+        next_page=next_page,
         did_search=did_search,
     )
-    if search_run and search_run.verbose_messages and search_run.query.verbose:
-        context["verbose_messages"] = json.dumps(
-            search_run.verbose_messages, indent=2, ensure_ascii=False
-        )
+    if search_run and search_run.query.verbose:
+        context["verbose_messages"] = verbose_messages_json(search_run, result_page)
     return render(request, "CreeDictionary/index.html", context)
 
 
@@ -135,13 +151,38 @@ def search_results(request, query_string: str):  # pragma: no cover
     """
     returns rendered boxes of search results according to user query
     """
-    results = search_with_affixes(
+    try:
+        page = page_number_from_request(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    search_run = search_with_affixes(
         query_string, include_auto_definitions=should_include_auto_definitions(request)
-    ).serialized_presentation_results()
-    return render(
-        request,
-        "CreeDictionary/search-results.html",
-        {"query_string": query_string, "search_results": results},
+    )
+    result_page = search_run.serialized_presentation_results_page(
+        page, settings.SEARCH_RESULTS_PAGE_SIZE
+    )
+    context = {
+        "query_string": query_string,
+        "search_results": result_page.results,
+        "next_page": result_page.next_page,
+    }
+    if search_run.query.verbose:
+        context["verbose_messages"] = verbose_messages_json(search_run, result_page)
+    return render(request, "CreeDictionary/search-results.html", context)
+
+
+def verbose_messages_json(search_run, result_page) -> str:
+    """
+    The verbose messages to show at the top of the results of a verbose:1
+    search, followed by how long each stage of the search, and of presenting
+    the page of results, took.
+    """
+    timings = search_run.timings + result_page.presentation_timings
+    return json.dumps(
+        search_run.verbose_messages + [{"timings": [t.serialize() for t in timings]}],
+        indent=2,
+        ensure_ascii=False,
     )
 
 
@@ -283,6 +324,25 @@ def fst_tool(request):
     return render(request, "CreeDictionary/fst-tool.html", context)
 
 
+@staff_member_required()
+def search_stats(request):
+    """
+    Dump this process’s search stage latency histograms and cache statistics.
+
+    Each web server process keeps its own, so repeated requests may show
+    different numbers.
+    """
+    return JsonResponse(
+        {
+            "pid": os.getpid(),
+            "stages": stage_histograms.as_dict(),
+            "search_result_cache": result_cache.cache.search_results.stats().as_dict(),
+            "fst_caches": morphodict.analysis.fst_cache.stats(),
+        },
+        json_dumps_params={"indent": 2, "ensure_ascii": False},
+    )
+
+
 def create_context_for_index_template(mode: IndexPageMode, **kwargs) -> Dict[str, Any]:
     """
     Creates the context vars for anything using the CreeDictionary/index.html template.
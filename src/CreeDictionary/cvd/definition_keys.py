@@ -13,7 +13,7 @@ import json
 import logging
 from typing import TypedDict, cast, Optional
 
-from morphodict.lexicon.models import Wordform, Definition
+from morphodict.lexicon.models import Wordform, Definition, smush_analysis
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +23,8 @@ CvdKey = str
 class WordformQuery(TypedDict, total=False):
     text: str
     lemma__slug: str
-    raw_analysis: Optional[str]
-    raw_analysis__isnull: Optional[bool]
+    smushed_analysis: Optional[str]
+    smushed_analysis__isnull: Optional[bool]
 
 
 def definition_to_cvd_key(d: Definition) -> CvdKey:
@@ -59,9 +59,9 @@ def cvd_key_to_wordform_query(s: CvdKey) -> WordformQuery:
         "lemma__slug": slug,
     }
     if raw_analysis:
-        ret["raw_analysis"] = raw_analysis
+        ret["smushed_analysis"] = smush_analysis(raw_analysis)
     else:
-        ret["raw_analysis__isnull"] = True
+        ret["smushed_analysis__isnull"] = True
     return ret
 
 
@@ -69,8 +69,14 @@ def wordform_query_matches(query: WordformQuery, wordform: Wordform):
     return (
         wordform.text == query["text"]
         and (
-            ("raw_analysis" in query and wordform.raw_analysis == query["raw_analysis"])
-            or ("raw_analysis__isnull" in query and wordform.raw_analysis is None)
+            (
+                "smushed_analysis" in query
+                and wordform.smushed_analysis == query["smushed_analysis"]
+            )
+            or (
+                "smushed_analysis__isnull" in query
+                and wordform.smushed_analysis is None
+            )
         )
         and wordform.lemma.slug == query["lemma__slug"]
     )
@@ -3,6 +3,7 @@ import logging
 from argparse import ArgumentParser
 from contextlib import contextmanager
 from os import fspath
+from pathlib import Path
 
 from django.core.management import BaseCommand
 from gensim.models import KeyedVectors
@@ -15,7 +16,10 @@ from CreeDictionary.cvd import (
     vector_for_keys,
     definition_vectors_path,
 )
-from CreeDictionary.cvd.definition_keys import definition_to_cvd_key
+from CreeDictionary.cvd.definition_keys import (
+    cvd_key_to_wordform_query,
+    definition_to_cvd_key,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,21 +30,45 @@ class Command(BaseCommand):
     def add_arguments(self, parser: ArgumentParser):
         parser.add_argument("--output-file", default=definition_vectors_path())
         parser.add_argument("--debug-output-file")
+        parser.add_argument(
+            "--slugs",
+            nargs="+",
+            help="""
+                Only redo the vectors for the definitions of the lemmas with
+                these slugs, and their inflections, keeping the rest of the
+                existing output file. Slugs no longer in the database have
+                their vectors removed.
+            """,
+        )
 
     def handle(self, *args, **options):
-        logger.info("Building definition vectors")
-
         definitions = Definition.objects.filter(
             auto_translation_source_id__isnull=True
         ).prefetch_related("wordform__lemma")
 
+        definition_vector_keys = []
+        definition_vector_vectors = []
+
+        slugs = set(options["slugs"] or [])
+        if slugs and not Path(options["output_file"]).exists():
+            logger.info(f"{options['output_file']} not found; building all vectors")
+            slugs = set()
+
+        if slugs:
+            logger.info(f"Updating definition vectors for {len(slugs):,} lemmas")
+            definitions = definitions.filter(wordform__lemma__slug__in=slugs)
+            existing = KeyedVectors.load(fspath(options["output_file"]))
+            for key in existing.index_to_key:
+                if cvd_key_to_wordform_query(key)["lemma__slug"] not in slugs:
+                    definition_vector_keys.append(key)
+                    definition_vector_vectors.append(existing[key])
+        else:
+            logger.info("Building definition vectors")
+
         count = definitions.count()
 
         news_vectors = google_news_vectors()
 
-        definition_vector_keys = []
-        definition_vector_vectors = []
-
         unknown_words = set()
 
         with debug_output_file(options["debug_output_file"]) as debug_output:
@@ -2,30 +2,37 @@
 Handling of the writing system of the language.
 """
 
+from functools import cache, lru_cache
 from importlib import import_module
-from typing import Callable, Set
+from typing import Callable, Optional, Set
 
 from django.conf import settings
 from django.http import HttpRequest
 
+# How many texts to remember the conversions of. Paradigm tables show the same
+# few thousand inflections over and over again.
+CONVERSION_CACHE_SIZE = 20_000
+
 
 class Orthography:
     COOKIE_NAME = "orth"
 
     class _Converter:
         def __getitem__(self, code: str) -> Callable[[str], str]:
-            path = settings.MORPHODICT_ORTHOGRAPHY["available"][code].get(
-                "converter", None
+            return _import_converter(
+                settings.MORPHODICT_ORTHOGRAPHY["available"][code].get(
+                    "converter", None
+                )
             )
-            if path is None:
-                return lambda text: text
-
-            *module_path, callable_name = path.split(".")
-            module = import_module(".".join(module_path))
-            return getattr(module, callable_name)
 
     converter = _Converter()
 
+    def convert(self, text: str) -> dict[str, str]:
+        """
+        Return text converted into every available orthography, by code.
+        """
+        return dict(_convert(_converter_paths(), text))
+
     @property
     def default(self) -> str:
         return settings.MORPHODICT_ORTHOGRAPHY["default"]
@@ -49,3 +56,39 @@ class Orthography:
 
 
 ORTHOGRAPHY = Orthography()
+
+
+@cache
+def _import_converter(path: Optional[str]) -> Callable[[str], str]:
+    """
+    Return the converter at the given dotted path, or the identity function if
+    there is none.
+    """
+    if path is None:
+        return _unchanged
+
+    *module_path, callable_name = path.split(".")
+    module = import_module(".".join(module_path))
+    return getattr(module, callable_name)
+
+
+def _unchanged(text: str) -> str:
+    return text
+
+
+def _converter_paths() -> tuple[tuple[str, Optional[str]], ...]:
+    return tuple(
+        (code, config.get("converter", None))
+        for code, config in settings.MORPHODICT_ORTHOGRAPHY["available"].items()
+    )
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def _convert(
+    converter_paths: tuple[tuple[str, Optional[str]], ...], text: str
+) -> tuple[tuple[str, str], ...]:
+    # The converter paths are part of the key so that changing the settings,
+    # e.g., in tests, can’t return stale conversions.
+    return tuple(
+        (code, _import_converter(path)(text)) for code, path in converter_paths
+    )
@@ -51,10 +51,7 @@ def orth(original_text: str, orthography: str):
               data-orth-cans="ᐚᐸᒣᐤ">wâpamêw</span>
     """
 
-    conversions = {
-        code: ORTHOGRAPHY.converter[code](original_text)
-        for code in ORTHOGRAPHY.available
-    }
+    conversions = ORTHOGRAPHY.convert(original_text)
     inner_text = conversions[orthography]
     data_attributes = " ".join(f'data-orth-{code}="{{}}"' for code in conversions)
     values = tuple(conversions.values()) + (inner_text,)
@@ -2,6 +2,7 @@
 # -*- coding: UTF-8 -*-
 
 import pytest
+from CreeDictionary.morphodict.orthography import ORTHOGRAPHY
 from CreeDictionary.morphodict.templatetags.morphodict_orth import orth
 
 
@@ -11,3 +12,16 @@ def test_orth_requires_two_arguments():
     """
     with pytest.raises(TypeError):
         orth("wâpamêw")
+
+
+def test_convert_matches_each_converter():
+    assert ORTHOGRAPHY.convert("nôhte-") == {
+        code: ORTHOGRAPHY.converter[code]("nôhte-") for code in ORTHOGRAPHY.available
+    }
+
+
+def test_conversions_are_not_shared():
+    conversions = ORTHOGRAPHY.convert("nipâw")
+    conversions["Cans"] = "something else"
+
+    assert ORTHOGRAPHY.convert("nipâw")["Cans"] == "ᓂᐹᐤ"
@@ -9,9 +9,10 @@ from dataclasses import dataclass, asdict
 from typing import Iterable
 
 from django.core.management import BaseCommand
-from django.db.models import Max, Q
+from django.db.models import Q
 from tqdm import tqdm
 
+from morphodict.lexicon.insert_buffer import InsertBuffer
 from morphodict.lexicon.models import Wordform, Definition, DictionarySource
 from CreeDictionary.phrase_translate.definition_processing import remove_parentheticals
 from morphodict.analysis.tag_map import UnknownTagError
@@ -24,50 +25,6 @@ from CreeDictionary.phrase_translate.translate import (
 logger = logging.getLogger(__name__)
 
 
-class InsertBuffer:
-    """A container for objects to be bulk-inserted.
-
-    Will automatically assign IDs to provided objects, and call
-    `manager.bulk_create` every `count` objects. The caller is responsible for
-    calling `save()` one final time when done.
-    """
-
-    def __init__(self, manager, count=500, assign_id=False):
-        """
-        If assign_id is True, this class will assign IDs to objects added to it,
-        so that they can immediately be used in foreign key references.
-
-        A future Django release should remove the need for this method. Django
-        bulk_create can currently return database-generated IDs on Oracle and
-        Postgres; INSERT … RETURNING support was only added to the SQLite
-        database itself in 3.35.0 released 2021-03-12, so Django does not
-        support it yet.
-        """
-        self._queryset = manager
-        self._count = count
-        self._buffer = []
-        self._assign_id = assign_id
-
-        if self._assign_id:
-            max_id = manager.aggregate(Max("id"))["id__max"]
-            if max_id is None:
-                max_id = 0
-            self._next_id = max_id + 1
-
-    def add(self, obj):
-        if self._assign_id and obj.id is None:
-            obj.id = self._next_id
-            self._next_id += 1
-
-        self._buffer.append(obj)
-        if len(self._buffer) >= self._count:
-            self.save()
-
-    def save(self):
-        self._queryset.bulk_create(self._buffer)
-        self._buffer = []
-
-
 @dataclass
 class TranslationStats:
     wordforms_examined: int = 0
@@ -119,12 +76,19 @@ class Command(BaseCommand):
             processing the entire database
             """,
         )
+        group.add_argument(
+            "--slugs",
+            nargs="+",
+            help="""
+            Only translate the inflections of the lemmas with the given slugs
+            """,
+        )
 
     def generate_translations(self) -> Iterable[tuple[Wordform, list[Definition]]]:
         logger.info("Building cache of existing non-auto definitions")
         definitions = defaultdict(set)
         for d in Definition.objects.filter(
-            ~Q(citations__abbrv="auto")
+            ~Q(citations__abbrv="auto"), **self.definitions_filter
         ).prefetch_related("citations"):
             definitions[d.wordform_id].add(d)
         defn_count = sum(
@@ -180,8 +144,8 @@ class Command(BaseCommand):
 
             yield wordform, wordform_auto_definitions
 
-    def write_translations_to_database(self, wordforms) -> None:
-        if wordforms:
+    def write_translations_to_database(self, restricted: bool) -> None:
+        if restricted:
             wordform_filter = dict(wordform__in=self.wordforms_queryset)
         else:
             wordform_filter = {}  # No restriction
@@ -245,8 +209,13 @@ class Command(BaseCommand):
             logger.parent.setLevel(options["log_level"])
 
         extra_kwargs = {}
+        self.definitions_filter = {}
         if options["wordforms"]:
             extra_kwargs = dict(text__in=options["wordforms"])
+        if options["slugs"]:
+            extra_kwargs["lemma__slug__in"] = options["slugs"]
+            # Translations only come from the definitions of lemmas
+            self.definitions_filter = dict(wordform__slug__in=options["slugs"])
         self.wordforms_queryset = Wordform.objects.filter(
             is_lemma=False, **extra_kwargs
         )
@@ -257,7 +226,9 @@ class Command(BaseCommand):
             if filename := options["jsonl_only"]:
                 self.write_translations_to_jsonl(filename)
             else:
-                self.write_translations_to_database(wordforms=options["wordforms"])
+                self.write_translations_to_database(
+                    restricted=bool(options["wordforms"] or options["slugs"])
+                )
 
         finally:
             logger.info("Stats:")
@@ -0,0 +1,28 @@
+import pytest
+
+from CreeDictionary.API.search import search
+from . import DEFAULT_SAMPLE_FILE
+from .sample import load_sample_definition
+
+
+@pytest.mark.django_db
+def test_concurrent_stages_give_same_results_as_serial():
+    """
+    Running the search stages concurrently must not change any results.
+    """
+    for entry in load_sample_definition(DEFAULT_SAMPLE_FILE):
+        query = entry["Query"]
+
+        serial = search(query=query, use_cache=False, concurrent=False)
+        concurrent = search(query=query, use_cache=False, concurrent=True)
+
+        assert features_of(concurrent) == features_of(serial), query
+        assert (
+            concurrent.serialized_presentation_results()
+            == serial.serialized_presentation_results()
+        ), query
+        assert concurrent.verbose_messages == serial.verbose_messages, query
+
+
+def features_of(search_run):
+    return [(r.wordform.key, r.features()) for r in search_run.sorted_results()]
@@ -0,0 +1,152 @@
+import random
+import time
+from argparse import ArgumentParser
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from CreeDictionary.API.search.fuzzy import find_fuzzy_lemma_matches
+from CreeDictionary.utils import get_modified_distances
+from morphodict.lexicon.models import Wordform
+
+# Plausible mistakes in typing SRO: dropped diacritics, dropped or added ‘h’s,
+# and letters that sound or look alike.
+DIACRITICS = {"â": "a", "ê": "e", "î": "i", "ô": "o"}
+SIMILAR_LETTERS = {
+    "a": "â",
+    "e": "i",
+    "i": "e",
+    "o": "u",
+    "t": "d",
+    "p": "b",
+    "k": "g",
+    "c": "ts",
+    "s": "z",
+    "w": "o",
+    "y": "i",
+}
+
+
+class Command(BaseCommand):
+    help = """Measure how well and how fast misspelled lemmas are found
+
+    Misspells a random sample of lemmas, and looks each misspelling up with the
+    fuzzy lemma index. Reports:
+
+      - recall: how many of the lemmas within FUZZY_SEARCH_MAX_DISTANCE of the
+        misspelling, as found by comparing it against every lemma, the index
+        also found;
+      - how often the original lemma was found;
+      - latency of the index lookups, and of the exhaustive comparison.
+
+    Needs the index files from `manage.py buildsearchindexes`.
+    """
+
+    def add_arguments(self, parser: ArgumentParser):
+        parser.add_argument(
+            "--count", type=int, default=500, help="How many lemmas to misspell"
+        )
+        parser.add_argument(
+            "--edits",
+            type=int,
+            default=2,
+            help="How many mistakes to make in each misspelling",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, count, edits, seed, **options):
+        rng = random.Random(seed)
+
+        lemmas = list(
+            Wordform.objects.filter(is_lemma=True)
+            .exclude(text__contains=" ")
+            .values_list("id", "text")
+        )
+        lemma_texts = [text for _, text in lemmas]
+        sample = [
+            (lemma_id, text)
+            for lemma_id, text in rng.sample(lemmas, min(count, len(lemmas)))
+            if len(text) > settings.AFFIX_SEARCH_THRESHOLD
+        ]
+
+        if not sample:
+            raise CommandError("No lemmas to misspell")
+
+        index_times = []
+        exhaustive_times = []
+        expected_total = found_total = original_found = 0
+        for lemma_id, text in sample:
+            query = misspell(text, edits, rng)
+
+            start = time.perf_counter()
+            matches = find_fuzzy_lemma_matches(query)
+            index_times.append(time.perf_counter() - start)
+            if matches is None:
+                raise CommandError(
+                    "The fuzzy lemma index is missing or stale; run `manage.py buildsearchindexes`"
+                )
+            found = {wordform.id for wordform, _ in matches}
+
+            start = time.perf_counter()
+            expected = {
+                lemma_id
+                for (lemma_id, _), distance in zip(
+                    lemmas, get_modified_distances(query, lemma_texts)
+                )
+                if distance <= settings.FUZZY_SEARCH_MAX_DISTANCE
+            }
+            exhaustive_times.append(time.perf_counter() - start)
+
+            expected_total += len(expected)
+            found_total += len(expected & found)
+            if lemma_id in found:
+                original_found += 1
+
+        self.stdout.write(
+            f"{len(sample):,} misspellings with {edits} edits each, max distance {settings.FUZZY_SEARCH_MAX_DISTANCE}"
+        )
+        self.stdout.write(
+            f"recall: {found_total:,}/{expected_total:,} = {found_total / max(expected_total, 1):.1%}"
+        )
+        self.stdout.write(
+            f"original lemma found: {original_found:,}/{len(sample):,} = {original_found / len(sample):.1%}"
+        )
+        self.stdout.write(f"index lookups: {latency_summary(index_times)}")
+        self.stdout.write(f"exhaustive comparison: {latency_summary(exhaustive_times)}")
+
+
+def misspell(text: str, edits: int, rng: random.Random) -> str:
+    """
+    Return text with edits mistakes made in it
+    """
+    chars = list(text)
+    for _ in range(edits):
+        i = rng.randrange(len(chars))
+        char = chars[i]
+        mistake = rng.choice(["diacritic", "h", "similar", "delete", "insert"])
+        if mistake == "diacritic" and char in DIACRITICS:
+            chars[i] = DIACRITICS[char]
+        elif mistake == "h":
+            if char == "h":
+                del chars[i]
+            else:
+                chars.insert(i + 1, "h")
+        elif mistake == "similar" and char in SIMILAR_LETTERS:
+            chars[i] = SIMILAR_LETTERS[char]
+        elif mistake == "delete" and len(chars) > 1:
+            del chars[i]
+        else:
+            chars.insert(i, rng.choice("aeioptkcsmnwy"))
+    return "".join(chars)
+
+
+def latency_summary(seconds: list[float]) -> str:
+    ms = sorted(s * 1000 for s in seconds)
+
+    def percentile(p):
+        return ms[min(len(ms) - 1, int(p / 100 * len(ms)))]
+
+    return (
+        f"p50 {percentile(50):.2f} ms, p95 {percentile(95):.2f} ms,"
+        f" max {ms[-1]:.2f} ms"
+    )
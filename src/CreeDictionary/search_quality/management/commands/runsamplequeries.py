@@ -28,6 +28,15 @@ class Command(BaseCommand):
             "--append-to-query",
             help="Append string to every query, useful with fancy queries",
         )
+        group.add_argument(
+            "--concurrent-stages",
+            action=BooleanOptionalAction,
+            help="""
+                Run independent search stages concurrently. Results should be
+                identical to a run without this option; only timings should
+                differ.
+            """,
+        )
 
         naming = group.add_mutually_exclusive_group()
         default_results_file = RESULTS_DIR / "query-results.json.gz"
@@ -54,6 +63,8 @@ class Command(BaseCommand):
             kwargs["shuffle"] = True
         if options["append_to_query"]:
             kwargs["append_to_query"] = options["append_to_query"]
+        if options["concurrent_stages"]:
+            kwargs["concurrent"] = True
 
         for status in gen_run_sample(
             options["csv_file"], out_file=options["result_file_path"], **kwargs
@@ -6,7 +6,7 @@ from typing import Optional
 import time
 from os import PathLike
 
-from CreeDictionary.API.search import search_with_affixes
+from CreeDictionary.API.search import search
 from . import SampleSearchResultsJson, DEFAULT_SAMPLE_FILE
 from .analyze_results import count_results
 from .sample import load_sample_definition
@@ -19,6 +19,7 @@ def gen_run_sample(
     max: Optional[int] = None,
     shuffle=False,
     append_to_query=None,
+    concurrent=None,
 ):
     "Run the sample, yielding status messages"
 
@@ -37,9 +38,12 @@ def gen_run_sample(
         # multiple times in randomized orders to spread out the effects of
         # warmup and caching
         start_time = time.time()
-        results = search_with_affixes(
-            query + (" " + append_to_query if append_to_query else "")
-        )
+        results = search(
+            query=query + (" " + append_to_query if append_to_query else ""),
+            # Cached results would make the timings meaningless
+            use_cache=False,
+            concurrent=concurrent,
+        ).serialized_presentation_results()
         time_taken = time.time() - start_time
 
         combined_results[query] = {
@@ -1,13 +1,24 @@
 import json
 import logging
+from typing import Optional
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from hypothesis import assume, given
 
-from CreeDictionary.API.search import search
+from CreeDictionary.API.search import search, search_many
+from CreeDictionary.API.search import keyword_index, lookup, presentation
+from CreeDictionary.API.search.core import SearchRun
+from CreeDictionary.API.search.lookup import (
+    LookupBatch,
+    fetch_results_for_unknown_analyses,
+    fetch_results_from_target_language_keywords,
+)
 from CreeDictionary.API.search.util import to_sro_circumflex
 from CreeDictionary.tests.conftest import lemmas
-from morphodict.lexicon.models import Wordform
+from morphodict.analysis import rich_analyze_relaxed
+from morphodict.lexicon.models import LemmaSnapshot, Wordform
 
 
 @pytest.mark.django_db
@@ -100,6 +111,176 @@ def test_search_for_english() -> None:
     assert any(r.wordform.text == "âcimowin" for r in search_results)
 
 
+@pytest.mark.django_db
+def test_english_phrase_keywords_are_matched_in_one_query() -> None:
+    """
+    However long an English query is, its keywords are looked up all at once.
+    """
+    search_run = SearchRun("they told a long story about the bear and the wolf")
+
+    with CaptureQueriesContext(connection) as context:
+        fetch_results_from_target_language_keywords(search_run)
+
+    assert len(context.captured_queries) == 1
+    assert any(
+        r.wordform.text == "âcimowin" and "stori" in r.target_language_keyword_match
+        for r in search_run.unsorted_results()
+    )
+
+
+@pytest.mark.django_db
+def test_smushed_analysis_matches_raw_analysis() -> None:
+    for wf in Wordform.objects.filter(raw_analysis__isnull=False)[:1000]:
+        assert wf.smushed_analysis == wf.analysis.smushed()
+    assert not Wordform.objects.filter(
+        raw_analysis__isnull=True, smushed_analysis__isnull=False
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_unknown_analyses_are_handled_in_one_query() -> None:
+    """
+    However many analyses a long inflected form has, their lemmas are all
+    fetched at once.
+    """
+    search_run = SearchRun("nikîmôci-nêwokâtânân")
+    analyses = rich_analyze_relaxed(search_run.internal_query)
+    assert analyses
+
+    with CaptureQueriesContext(connection) as context:
+        fetch_results_for_unknown_analyses(search_run, analyses)
+
+    assert len(context.captured_queries) == 1
+    assert any(
+        r.analyzable_inflection_match and r.lemma_wordform.text == "nêwokâtêw"
+        for r in search_run.unsorted_results()
+    )
+
+
+@pytest.mark.django_db
+def test_lookup_batch_takes_fixed_number_of_queries() -> None:
+    """
+    Looking up many queries as a batch costs no more database queries than one.
+    """
+    queries = ["nâpêwak", "iskwêwak", "awâsisak", "the bear", "niskak", "atchakosuk"]
+    batch = LookupBatch(queries)
+
+    with CaptureQueriesContext(connection) as context:
+        for query in queries:
+            batch.target_language_keyword_matches(query)
+            batch.source_language_keyword_matches(query)
+            batch.wordforms_with_analyses(batch.analyses(query))
+
+    # keywords + wordforms for them, source language keywords, wordforms
+    # spelled like the queries, analyses
+    assert len(context.captured_queries) <= 5
+
+
+@pytest.mark.django_db
+def test_search_many_matches_search() -> None:
+    queries = ["nâpêwak", " NÂPÊWAK", "the bear", "atchakosuk", "nikîmôci-nêwokâtânân"]
+    search_runs = search_many(queries=queries, use_cache=False)
+
+    assert search_runs["nâpêwak"] is search_runs[" NÂPÊWAK"]
+    for query in queries:
+        assert (
+            search_runs[query].serialized_presentation_results()
+            == search(query=query, use_cache=False).serialized_presentation_results()
+        ), query
+
+
+@pytest.mark.django_db
+def test_keyword_index_matches_database(monkeypatch) -> None:
+    """
+    English results are the same whether they come from the index or the database.
+    """
+    query = "they told a long story about the bear and the wolf"
+
+    def keyword_matches():
+        search_run = SearchRun(query)
+        fetch_results_from_target_language_keywords(search_run)
+        return sorted(
+            (r.wordform.id, r.target_language_keyword_match)
+            for r in search_run.unsorted_results()
+        )
+
+    assert keyword_index.lookup_target_language_keywords(["stori"]) is not None
+    from_index = keyword_matches()
+
+    monkeypatch.setattr(
+        lookup, "lookup_target_language_keywords", lambda keywords: None
+    )
+    assert keyword_matches() == from_index
+
+
+@pytest.mark.django_db
+def test_known_wordforms_are_analyzed_without_the_fst(monkeypatch) -> None:
+    def fail(query):
+        raise AssertionError(f"asked the relaxed FST about {query!r}")
+
+    monkeypatch.setattr(lookup, "rich_analyze_relaxed", fail)
+    analyses = LookupBatch(["nâpêwak"]).analyses("nâpêwak")
+    assert {a.smushed() for a in analyses} == {"nâpêw+N+A+Pl"}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["nâpêwak", "wâpamêw", "napewak", "atchakosuk"])
+def test_surface_form_index_matches_fst(monkeypatch, query) -> None:
+    """
+    Cree results are the same whether the query is analyzed by looking it up
+    in the surface form index or with the FST.
+    """
+    from_index = search(query=query, use_cache=False).serialized_presentation_results()
+
+    monkeypatch.setattr(lookup, "lookup_surface_forms", lambda queries: None)
+    assert (
+        search(query=query, use_cache=False).serialized_presentation_results()
+        == from_index
+    )
+
+
+@pytest.mark.django_db
+def test_every_stored_form_gets_the_fst_analyses() -> None:
+    """
+    Forms with readings that no paradigm cell stores, e.g., with initial
+    change, are left out of the surface form index, so every form is analyzed
+    the same way with or without it.
+    """
+    texts = set(
+        Wordform.objects.filter(raw_analysis__isnull=False).values_list(
+            "text", flat=True
+        )
+    )
+    batch = LookupBatch(texts)
+
+    mismatches = {
+        text: (batch.analyses(text), set(rich_analyze_relaxed(text)))
+        for text in texts
+        if batch.analyses(text) != set(rich_analyze_relaxed(text))
+    }
+    assert mismatches == {}
+
+
+@pytest.mark.django_db
+def test_result_pages_match_full_sort() -> None:
+    """
+    Paging through results gives the same results, in the same order, as
+    serializing everything at once.
+    """
+    search_run = search(query="wâpamêw", use_cache=False)
+    everything = search_run.serialized_presentation_results()
+    assert len(everything) > 3
+
+    paged = []
+    page: Optional[int] = 1
+    while page is not None:
+        result_page = search_run.serialized_presentation_results_page(page, 3)
+        paged.extend(result_page.results)
+        page = result_page.next_page
+
+    assert paged == everything
+
+
 @pytest.mark.django_db
 def test_compare_simple_vs_affix_search() -> None:
     """
@@ -216,6 +397,113 @@ def test_search_words_with_preverbs():
     assert search_result.preverbs[0].text == "nitawi-"
 
 
+@pytest.mark.django_db
+def test_presenting_preverbs_does_not_query_them():
+    search_run = search(query="nitawi-nipâw", use_cache=False)
+    # The first presentation in the process may build the preverb table
+    search_run.serialized_presentation_results()
+
+    with CaptureQueriesContext(connection) as context:
+        results = search_run.serialized_presentation_results()
+
+    assert [pv["text"] for pv in results[0]["preverbs"]] == ["nitawi-"]
+    assert not any(
+        '"raw_analysis" IS NULL' in query["sql"] for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db
+def test_serializing_results_takes_constant_number_of_queries():
+    # Many results, some with preverbs and auto-translated definitions
+    search_run = search(query="nipâw", use_cache=False, include_auto_definitions=True)
+    assert search_run.result_count() > 10
+    # Load anything loaded once per process, like the preverb table
+    search_run.serialized_presentation_results(limit=1)
+
+    query_counts = []
+    for limit in [1, 10, search_run.result_count()]:
+        with CaptureQueriesContext(connection) as context:
+            results = search_run.serialized_presentation_results(limit=limit)
+        assert len(results) == limit
+        query_counts.append(len(context.captured_queries))
+
+    # The first result is a lemma, and serializing lemmas alone takes no
+    # definition queries
+    assert query_counts[0] <= query_counts[1] == query_counts[2] <= 3
+
+
+@pytest.mark.django_db
+def test_bulk_serialization_matches_serializing_each_wordform():
+    wordforms = list(Wordform.objects.filter(text__in=["nipâw", "wâpamêw", "pê-"]))
+    assert len(wordforms) >= 3
+
+    assert presentation.serialize_wordforms(wordforms) == [
+        presentation.serialize_wordform(
+            wordform,
+            definitions=[d.serialize() for d in wordform.definitions.all()],
+        )
+        for wordform in wordforms
+    ]
+
+
+def test_analyses_with_the_same_tags_share_a_breakdown():
+    head, tail = ["PV/e+"], ["+V", "+AI", "+Cnj", "+3Sg"]
+    breakdown = presentation.get_breakdown(head, tail)
+
+    assert presentation.get_breakdown(tuple(head), tuple(tail)) is breakdown
+    assert list(breakdown.friendly_head) == presentation.replace_user_friendly_tags(
+        ["PV/e"]
+    )
+    assert breakdown.serialized_relevant_tags == tuple(
+        tag.serialize() for tag in breakdown.relevant_tags
+    )
+
+
+@pytest.mark.django_db
+def test_lemma_snapshots_match_serializing_lemmas():
+    lemmas = list(
+        Wordform.objects.filter(text__in=["nipâw", "wâpamêw", "pê-"], is_lemma=True)
+    )
+    presentation.build_lemma_snapshots()
+
+    snapshots = presentation.read_lemma_snapshots(lemmas)
+    assert snapshots == {
+        lemma.id: presentation.serialize_wordform(lemma) for lemma in lemmas
+    }
+
+    with CaptureQueriesContext(connection) as context:
+        assert presentation.serialize_lemma(lemmas[0]) == snapshots[lemmas[0].id]
+    assert len(context.captured_queries) == 1
+
+
+@pytest.mark.django_db
+def test_outdated_lemma_snapshots_are_ignored():
+    lemma = Wordform.objects.get(slug="nipâw")
+    presentation.build_lemma_snapshots()
+    LemmaSnapshot.objects.filter(lemma=lemma).update(
+        version="old", serialized={"text": "outdated"}
+    )
+
+    assert presentation.read_lemma_snapshots([lemma]) == {}
+    assert presentation.serialize_lemma(lemma) == presentation.serialize_wordform(lemma)
+
+
+@pytest.mark.django_db
+def test_rebuilding_some_lemma_snapshots():
+    changed = Wordform.objects.get(slug="nipâw")
+    unchanged = Wordform.objects.get(slug="wâpamêw")
+    presentation.build_lemma_snapshots()
+    LemmaSnapshot.objects.filter(lemma__in=[changed, unchanged]).update(
+        serialized={"text": "outdated"}
+    )
+
+    assert presentation.build_lemma_snapshots(slugs=["nipâw"]) == 1
+
+    snapshots = presentation.read_lemma_snapshots([changed, unchanged])
+    assert snapshots[changed.id] == presentation.serialize_wordform(changed)
+    assert snapshots[unchanged.id] == {"text": "outdated"}
+
+
 @pytest.mark.django_db
 def test_search_text_with_ambiguous_word_classes():
     """
@@ -52,3 +52,55 @@ def test_click_in_text_disables_affix_search(client):
         reverse("cree-dictionary-word-click-in-text-api") + f"?q={ASCII_WAPAMEW}"
     ).content.decode("utf-8")
     assert EXPECTED_SUFFIX_SEARCH_RESULT not in click_in_text_response
+
+
+@pytest.mark.django_db
+def test_click_in_text_pages(client, settings):
+    settings.SEARCH_RESULTS_PAGE_SIZE = 1
+    url = reverse("cree-dictionary-word-click-in-text-api") + "?q=niska"
+
+    first_page = client.get(url).json()
+    assert len(first_page["results"]) == 1
+    assert first_page["next_page"] == 2
+
+    second_page = client.get(url + "&page=2").json()
+    assert len(second_page["results"]) == 1
+    assert second_page["results"] != first_page["results"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("page", ["0", "-1", "two"])
+def test_click_in_text_bad_page(client, page):
+    response = client.get(
+        reverse("cree-dictionary-word-click-in-text-api") + f"?q=niska&page={page}"
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_click_in_text_batch_matches_single_requests(client):
+    tokens = ["niskak", "wapamew", "Niskak", "niskak", "?"]
+
+    batch = client.get(
+        reverse("cree-dictionary-word-click-in-text-batch-api"), {"q": tokens}
+    ).json()["tokens"]
+
+    assert set(batch) == set(tokens)
+    assert batch["?"] == {"results": [], "next_page": None}
+    for token in ["niskak", "wapamew", "Niskak"]:
+        single = client.get(
+            reverse("cree-dictionary-word-click-in-text-api"), {"q": token}
+        ).json()
+        assert batch[token] == single
+
+
+@pytest.mark.django_db
+def test_click_in_text_batch_post(client):
+    response = client.post(
+        reverse("cree-dictionary-word-click-in-text-batch-api"),
+        '{"q": ["niskak"]}',
+        content_type="text/plain",
+    )
+
+    assert b"goose" in response.content
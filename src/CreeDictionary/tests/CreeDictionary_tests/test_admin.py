@@ -13,3 +13,14 @@ def test_admin_doesnt_crash(admin_client):
     )
     assert response.status_code == 200
     assert b"Inflections" in response.content
+
+
+@pytest.mark.django_db
+def test_search_stats_are_staff_only(client, admin_client):
+    url = reverse("cree-dictionary-search-stats")
+    assert client.get(url).status_code == 302
+
+    admin_client.get(reverse("cree-dictionary-search") + "?q=wapamew")
+    stats = admin_client.get(url).json()
+    assert stats["stages"]["search"]["count"] >= 1
+    assert "hits" in stats["search_result_cache"]
@@ -80,3 +80,33 @@ def test_chunks_make_full_labels():
         ("Ind",),
         ("3Sg", "4Sg/PlO"),
     ]
+
+
+def test_items_are_single_tags_with_labels():
+    items = dict(labels.linguistic_short.items())
+    assert items["TA"] == "Transitive Animate"
+    # Multi-tag relabellings, like V+TA, and empty labels, like Ind’s, are
+    # left out
+    assert set(items) == {"3Sg", "4Sg/PlO", "Prs", "TA", "TI", "V"}
+
+
+def test_full_relabelling_of_prefix_without_label_at_this_level():
+    # 3Sg+4Sg/PlO has an English relabelling, but no short linguistic one
+    assert labels.english.get_full_relabelling(("3Sg", "4Sg/PlO")) == [
+        "s/he → him/her/them"
+    ]
+    assert labels.linguistic_short.get_full_relabelling(("3Sg", "4Sg/PlO")) == [
+        "3Sg",
+        "→ 4",
+    ]
+
+
+def test_remembered_full_relabellings_are_not_shared():
+    tag_set = ("V", "AI", "Prs")
+    relabelling = labels.english.get_full_relabelling(tag_set)
+    relabelling.append("something else")
+
+    assert labels.english.get_full_relabelling(tag_set) == [
+        "Action word - like: mîcisow, nipâw",
+        "something is happening now",
+    ]
@@ -10,3 +10,8 @@ def test_query_always_ascii(query: str):
     assert all(
         c in ascii_printable for c in url
     ), f"{url!r} should not contain non-ascii characters"
+
+
+def test_url_for_query_page():
+    assert url_for_query("awa", page=1) == url_for_query("awa")
+    assert url_for_query("awa", page=3).endswith("?q=awa&page=3")
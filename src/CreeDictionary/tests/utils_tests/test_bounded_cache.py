@@ -0,0 +1,90 @@
+import pytest
+
+from CreeDictionary.utils.bounded_cache import BoundedCache
+
+
+def test_evicts_least_recently_used():
+    cache = BoundedCache(maxsize=2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    # Touch "a" so that "b" becomes the least recently used
+    cache.get_or_compute("a", lambda: 3)
+    cache.get_or_compute("c", lambda: 4)
+
+    assert cache.get_or_compute("a", lambda: "recomputed") == 1
+    assert cache.get_or_compute("b", lambda: "recomputed") == "recomputed"
+
+    stats = cache.stats()
+    assert stats.size == 2
+    assert stats.evictions == 2
+    assert stats.hits == 2
+    assert stats.misses == 4
+
+
+def test_expires_old_entries(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("time.monotonic", lambda: now)
+
+    cache = BoundedCache(maxsize=10, ttl=60)
+    cache.get_or_compute("a", lambda: 1)
+
+    now += 59
+    assert cache.get_or_compute("a", lambda: 2) == 1
+
+    now += 2
+    assert cache.get_or_compute("a", lambda: 2) == 2
+    assert cache.stats().expirations == 1
+
+
+def test_generation_change_clears_cache():
+    generation = "one"
+    cache = BoundedCache(maxsize=10, generation=lambda: generation)
+    cache.get_or_compute("a", lambda: 1)
+
+    generation = "two"
+    assert cache.get_or_compute("a", lambda: 2) == 2
+    assert cache.stats().invalidations == 1
+    assert len(cache) == 1
+
+
+def test_size_zero_disables_caching():
+    cache = BoundedCache(maxsize=0)
+    assert cache.get_or_compute("a", lambda: 1) == 1
+    assert cache.get_or_compute("a", lambda: 2) == 2
+    assert cache.stats().hits == 0
+    assert cache.stats().hit_ratio == 0.0
+
+
+def test_negative_size_is_an_error():
+    with pytest.raises(ValueError):
+        BoundedCache(maxsize=-1)
+
+
+def test_contains_does_not_count():
+    cache = BoundedCache(maxsize=10)
+    assert "a" not in cache
+    cache.get_or_compute("a", lambda: 1)
+    assert "a" in cache
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (0, 1)
+
+
+def test_times_computing_misses(monkeypatch):
+    now = 0.0
+    monkeypatch.setattr("time.perf_counter", lambda: now)
+
+    def slow(seconds, value):
+        nonlocal now
+        now += seconds
+        return value
+
+    cache = BoundedCache(maxsize=10)
+    cache.get_or_compute("a", lambda: slow(0.5, 1))
+    cache.get_or_compute("b", lambda: slow(1.5, 2))
+    cache.get_or_compute("a", lambda: slow(100, 3))
+
+    stats = cache.stats()
+    assert stats.compute_seconds == 2.0
+    assert stats.mean_compute_seconds == 1.0
+    assert stats.as_dict()["mean_compute_seconds"] == 1.0
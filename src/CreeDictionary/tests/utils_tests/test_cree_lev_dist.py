@@ -1,10 +1,17 @@
+import timeit
 from string import ascii_letters
 
 import pytest
 from hypothesis import assume, example, given
-from hypothesis.strategies import text
+from hypothesis.strategies import lists, text
 from Levenshtein import distance
 from CreeDictionary.utils import get_modified_distance
+from CreeDictionary.utils.cree_lev_dist import (
+    VOWELS,
+    get_modified_distances,
+    get_modified_distances_to,
+    remove_cree_diacritics,
+)
 
 
 @given(text(alphabet=ascii_letters), text(alphabet=ascii_letters))
@@ -38,3 +45,143 @@ def test_get_distance_basic_lev(spelling: str, normal_form: str):
 )
 def test_get_distance(spelling: str, normal_form: str, expected_distance):
     assert get_modified_distance(spelling, normal_form) == expected_distance
+
+
+# The characters that matter to the distance calculation, plus a couple that
+# don’t. Upper case letters check that case is ignored.
+CREE_ALPHABET = "aâāeêēiîīoôōhHÂÊktcmnpswy-"
+
+cree_text = text(alphabet=CREE_ALPHABET, max_size=12)
+
+
+@given(cree_text, cree_text)
+@example("h", "ah")  # inserting an ‘h’ at the start looks at the last letter
+@example("ha", "a")  # deleting an ‘h’ at the start never does
+def test_get_distance_matches_reference(spelling: str, normal_form: str):
+    assert get_modified_distance(spelling, normal_form) == reference_distance(
+        spelling, normal_form
+    )
+
+
+@given(cree_text, lists(cree_text, max_size=60))
+def test_batch_distances_match_reference(query: str, candidates: list[str]):
+    # Lists of 60 are long enough to take the vectorized code path
+    assert get_modified_distances(query, candidates) == [
+        reference_distance(query, c) for c in candidates
+    ]
+    assert get_modified_distances_to(candidates, query) == [
+        reference_distance(c, query) for c in candidates
+    ]
+
+
+@pytest.mark.parametrize("count", [1, 5, 500])
+def test_batch_distances_on_sample_words(count):
+    words = [
+        "acâhkos",
+        "acâhko",
+        "atâhk",
+        "hâw",
+        "ê-kî-nitawi-kâh-kîmôci-kotiskâwêyâhk",
+        "nikîmôci-nêwokâtânân",
+        "minôs",
+        "minôhs",
+        "wâpamêw",
+        "",
+    ] * 50
+    words = words[:count]
+    for query in ["atâk", "wapamew", "h", ""]:
+        assert get_modified_distances(query, words) == [
+            reference_distance(query, w) for w in words
+        ]
+        assert get_modified_distances_to(words, query) == [
+            reference_distance(w, query) for w in words
+        ]
+
+
+# What follows is the original implementation of get_modified_distance(),
+# kept as a reference for the faster one.
+
+
+def reference_distance(spelling: str, normal_form: str) -> float:
+    spelling = spelling.lower()
+    normal_form = normal_form.lower()
+    n, m = len(spelling), len(normal_form)
+    d = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        d[i][0] = d[i - 1][0] + del_dist(spelling, i - 1)
+    for j in range(1, m + 1):
+        d[0][j] = d[0][j - 1] + ins_dist(normal_form, normal_form[j - 1], j - 1)
+
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            _del_dist = d[i - 1][j] + del_dist(spelling, i - 1)
+            _ins_dist = d[i][j - 1] + ins_dist(normal_form, normal_form[j - 1], j - 1)
+            _sub_dist = d[i - 1][j - 1] + sub_dist(spelling, normal_form[j - 1], i - 1)
+            d[i][j] = min((_del_dist, _ins_dist, _sub_dist))
+
+    return d[-1][-1]
+
+
+def del_dist(string, i):
+    if i > 0 and remove_cree_diacritics(string[i - 1]) in VOWELS and string[i] == "h":
+        return 0.5
+    return 1
+
+
+def sub_dist(string, new_char, i):
+    if new_char == string[i]:
+        return 0
+    elif remove_cree_diacritics(string[i]) == remove_cree_diacritics(new_char):
+        if remove_cree_diacritics(new_char) == "e":
+            return 0
+        else:
+            return 0.5
+    else:
+        return 1
+
+
+def ins_dist(string, char, i):
+    if (
+        remove_cree_diacritics(string[min(i, len(string)) - 1]) in VOWELS
+        and char == "h"
+    ):
+        return 0.5
+    else:
+        return 1
+
+
+def benchmark():
+    """
+    Compare the speed of the reference and current implementations, on the
+    kind of batch an affix search produces.
+
+    Run with `python -m CreeDictionary.tests.utils_tests.test_cree_lev_dist`
+    from the src directory.
+    """
+    words = [
+        "acâhkosis",
+        "ê-kî-nitawi-kâh-kîmôci-kotiskâwêyâhk",
+        "nikîmôci-nêwokâtânân",
+        "wâpamêw",
+        "nipâw",
+        "kîmôci-kotiskâwêw",
+        "atâhk",
+        "mîcisow",
+    ] * 50
+    query = "nipa"
+
+    expected = [reference_distance(w, query) for w in words]
+    assert [get_modified_distance(w, query) for w in words] == expected
+    assert get_modified_distances_to(words, query) == expected
+
+    for name, func in [
+        ("reference", lambda: [reference_distance(w, query) for w in words]),
+        ("one at a time", lambda: [get_modified_distance(w, query) for w in words]),
+        ("batch", lambda: get_modified_distances_to(words, query)),
+    ]:
+        seconds = min(timeit.repeat(func, number=10, repeat=5)) / 10
+        print(f"{name:>15}: {seconds * 1000:.3f} ms for {len(words)} words")
+
+
+if __name__ == "__main__":
+    benchmark()
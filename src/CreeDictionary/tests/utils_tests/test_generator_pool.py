@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+
+def test_generator_pool_can_be_imported_without_django():
+    """
+    Pool workers started with the spawn method, the default on macOS, import
+    the module without setting up Django.
+    """
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; import CreeDictionary.utils.generator_pool; "
+            "assert 'django' not in sys.modules, 'imported django'",
+        ],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        check=True,
+    )
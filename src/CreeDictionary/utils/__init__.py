@@ -1,2 +1,6 @@
-from .cree_lev_dist import get_modified_distance
+from .cree_lev_dist import (
+    get_modified_distance,
+    get_modified_distances,
+    get_modified_distances_to,
+)
 from .shared_res_dir import shared_res_dir
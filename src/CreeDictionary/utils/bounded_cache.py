@@ -0,0 +1,194 @@
+"""
+A small, thread-safe, size-bounded cache that keeps count of how it is doing.
+
+functools.lru_cache is great until you need to know *why* it is or isn’t
+helping, need entries to expire, or need to throw everything away when the data
+it was computed from changes. This does all three.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from threading import Lock
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    maxsize: int
+    size: int
+    hits: int
+    misses: int
+    #: entries thrown out to make room for newer ones
+    evictions: int
+    #: entries that were found, but were too old to use
+    expirations: int
+    #: how many times the whole cache was cleared because its data changed
+    invalidations: int
+    #: total time spent computing values for misses
+    compute_seconds: float
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    @property
+    def mean_compute_seconds(self) -> float:
+        if self.misses == 0:
+            return 0.0
+        return self.compute_seconds / self.misses
+
+    def as_dict(self):
+        return asdict(self) | {
+            "hit_ratio": self.hit_ratio,
+            "mean_compute_seconds": self.mean_compute_seconds,
+        }
+
+
+class BoundedCache(Generic[K, V]):
+    """
+    A least-recently-used cache holding at most `maxsize` entries.
+
+    If `ttl` is given, entries older than that many seconds are recomputed.
+
+    If `generation` is given, it is called on every lookup, and the cache is
+    cleared whenever its return value changes. Use it to tie cached values to
+    the data they were computed from, e.g., the lexicon.
+
+    A `maxsize` of 0 disables caching entirely; every lookup is a miss.
+
+    >>> c = BoundedCache(maxsize=2)
+    >>> c.get_or_compute("a", lambda: 1)
+    1
+    >>> c.get_or_compute("a", lambda: 2)
+    1
+    >>> c.stats().hits, c.stats().misses
+    (1, 1)
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        *,
+        ttl: Optional[float] = None,
+        generation: Optional[Callable[[], Hashable]] = None,
+    ):
+        if maxsize < 0:
+            raise ValueError(f"maxsize must not be negative: {maxsize=!r}")
+
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._generation_func = generation
+        self._generation = generation() if generation else None
+
+        # key → (value, time stored)
+        self._data: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._lock = Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._compute_seconds = 0.0
+
+    def get_or_compute(self, key: K, compute: Callable[[], V]) -> V:
+        """
+        Return the cached value for key, calling compute() to fill it if needed.
+
+        compute() is run outside of the cache’s lock, so two threads missing on
+        the same key at the same time will both compute it.
+        """
+        if self._maxsize == 0:
+            with self._lock:
+                self._misses += 1
+            return self._timed_compute(compute)
+
+        generation = self._check_generation()
+
+        with self._lock:
+            if (entry := self._data.get(key)) is not None:
+                value, stored_at = entry
+                if self._ttl is None or time.monotonic() - stored_at < self._ttl:
+                    self._data.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._data[key]
+                self._expirations += 1
+            self._misses += 1
+
+        value = self._timed_compute(compute)
+
+        with self._lock:
+            if generation == self._generation:
+                self._data[key] = (value, time.monotonic())
+                self._data.move_to_end(key)
+                while len(self._data) > self._maxsize:
+                    self._data.popitem(last=False)
+                    self._evictions += 1
+        return value
+
+    def _timed_compute(self, compute: Callable[[], V]) -> V:
+        start = time.perf_counter()
+        try:
+            return compute()
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._compute_seconds += elapsed
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                maxsize=self._maxsize,
+                size=len(self._data),
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+                compute_seconds=self._compute_seconds,
+            )
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        """
+        Whether key has a value that get_or_compute() would return right now.
+
+        Does not count as a hit or miss, nor as a use of the entry.
+        """
+        if self._maxsize == 0:
+            return False
+        self._check_generation()
+        with self._lock:
+            if (entry := self._data.get(key)) is None:
+                return False
+            _, stored_at = entry
+            return self._ttl is None or time.monotonic() - stored_at < self._ttl
+
+    def _check_generation(self):
+        """Clear the cache if the generation has changed; return the current one"""
+        if self._generation_func is None:
+            return None
+
+        generation = self._generation_func()
+        with self._lock:
+            if generation != self._generation:
+                self._data.clear()
+                self._generation = generation
+                self._invalidations += 1
+        return generation
@@ -1,3 +1,9 @@
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
 VOWELS = {"a", "e", "i", "o"}
 
 
@@ -38,44 +44,54 @@ def remove_cree_diacritics(input_str) -> str:
     return input_str.translate(_diacritic_letter_ord_to_ascii)
 
 
-def del_dist(string, i):
-    """
-    custom distance for deleting a character at index i from string.
-    The string is guaranteed non-empty and i is not out of bound
-    """
-    if i > 0 and remove_cree_diacritics(string[i - 1]) in VOWELS and string[i] == "h":
-        return 0.5
-    return 1
+_VOWEL_BASES = frozenset(VOWELS)
 
+# Below this many candidates, looping over them in Python is faster than
+# setting up the NumPy arrays.
+_MIN_VECTORIZED_BATCH = 8
 
-def sub_dist(string, new_char, i):
+
+class _PreparedString(NamedTuple):
     """
-    custom distance for substituting a character at index i for a new character.
-    Note the string is guaranteed non-empty and i is not out-of-bound
+    A lowercased string with everything the distance calculation needs to know
+    about each of its characters worked out ahead of time.
     """
-    if new_char == string[i]:
-        return 0
-    elif remove_cree_diacritics(string[i]) == remove_cree_diacritics(new_char):
-        if remove_cree_diacritics(new_char) == "e":
-            return 0
-        else:
-            return 0.5
-    else:
-        return 1
 
+    chars: str
+    # The characters with Cree diacritics removed
+    bases: str
+    # Cost of deleting each character when this string is the spelling
+    deletion_costs: tuple[float, ...]
+    # Cost of inserting each character when this string is the normal form
+    insertion_costs: tuple[float, ...]
+    # The first row of the distance matrix when this string is the normal
+    # form: the cumulative insertion costs
+    insertion_row: tuple[float, ...]
 
-def ins_dist(string, char, i):
-    """
-    custom distance for inserting a character at index i to a non-empty string
-    Note the string is guaranteed non-empty and  0 <= i <= len(string)
-    """
-    if (
-        remove_cree_diacritics(string[min(i, len(string)) - 1]) in VOWELS
-        and char == "h"
-    ):
-        return 0.5
-    else:
-        return 1
+
+@lru_cache(maxsize=8192)
+def _prepare(string: str) -> _PreparedString:
+    chars = string.lower()
+    bases = remove_cree_diacritics(chars)
+
+    # An ‘h’ after a vowel is half as costly to delete or to insert. For
+    # insertions, the character before the first one is the last one, which
+    # is how the original calculation worked, so keep it that way.
+    deletion_costs = tuple(
+        0.5 if i > 0 and c == "h" and bases[i - 1] in _VOWEL_BASES else 1
+        for i, c in enumerate(chars)
+    )
+    insertion_costs = tuple(
+        0.5 if c == "h" and bases[i - 1] in _VOWEL_BASES else 1
+        for i, c in enumerate(chars)
+    )
+    insertion_row: list[float] = [0]
+    for cost in insertion_costs:
+        insertion_row.append(insertion_row[-1] + cost)
+
+    return _PreparedString(
+        chars, bases, deletion_costs, insertion_costs, tuple(insertion_row)
+    )
 
 
 def get_modified_distance(spelling: str, normal_form: str) -> float:
@@ -96,26 +112,219 @@ def get_modified_distance(spelling: str, normal_form: str) -> float:
 
     This function neglects letter case
 
+    To compare one string against many others, use get_modified_distances()
+    or get_modified_distances_to(), which are faster.
+
+    >>> get_modified_distance("atâk", "atâhk")
+    0.5
+    >>> get_modified_distance("wâpamew", "WÂPAMÊW")
+    0
+
     :param spelling:
     :param normal_form:
     :return: Our own metric of edit distance
     """
-    # see these slides for "weighted min edit distance"
-    # https://web.stanford.edu/class/cs124/lec/med.pdf
-    spelling = spelling.lower()
-    normal_form = normal_form.lower()
-    n, m = len(spelling), len(normal_form)
-    d = [[0] * (m + 1) for _ in range(n + 1)]
-    for i in range(1, n + 1):
-        d[i][0] = d[i - 1][0] + del_dist(spelling, i - 1)
-    for j in range(1, m + 1):
-        d[0][j] = d[0][j - 1] + ins_dist(normal_form, normal_form[j - 1], j - 1)
-
-    for i in range(1, n + 1):
-        for j in range(1, m + 1):
-            _del_dist = d[i - 1][j] + del_dist(spelling, i - 1)
-            _ins_dist = d[i][j - 1] + ins_dist(normal_form, normal_form[j - 1], j - 1)
-            _sub_dist = d[i - 1][j - 1] + sub_dist(spelling, normal_form[j - 1], i - 1)
-            d[i][j] = min((_del_dist, _ins_dist, _sub_dist))
-
-    return d[-1][-1]
+    prepared_normal_form = _prepare(normal_form)
+    return _distance(
+        _prepare(spelling),
+        prepared_normal_form,
+        list(prepared_normal_form.insertion_row),
+    )
+
+
+def get_modified_distances(spelling: str, normal_forms: Iterable[str]) -> list[float]:
+    """
+    Return get_modified_distance(spelling, normal_form) for each normal form
+
+    Large batches are computed with NumPy, which gives every distance as a
+    float: a distance of zero comes back as 0.0 rather than 0. The values
+    are the same either way.
+
+    >>> get_modified_distances("atâk", ["atâhk", "atak", "adak"])
+    [0.5, 0.5, 1.5]
+    """
+    prepared_normal_forms = [_prepare(f) for f in normal_forms]
+    prepared_spelling = _prepare(spelling)
+    if len(prepared_normal_forms) >= _MIN_VECTORIZED_BATCH:
+        return _vectorized_distances(
+            prepared_spelling, prepared_normal_forms, candidates_are_spellings=False
+        )
+
+    row: list[float] = []
+    ret = []
+    for normal_form in prepared_normal_forms:
+        row[:] = normal_form.insertion_row
+        ret.append(_distance(prepared_spelling, normal_form, row))
+    return ret
+
+
+def get_modified_distances_to(
+    spellings: Iterable[str], normal_form: str
+) -> list[float]:
+    """
+    Return get_modified_distance(spelling, normal_form) for each spelling
+
+    Like get_modified_distances(), large batches give every distance as a
+    float.
+
+    >>> get_modified_distances_to(["atâhk", "atak", "adak"], "atâk")
+    [0.5, 0.5, 1.5]
+    """
+    prepared_spellings = [_prepare(s) for s in spellings]
+    prepared_normal_form = _prepare(normal_form)
+    if len(prepared_spellings) >= _MIN_VECTORIZED_BATCH:
+        return _vectorized_distances(
+            prepared_normal_form, prepared_spellings, candidates_are_spellings=True
+        )
+
+    row: list[float] = []
+    ret = []
+    for spelling in prepared_spellings:
+        row[:] = prepared_normal_form.insertion_row
+        ret.append(_distance(spelling, prepared_normal_form, row))
+    return ret
+
+
+def _distance(
+    spelling: _PreparedString, normal_form: _PreparedString, row: list[float]
+) -> float:
+    """
+    The weighted minimum edit distance between spelling and normal_form
+
+    See these slides for “weighted min edit distance”:
+    https://web.stanford.edu/class/cs124/lec/med.pdf
+
+    Only one row of the distance matrix is kept, and it is updated in place.
+
+    :param row: must contain normal_form.insertion_row, and is overwritten
+    """
+    target_chars = normal_form.chars
+    target_bases = normal_form.bases
+    insertion_costs = normal_form.insertion_costs
+    columns = range(len(target_chars))
+
+    for char, base, deletion_cost in zip(
+        spelling.chars, spelling.bases, spelling.deletion_costs
+    ):
+        diagonal = row[0]
+        left = row[0] = diagonal + deletion_cost
+        for j in columns:
+            above = row[j + 1]
+
+            if target_chars[j] == char:
+                best = diagonal
+            elif target_bases[j] == base:
+                best = diagonal if base == "e" else diagonal + 0.5
+            else:
+                best = diagonal + 1
+
+            candidate = above + deletion_cost
+            if candidate < best:
+                best = candidate
+            candidate = left + insertion_costs[j]
+            if candidate < best:
+                best = candidate
+
+            row[j + 1] = left = best
+            diagonal = above
+
+    return row[-1]
+
+
+def _vectorized_distances(
+    fixed: _PreparedString,
+    candidates: list[_PreparedString],
+    *,
+    candidates_are_spellings: bool,
+) -> list[float]:
+    """
+    Compute the distances between fixed and every candidate at once
+
+    This runs the same dynamic programming as _distance(), for all the
+    candidates at the same time, one character of the fixed string at a time:
+    the matrices have a row for each character of the fixed string, and a
+    column for each character of a candidate. The fixed string is usually the
+    query, which is usually shorter than the candidates, so this is the
+    direction with the fewest steps.
+
+    Substitution costs are symmetric, so when the candidates are the spellings,
+    transposing the matrices gives the same answer, as long as moving down a
+    row costs what inserting a character of the fixed string would, and moving
+    along a row costs what deleting a character of the candidate would.
+
+    Within a row, each cell is the minimum of a value computed from the row
+    above, and of the cell to its left plus the cost of that step. Subtracting
+    the cumulative step costs turns that into a running minimum that NumPy can
+    compute in one call. All the costs are multiples of ½, so the floating-point
+    arithmetic is exact.
+    """
+    if candidates_are_spellings:
+        fixed_step_costs = fixed.insertion_costs
+        candidate_step_costs = [c.deletion_costs for c in candidates]
+    else:
+        fixed_step_costs = fixed.deletion_costs
+        candidate_step_costs = [c.insertion_costs for c in candidates]
+
+    count = len(candidates)
+    lengths = np.fromiter((len(c.chars) for c in candidates), int, count)
+    max_length = int(lengths.max()) if count else 0
+
+    fixed_chars = _ords(fixed.chars)
+    fixed_bases = _ords(fixed.bases)
+
+    # Only a few distinct characters appear in the candidates, so work out
+    # their substitution costs against each character of the fixed string
+    # up front. The extra last column is for padding past the end of a
+    # candidate, which never affects its result.
+    distinct_chars, char_indices = np.unique(
+        _ords("".join(c.chars for c in candidates)), return_inverse=True
+    )
+    distinct_bases = _ords(remove_cree_diacritics("".join(map(chr, distinct_chars))))
+    substitution_costs = np.ones((len(fixed_chars), len(distinct_chars) + 1))
+    substitution_costs[:, :-1] = np.where(
+        fixed_chars[:, np.newaxis] == distinct_chars,
+        0.0,
+        np.where(
+            fixed_bases[:, np.newaxis] == distinct_bases,
+            # Substituting between two forms of ‘e’ is free
+            np.where(fixed_bases == ord("e"), 0.0, 0.5)[:, np.newaxis],
+            1.0,
+        ),
+    )
+
+    # Scatter the characters of all the candidates into padded matrices, with
+    # a row for each candidate.
+    rows = np.repeat(np.arange(count), lengths)
+    positions = np.arange(len(char_indices)) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
+    )
+    candidate_chars = np.full((count, max_length), len(distinct_chars))
+    candidate_chars[rows, positions] = char_indices
+    step_costs = np.ones((count, max_length))
+    step_costs[rows, positions] = np.fromiter(
+        chain.from_iterable(candidate_step_costs), float, len(positions)
+    )
+    cumulative_costs = np.zeros((count, max_length + 1))
+    np.cumsum(step_costs, axis=1, out=cumulative_costs[:, 1:])
+
+    row = cumulative_costs.copy()
+    from_above = np.empty_like(row)
+    for fixed_step_cost, costs in zip(fixed_step_costs, substitution_costs):
+        np.add(row, fixed_step_cost, out=from_above)
+        np.minimum(
+            from_above[:, 1:],
+            row[:, :-1] + costs[candidate_chars],
+            out=from_above[:, 1:],
+        )
+        from_above -= cumulative_costs
+        np.minimum.accumulate(from_above, axis=1, out=row)
+        row += cumulative_costs
+
+    return row[np.arange(count), lengths].tolist()
+
+
+def _ords(string: str) -> np.ndarray:
+    """
+    The code points of the characters in string, as a NumPy array
+    """
+    return np.frombuffer(string.encode("UTF-32-LE"), dtype="<u4").astype(int)
@@ -0,0 +1,25 @@
+"""
+Generating forms with an FST in a pool of worker processes
+
+This module must not import Django, directly or through its package. Under
+the spawn start method, the default on macOS, each worker process imports it
+afresh, and Django isn’t set up there.
+"""
+
+from typing import Optional
+
+from hfst_optimized_lookup import TransducerFile
+
+# Set in each worker process by load_generator()
+_generator: Optional[TransducerFile] = None
+
+
+def load_generator(fst_path: str):
+    """Pool initializer: load the generator FST in this worker process"""
+    global _generator
+    _generator = TransducerFile(fst_path)
+
+
+def generate_batch(analyses: list[str]) -> dict[str, set[str]]:
+    assert _generator is not None, "the pool initializer must be load_generator"
+    return _generator.bulk_lookup(analyses)
@@ -26,6 +26,13 @@ os.environ.setdefault("PERFORM_TIME_CONSUMING_INITIALIZATIONS", "True")
 # setting points here.
 application = get_wsgi_application()
 
+# Under uWSGI, this file is loaded in the master process, which then forks the
+# workers; everything preloaded above is shared between them. Elsewhere, this
+# does no harm.
+from CreeDictionary.API.preload import prepare_to_fork
+
+prepare_to_fork()
+
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)
@@ -1,8 +1,14 @@
+from __future__ import annotations
+
 from functools import cache
+from typing import Tuple
 
 from django.conf import settings
+from django.utils.functional import cached_property
 from hfst_optimized_lookup import TransducerFile, Analysis
 
+from CreeDictionary.utils.bounded_cache import BoundedCache
+
 FST_DIR = settings.BASE_DIR / "resources" / "fst"
 
 
@@ -21,15 +27,52 @@ def strict_analyzer():
     return TransducerFile(FST_DIR / settings.STRICT_ANALYZER_FST_FILENAME)
 
 
-def rich_analyze_relaxed(text):
-    return list(
-        RichAnalysis(r) for r in relaxed_analyzer().lookup_lemma_with_affixes(text)
+class _Cache:
+    """
+    Remembers FST lookups, as the same forms are looked up over and over.
+
+    Each cache holds at most settings.FST_CACHE_SIZE entries. The values are
+    tuples, since they are shared by every caller.
+    """
+
+    @cached_property
+    def relaxed_analyses(self) -> BoundedCache[str, tuple[RichAnalysis, ...]]:
+        return BoundedCache(settings.FST_CACHE_SIZE)
+
+    @cached_property
+    def strict_analyses(self) -> BoundedCache[str, tuple[RichAnalysis, ...]]:
+        return BoundedCache(settings.FST_CACHE_SIZE)
+
+    @cached_property
+    def generated_forms(self) -> BoundedCache[str, tuple[str, ...]]:
+        return BoundedCache(settings.FST_CACHE_SIZE)
+
+    def stats(self) -> dict:
+        return {
+            "relaxed_analyses": self.relaxed_analyses.stats().as_dict(),
+            "strict_analyses": self.strict_analyses.stats().as_dict(),
+            "generated_forms": self.generated_forms.stats().as_dict(),
+        }
+
+
+fst_cache = _Cache()
+
+
+def rich_analyze_relaxed(text) -> tuple[RichAnalysis, ...]:
+    return fst_cache.relaxed_analyses.get_or_compute(
+        text,
+        lambda: tuple(
+            RichAnalysis(r) for r in relaxed_analyzer().lookup_lemma_with_affixes(text)
+        ),
     )
 
 
-def rich_analyze_strict(text):
-    return list(
-        RichAnalysis(r) for r in strict_analyzer().lookup_lemma_with_affixes(text)
+def rich_analyze_strict(text) -> tuple[RichAnalysis, ...]:
+    return fst_cache.strict_analyses.get_or_compute(
+        text,
+        lambda: tuple(
+            RichAnalysis(r) for r in strict_analyzer().lookup_lemma_with_affixes(text)
+        ),
     )
 
 
@@ -38,8 +81,13 @@ class RichAnalysis:
 
     Put all your methods for dealing with things like `PV/e+nipâw+V+AI+Cnj+3Pl`
     here.
+
+    RichAnalysis objects are shared between callers by the FST caches, so they
+    must not be modified.
     """
 
+    __slots__ = ("_tuple",)
+
     def __init__(self, analysis):
         if isinstance(analysis, Analysis):
             self._tuple = analysis
@@ -69,8 +117,11 @@ class RichAnalysis:
     def suffix_tags(self):
         return self._tuple.suffixes
 
-    def generate(self):
-        return strict_generator().lookup(self.smushed())
+    def generate(self) -> Tuple[str, ...]:
+        smushed = self.smushed()
+        return fst_cache.generated_forms.get_or_compute(
+            smushed, lambda: tuple(strict_generator().lookup(smushed))
+        )
 
     def smushed(self):
         return "".join(self.prefix_tags) + self.lemma + "".join(self.suffix_tags)
@@ -0,0 +1,51 @@
+from morphodict import analysis
+from morphodict.analysis import RichAnalysis
+
+
+class FakeTransducer:
+    def __init__(self):
+        self.lookups = []
+
+    def lookup_lemma_with_affixes(self, text):
+        self.lookups.append(text)
+        return [((), text, ("+N", "+A", "+Sg"))]
+
+    def lookup(self, text):
+        self.lookups.append(text)
+        return [text.split("+")[0] + "a"]
+
+
+def test_analyses_are_remembered(monkeypatch):
+    transducer = FakeTransducer()
+    monkeypatch.setattr(analysis, "relaxed_analyzer", lambda: transducer)
+    monkeypatch.setattr(analysis, "fst_cache", analysis._Cache())
+
+    first = analysis.rich_analyze_relaxed("atim")
+    assert first == (RichAnalysis(((), "atim", ("+N", "+A", "+Sg"))),)
+    assert analysis.rich_analyze_relaxed("atim") is first
+    assert transducer.lookups == ["atim"]
+
+    stats = analysis.fst_cache.stats()["relaxed_analyses"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_generated_forms_are_remembered(monkeypatch):
+    transducer = FakeTransducer()
+    monkeypatch.setattr(analysis, "strict_generator", lambda: transducer)
+    monkeypatch.setattr(analysis, "fst_cache", analysis._Cache())
+
+    rich_analysis = RichAnalysis(((), "atim", ("+N", "+A", "+Pl")))
+    assert rich_analysis.generate() == ("atima",)
+    assert RichAnalysis(((), "atim", ("+N", "+A", "+Pl"))).generate() == ("atima",)
+    assert transducer.lookups == ["atim+N+A+Pl"]
+
+
+def test_cache_can_be_disabled(monkeypatch, settings):
+    settings.FST_CACHE_SIZE = 0
+    transducer = FakeTransducer()
+    monkeypatch.setattr(analysis, "strict_analyzer", lambda: transducer)
+    monkeypatch.setattr(analysis, "fst_cache", analysis._Cache())
+
+    analysis.rich_analyze_strict("atim")
+    analysis.rich_analyze_strict("atim")
+    assert transducer.lookups == ["atim", "atim"]
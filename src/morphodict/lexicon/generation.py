@@ -0,0 +1,132 @@
+"""
+The lexicon generation: a stamp that changes every time the lexicon does.
+
+Long-lived processes, like web server workers, keep all sorts of things derived
+from the lexicon in memory. The import runs in a different process, so it can’t
+simply tell them to throw those things away. Instead, it writes a new
+generation stamp to a file next to the database, and anything that caches
+lexicon-derived data can compare the current stamp against the one it saw when
+it filled its cache.
+
+Checking the stamp costs one stat() call; the file is only re-read when it has
+been replaced.
+"""
+
+import os
+import time
+import uuid
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Generic, Optional, TypedDict, TypeVar
+
+from django.conf import settings
+
+# What current_lexicon_generation() returns if no import has ever written a
+# stamp. Anything cached under this generation will be invalidated by the next
+# import.
+UNKNOWN_GENERATION = "unknown"
+
+
+def lexicon_generation_path() -> Path:
+    filename = "lexicon_generation"
+    if settings.USE_TEST_DB:
+        filename = "test_db_lexicon_generation"
+    return settings.BASE_DIR / "db" / filename
+
+
+class _GenerationCache(TypedDict):
+    # (inode, mtime) of the stamp file when it was last read. Every bump
+    # renames a new file into place, so the inode changes even on filesystems
+    # with coarse modification times.
+    file_id: Optional[tuple[int, int]]
+    generation: str
+
+
+_generation_cache: _GenerationCache = {
+    "file_id": None,
+    "generation": UNKNOWN_GENERATION,
+}
+_generation_cache_mutex = Lock()
+
+
+def current_lexicon_generation() -> str:
+    """
+    Return the stamp written by the most recent import.
+    """
+    path = lexicon_generation_path()
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return UNKNOWN_GENERATION
+    file_id = (stat.st_ino, stat.st_mtime_ns)
+
+    with _generation_cache_mutex:
+        if file_id != _generation_cache["file_id"]:
+            _generation_cache["generation"] = path.read_text().strip()
+            _generation_cache["file_id"] = file_id
+        return _generation_cache["generation"]
+
+
+def bump_lexicon_generation() -> str:
+    """
+    Record that the lexicon has changed, invalidating lexicon-derived caches in
+    every process that checks the generation.
+
+    :return: the new generation stamp
+    """
+    path = lexicon_generation_path()
+    generation = uuid.uuid4().hex
+
+    # Write-then-rename so that readers never see a half-written stamp.
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(generation + "\n")
+    os.replace(tmp_path, path)
+
+    return generation
+
+
+T = TypeVar("T")
+
+
+class PerGeneration(Generic[T]):
+    """
+    Holds one value derived from the lexicon, reloading it when the lexicon
+    generation changes.
+
+    `load` is called with the current generation, and may return None if the
+    value is not available for that generation yet, e.g., because an index
+    file has not been rebuilt after an import. In that case, get() returns None
+    and loading is retried, at most once every `retry_seconds`.
+    """
+
+    def __init__(self, load: Callable[[str], Optional[T]], *, retry_seconds=10.0):
+        self._load = load
+        self._retry_seconds = retry_seconds
+        self._generation: Optional[str] = None
+        self._value: Optional[T] = None
+        self._last_failure: Optional[tuple[str, float]] = None
+        self._mutex = Lock()
+
+    def get(self) -> Optional[T]:
+        generation = current_lexicon_generation()
+        with self._mutex:
+            if self._generation == generation:
+                return self._value
+
+            if self._last_failure is not None:
+                failed_generation, failed_at = self._last_failure
+                if (
+                    failed_generation == generation
+                    and time.monotonic() - failed_at < self._retry_seconds
+                ):
+                    return None
+
+            value = self._load(generation)
+            if value is None:
+                self._last_failure = (generation, time.monotonic())
+                return None
+
+            self._generation = generation
+            self._value = value
+            self._last_failure = None
+            return value
@@ -0,0 +1,494 @@
+"""
+Compact, memory-mapped maps from strings to sorted arrays of wordform IDs.
+
+These are written once, when the lexicon is imported, and are then read-only.
+Because the file is memory-mapped rather than unpickled into dicts and lists,
+every web server process on the machine shares the same pages, and opening one
+is nearly free.
+
+File layout, all integers in native byte order:
+
+    header    MAGIC, format version, byte order, flags, generation stamp
+    n_keys    u64
+    key_offs  u64 × (n_keys + 1)   offsets of each key in the key blob
+    id_offs   u64 × (n_keys + 1)   offsets of each key’s IDs in the ID array
+    ids       i64 × id_offs[-1]    for each key, its IDs in ascending order
+    weights   f64 × id_offs[-1]    only if weighted: the weight of each ID
+    tree      f64 × 2·size         only if weighted: see below
+    keys      UTF-8 bytes          keys in ascending byte order, concatenated
+
+Keys are found by binary search, so a lookup never has to build a dict. Since
+the keys are sorted, all the keys with a given prefix are next to each other,
+so prefix searches are binary searches too.
+
+An index can also be written with a weight for each ID, so that the best few
+IDs for a prefix can be found without looking at all of them. The tree is then
+a segment tree over the keys: size is the smallest power of two that is at
+least n_keys, tree[size + i] is the highest weight among the IDs of key i, and
+tree[j] is the larger of tree[2j] and tree[2j + 1]. A best-first walk down
+the tree from the nodes that cover a prefix’s keys only visits the keys that
+hold one of the best IDs.
+
+Substring index files map strings to IDs the same way, but are searched by
+any substring of the keys, using a suffix array:
+
+    header    SUBSTRING_MAGIC, format version, byte order, generation stamp
+    n_keys    u64
+    n_sufs    u64
+    key_offs  u64 × (n_keys + 1)   offsets of each key in the key blob
+    id_offs   u64 × (n_keys + 1)   offsets of each key’s IDs in the ID array
+    ids       i64 × id_offs[-1]    for each key, its IDs in ascending order
+    suffixes  u64 × n_sufs         see below
+    keys      UTF-8 bytes          keys in ascending byte order, each
+                                   followed by a NUL byte
+
+There is a suffix for every character of every key, running from that
+character to the end of the key. The suffixes array has the offset of each
+one in the key blob, in ascending order of the suffixes. The keys that contain
+a substring are the ones with a suffix that starts with it, and those
+suffixes are next to each other in the array, so finding them takes two
+binary searches. As a NUL byte sorts before any other, comparing the m bytes
+at a suffix’s offset with an m-byte substring gives the same answer as
+comparing the suffix itself, so each binary search reads O(m log n) bytes.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping, Optional, Sequence
+
+MAGIC = b"MDIDXv1\0"
+SUBSTRING_MAGIC = b"MDSUBv1\0"
+# Bump this when changing the file layout, so that old files are rejected
+# instead of misread.
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<8sIcBxxI")
+_WEIGHTED = 1
+_U64 = struct.Struct("=Q")
+_BYTE_ORDER = b"L" if sys.byteorder == "little" else b"B"
+
+
+class IdIndexError(Exception):
+    """
+    Raised when an index file can’t be used.
+    """
+
+
+class StaleIdIndexError(IdIndexError):
+    """
+    Raised when an index file was built from a different lexicon generation.
+    """
+
+
+def write_id_index(
+    path: Path,
+    mapping: Mapping[str, Iterable[int]],
+    *,
+    generation: str,
+    weights: Optional[Mapping[int, float]] = None,
+) -> None:
+    """
+    Write mapping to path as an id index file.
+
+    If weights are given, IdIndex.best_ids_with_prefix() can be used on the
+    file. Higher weights are better; IDs without a weight come last.
+
+    The file is written under a temporary name and then renamed into place, so
+    processes that already have the old file open keep working.
+    """
+    encoded_keys = sorted((key.encode("UTF-8"), key) for key in mapping)
+
+    key_offsets = array("Q", [0])
+    id_offsets = array("Q", [0])
+    ids = array("q")
+    key_blob = bytearray()
+    for encoded_key, key in encoded_keys:
+        key_blob += encoded_key
+        key_offsets.append(len(key_blob))
+        ids.extend(sorted(set(mapping[key])))
+        id_offsets.append(len(ids))
+
+    flags = 0
+    if weights is not None:
+        flags |= _WEIGHTED
+        id_weights = array("d", (weights.get(i, -math.inf) for i in ids))
+        tree = _max_weight_tree(id_weights, id_offsets)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_header(MAGIC, flags, generation))
+        f.write(_U64.pack(len(encoded_keys)))
+        key_offsets.tofile(f)
+        id_offsets.tofile(f)
+        ids.tofile(f)
+        if weights is not None:
+            id_weights.tofile(f)
+            tree.tofile(f)
+        f.write(key_blob)
+    os.replace(tmp_path, path)
+
+
+def write_substring_index(
+    path: Path, mapping: Mapping[str, Iterable[int]], *, generation: str
+) -> None:
+    """
+    Write mapping to path as a substring index file.
+
+    Keys must not contain NUL characters. Like write_id_index(), this replaces
+    any existing file atomically.
+    """
+    encoded_keys = sorted((key.encode("UTF-8"), key) for key in mapping)
+
+    key_offsets = array("Q", [0])
+    id_offsets = array("Q", [0])
+    ids = array("q")
+    key_blob = bytearray()
+    suffixes: list[tuple[bytes, int]] = []
+    for encoded_key, key in encoded_keys:
+        if b"\0" in encoded_key:
+            raise ValueError(f"key {key!r} contains a NUL character")
+        start = len(key_blob)
+        key_blob += encoded_key + b"\0"
+        key_offsets.append(len(key_blob))
+        ids.extend(sorted(set(mapping[key])))
+        id_offsets.append(len(ids))
+        suffixes.extend(
+            (encoded_key[i:], start + i)
+            for i in range(len(encoded_key))
+            # Only start suffixes on whole characters
+            if encoded_key[i] & 0xC0 != 0x80
+        )
+    suffixes.sort()
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_header(SUBSTRING_MAGIC, 0, generation))
+        f.write(_U64.pack(len(encoded_keys)))
+        f.write(_U64.pack(len(suffixes)))
+        key_offsets.tofile(f)
+        id_offsets.tofile(f)
+        ids.tofile(f)
+        array("Q", (offset for _, offset in suffixes)).tofile(f)
+        f.write(key_blob)
+    os.replace(tmp_path, path)
+
+
+def _header(magic: bytes, flags: int, generation: str) -> bytes:
+    encoded_generation = generation.encode("UTF-8")
+    header = (
+        _HEADER.pack(magic, FORMAT_VERSION, _BYTE_ORDER, flags, len(encoded_generation))
+        + encoded_generation
+    )
+    return header + b"\0" * (-len(header) % 8)
+
+
+def _map_file(
+    path: Path, magic: bytes, expected_generation: Optional[str]
+) -> tuple[mmap.mmap, str, int, int]:
+    """
+    Map the file at path, and check its header
+
+    :return: the map, the generation, the header flags, and the position after
+        the header
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise IdIndexError(f"{path} is empty")
+
+    if len(mapped) < _HEADER.size:
+        raise IdIndexError(f"{path} is too short to be an index file")
+    (
+        file_magic,
+        version,
+        byte_order,
+        flags,
+        generation_length,
+    ) = _HEADER.unpack_from(mapped)
+    if file_magic != magic or version != FORMAT_VERSION or byte_order != _BYTE_ORDER:
+        raise IdIndexError(f"{path} is not a version {FORMAT_VERSION} index file")
+
+    pos = _HEADER.size
+    generation = mapped[pos : pos + generation_length].decode("UTF-8")
+    if expected_generation is not None and generation != expected_generation:
+        raise StaleIdIndexError(
+            f"{path} is for lexicon generation {generation!r}, not {expected_generation!r}"
+        )
+    pos += generation_length
+    pos += -pos % 8
+    return mapped, generation, flags, pos
+
+
+def _max_weight_tree(id_weights: array, id_offsets: array) -> array:
+    n_keys = len(id_offsets) - 1
+    size = _tree_size(n_keys)
+    tree = array("d", [-math.inf]) * (2 * size)
+    for i in range(n_keys):
+        tree[size + i] = max(id_weights[id_offsets[i] : id_offsets[i + 1]])
+    for j in range(size - 1, 0, -1):
+        tree[j] = max(tree[2 * j], tree[2 * j + 1])
+    return tree
+
+
+def _tree_size(n_keys: int) -> int:
+    return 1 << max(n_keys - 1, 0).bit_length()
+
+
+class IdIndex:
+    """
+    A read-only, memory-mapped map from strings to sorted sequences of IDs.
+    """
+
+    def __init__(self, path: Path, *, expected_generation: Optional[str] = None):
+        """
+        :raises FileNotFoundError: if there is no index file at path
+        :raises IdIndexError: if the file is not a usable index file
+        :raises StaleIdIndexError: if expected_generation is given, and the
+            index was built for a different lexicon generation
+        """
+        self._mmap, self.generation, flags, pos = _map_file(
+            path, MAGIC, expected_generation
+        )
+        buf = memoryview(self._mmap)
+
+        (n_keys,) = _U64.unpack_from(buf, pos)
+        pos += _U64.size
+
+        def take(count, format):
+            nonlocal pos
+            start = pos
+            pos += count * 8
+            return buf[start:pos].cast(format)
+
+        self._key_offsets = take(n_keys + 1, "Q")
+        self._id_offsets = take(n_keys + 1, "Q")
+        self._ids = take(self._id_offsets[-1], "q")
+        if flags & _WEIGHTED:
+            self._weights = take(self._id_offsets[-1], "d")
+            self._tree = take(2 * _tree_size(n_keys), "d")
+        else:
+            self._weights = self._tree = None
+        self._keys = buf[pos:]
+        self._n_keys = n_keys
+
+    def get(self, key: str) -> Sequence[int]:
+        """
+        Return the IDs for key, in ascending order, or an empty sequence.
+        """
+        i = self._find(key.encode("UTF-8"))
+        if i is None:
+            return ()
+        return self._ids[self._id_offsets[i] : self._id_offsets[i + 1]]
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key.encode("UTF-8")) is not None
+
+    def __len__(self) -> int:
+        return self._n_keys
+
+    def keys(self) -> Iterator[str]:
+        for i in range(self._n_keys):
+            yield self._key(i).decode("UTF-8")
+
+    def items(self) -> Iterator[tuple[str, Sequence[int]]]:
+        for i in range(self._n_keys):
+            yield (
+                self._key(i).decode("UTF-8"),
+                self._ids[self._id_offsets[i] : self._id_offsets[i + 1]],
+            )
+
+    def items_with_prefix(self, prefix: str) -> Iterator[tuple[str, Sequence[int]]]:
+        """
+        Yield every key that starts with prefix, with its IDs, in key order.
+        """
+        encoded_prefix = prefix.encode("UTF-8")
+        i = self._lower_bound(encoded_prefix)
+        while i < self._n_keys and (key := self._key(i)).startswith(encoded_prefix):
+            yield (
+                key.decode("UTF-8"),
+                self._ids[self._id_offsets[i] : self._id_offsets[i + 1]],
+            )
+            i += 1
+
+    def best_ids_with_prefix(self, prefix: str, k: int) -> list[int]:
+        """
+        Return the k distinct IDs with the highest weights among all the keys
+        that start with prefix, best first.
+
+        This takes about as long however many keys start with prefix.
+
+        :raises IdIndexError: if the index was written without weights
+        """
+        if self._tree is None:
+            raise IdIndexError("best_ids_with_prefix() needs a weighted index")
+
+        encoded_prefix = prefix.encode("UTF-8")
+        lo = self._lower_bound(encoded_prefix)
+        hi = self._prefix_end(encoded_prefix, lo)
+
+        # Nodes below size are inner tree nodes, nodes from size to 2·size are
+        # keys, and a node n past that is the ID at position n - 2·size.
+        size = len(self._tree) // 2
+        heap = []
+        left, right = lo + size, hi + size
+        while left < right:
+            if left & 1:
+                heap.append((-self._tree[left], left))
+                left += 1
+            if right & 1:
+                right -= 1
+                heap.append((-self._tree[right], right))
+            left >>= 1
+            right >>= 1
+        heapq.heapify(heap)
+
+        best: list[int] = []
+        seen = set()
+        while heap and len(best) < k:
+            _, node = heapq.heappop(heap)
+            if node < size:
+                for child in (2 * node, 2 * node + 1):
+                    heapq.heappush(heap, (-self._tree[child], child))
+            elif node < 2 * size:
+                i = node - size
+                for position in range(self._id_offsets[i], self._id_offsets[i + 1]):
+                    heapq.heappush(
+                        heap, (-self._weights[position], 2 * size + position)
+                    )
+            else:
+                found_id = self._ids[node - 2 * size]
+                if found_id not in seen:
+                    seen.add(found_id)
+                    best.append(found_id)
+        return best
+
+    def _key(self, i: int) -> bytes:
+        return bytes(self._keys[self._key_offsets[i] : self._key_offsets[i + 1]])
+
+    def _lower_bound(self, encoded_key: bytes) -> int:
+        """
+        Return the position of the first key that is not less than encoded_key
+        """
+        lo, hi = 0, self._n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < encoded_key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_end(self, encoded_prefix: bytes, lo: int) -> int:
+        """
+        Return the position after the last key that starts with encoded_prefix,
+        given the position of the first one
+        """
+        hi = self._n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid).startswith(encoded_prefix):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, encoded_key: bytes) -> Optional[int]:
+        i = self._lower_bound(encoded_key)
+        if i < self._n_keys and self._key(i) == encoded_key:
+            return i
+        return None
+
+
+class SubstringIndex:
+    """
+    A read-only, memory-mapped map from strings to sorted sequences of IDs,
+    searched by substrings of the strings.
+    """
+
+    def __init__(self, path: Path, *, expected_generation: Optional[str] = None):
+        """
+        :raises FileNotFoundError: if there is no index file at path
+        :raises IdIndexError: if the file is not a usable substring index file
+        :raises StaleIdIndexError: if expected_generation is given, and the
+            index was built for a different lexicon generation
+        """
+        self._mmap, self.generation, _, pos = _map_file(
+            path, SUBSTRING_MAGIC, expected_generation
+        )
+        buf = memoryview(self._mmap)
+
+        (n_keys,) = _U64.unpack_from(buf, pos)
+        pos += _U64.size
+        (n_suffixes,) = _U64.unpack_from(buf, pos)
+        pos += _U64.size
+
+        def take(count, format):
+            nonlocal pos
+            start = pos
+            pos += count * 8
+            return buf[start:pos].cast(format)
+
+        self._key_offsets = take(n_keys + 1, "Q")
+        self._id_offsets = take(n_keys + 1, "Q")
+        self._ids = take(self._id_offsets[-1], "q")
+        self._suffixes = take(n_suffixes, "Q")
+        self._keys = buf[pos:]
+        self._n_keys = n_keys
+
+    def __len__(self) -> int:
+        return self._n_keys
+
+    def items_containing(self, substring: str) -> Iterator[tuple[str, Sequence[int]]]:
+        """
+        Yield every key that contains substring, with its IDs, in key order.
+        """
+        encoded = substring.encode("UTF-8")
+        m = len(encoded)
+        keys = self._keys
+        suffixes = self._suffixes
+
+        lo, hi = 0, len(suffixes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = suffixes[mid]
+            if bytes(keys[offset : offset + m]) < encoded:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+
+        hi = len(suffixes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = suffixes[mid]
+            if bytes(keys[offset : offset + m]) == encoded:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        # A key containing substring more than once has a suffix for each time
+        matched = sorted(
+            {
+                bisect.bisect_right(self._key_offsets, suffixes[i]) - 1
+                for i in range(start, lo)
+            }
+        )
+        for i in matched:
+            yield (
+                self._key(i).decode("UTF-8"),
+                self._ids[self._id_offsets[i] : self._id_offsets[i + 1]],
+            )
+
+    def _key(self, i: int) -> bytes:
+        # Without the NUL byte
+        return bytes(self._keys[self._key_offsets[i] : self._key_offsets[i + 1] - 1])
@@ -0,0 +1,45 @@
+from django.db.models import Max
+
+
+class InsertBuffer:
+    """A container for objects to be bulk-inserted.
+
+    Will automatically assign IDs to provided objects, and call
+    `manager.bulk_create` every `count` objects. The caller is responsible for
+    calling `save()` one final time when done.
+    """
+
+    def __init__(self, manager, count=500, assign_id=False):
+        """
+        If assign_id is True, this class will assign IDs to objects added to it,
+        so that they can immediately be used in foreign key references.
+
+        A future Django release should remove the need for this method. Django
+        bulk_create can currently return database-generated IDs on Oracle and
+        Postgres; INSERT … RETURNING support was only added to the SQLite
+        database itself in 3.35.0 released 2021-03-12, so Django does not
+        support it yet.
+        """
+        self._queryset = manager
+        self._count = count
+        self._buffer = []
+        self._assign_id = assign_id
+
+        if self._assign_id:
+            max_id = manager.aggregate(Max("id"))["id__max"]
+            if max_id is None:
+                max_id = 0
+            self._next_id = max_id + 1
+
+    def add(self, obj):
+        if self._assign_id and obj.id is None:
+            obj.id = self._next_id
+            self._next_id += 1
+
+        self._buffer.append(obj)
+        if len(self._buffer) >= self._count:
+            self.save()
+
+    def save(self):
+        self._queryset.bulk_create(self._buffer)
+        self._buffer = []
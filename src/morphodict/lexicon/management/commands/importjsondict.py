@@ -1,11 +1,16 @@
+import hashlib
 import json
 import logging
+import os
 from argparse import (
     ArgumentParser,
     BooleanOptionalAction,
     ArgumentDefaultsHelpFormatter,
 )
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterable, Iterator
 
 from django.conf import settings
 from django.core.management import BaseCommand, call_command
@@ -13,15 +18,19 @@ from django.db import transaction
 from tqdm import tqdm
 
 from CreeDictionary.CreeDictionary.paradigm.generation import default_paradigm_manager
+from CreeDictionary.utils import generator_pool
 from CreeDictionary.utils.english_keyword_extraction import stem_keywords
-from morphodict.analysis import RichAnalysis, strict_generator
+from morphodict.analysis import FST_DIR, RichAnalysis, strict_generator
 from morphodict.lexicon import DEFAULT_IMPORTJSON_FILE
+from morphodict.lexicon.generation import bump_lexicon_generation
+from morphodict.lexicon.insert_buffer import InsertBuffer
 from morphodict.lexicon.models import (
     Wordform,
     Definition,
     DictionarySource,
     TargetLanguageKeyword,
     SourceLanguageKeyword,
+    smush_analysis,
 )
 from morphodict.lexicon.util import to_source_language_keyword
 
@@ -60,6 +69,37 @@ class Command(BaseCommand):
             """,
         )
 
+        parser.add_argument(
+            "--incremental",
+            action=BooleanOptionalAction,
+            default=True,
+            help="""
+                Skip entries that haven’t changed since they were last
+                imported, and only update definition vectors, auto-translations
+                and lemma snapshots for the entries that did. An entry only
+                counts as imported once the whole import has finished, so
+                entries from an import that failed partway through are
+                redone. Use --no-incremental to re-import everything after
+                changing the FSTs or paradigm layouts.
+            """,
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=os.cpu_count(),
+            help="""
+                The number of processes generating paradigm forms, each with
+                its own copy of the generator FST. With 1, forms are generated
+                in this process.
+            """,
+        )
+        parser.add_argument(
+            "--generation-batch-size",
+            type=int,
+            default=5000,
+            help="The number of analyses sent to the generator FST at once",
+        )
+
         parser.add_argument(
             "json_file",
             help=f"The importjson file to import",
@@ -67,36 +107,69 @@ class Command(BaseCommand):
             default=DEFAULT_IMPORTJSON_FILE,
         )
 
-    def handle(self, json_file, purge, atomic, **options):
+    def handle(
+        self,
+        json_file,
+        purge,
+        atomic,
+        incremental,
+        jobs,
+        generation_batch_size,
+        **options,
+    ):
+        self.jobs = jobs
+        self.generation_batch_size = generation_batch_size
+
         if atomic:
             with transaction.atomic():
-                self.run_import(json_file=json_file, purge=purge)
+                self.run_import(
+                    json_file=json_file, purge=purge, incremental=incremental
+                )
         else:
-            self.run_import(json_file=json_file, purge=purge)
+            self.run_import(json_file=json_file, purge=purge, incremental=incremental)
 
-    def run_import(self, json_file, purge):
+    def run_import(self, json_file, purge, incremental):
         for abbrv in ["CW", "MD", "AE", "ALD", "OS"]:
             if not DictionarySource.objects.filter(abbrv=abbrv):
                 DictionarySource.objects.create(abbrv=abbrv)
 
         paradigm_manager = default_paradigm_manager()
 
-        # These slug collections track what should be purged
-        existing_slugs = {
-            v[0]
-            for v in Wordform.objects.filter(slug__isnull=False).values_list("slug")
-        }
+        # These track what should be purged, and what is unchanged since the
+        # last import
+        existing_hashes = dict(
+            Wordform.objects.filter(slug__isnull=False).values_list(
+                "slug", "import_hash"
+            )
+        )
         seen_slugs = set()
+        changed_slugs = set()
+        # Recorded only at the very end, so that a failed import is redone
+        # by the next one instead of being taken as up to date.
+        pending_hashes: list[tuple[Wordform, str]] = []
 
-        form_definitions = []
+        lemmas_to_instantiate = []
         logger.info(f"Importing {json_file}")
         data = json.loads(Path(json_file).read_text())
+
+        # formOf slug → entries; these are hashed along with their lemma
+        form_definitions = defaultdict(list)
+        for entry in data:
+            if "formOf" in entry:
+                form_definitions[entry["formOf"]].append(entry)
+
         for entry in tqdm(data):
             if "formOf" in entry:
-                form_definitions.append(entry)
                 continue
 
-            if existing := Wordform.objects.filter(slug=entry["slug"]).first():
+            slug = validate_slug_format(entry["slug"])
+            seen_slugs.add(slug)
+            entry_hash = import_hash(entry, form_definitions.get(slug, []))
+            if incremental and existing_hashes.get(slug) == entry_hash:
+                continue
+            changed_slugs.add(slug)
+
+            if existing := Wordform.objects.filter(slug=slug).first():
                 # Cascade should take care of all related objects.
                 existing.delete()
 
@@ -104,33 +177,17 @@ class Command(BaseCommand):
                 text=entry["head"],
                 raw_analysis=entry.get("analysis", None),
                 paradigm=entry.get("paradigm", None),
-                slug=validate_slug_format(entry["slug"]),
+                slug=slug,
                 is_lemma=True,
                 linguist_info=entry.get("linguistInfo", {}),
             )
             wf.lemma = wf
             wf.save()
+            pending_hashes.append((wf, entry_hash))
 
-            # Instantiate wordforms
+            # Paradigm forms are generated for all lemmas at once, below
             if wf.analysis and wf.paradigm:
-                for (
-                    prefix_tags,
-                    suffix_tags,
-                ) in paradigm_manager.all_analysis_template_tags(wf.paradigm):
-                    analysis = RichAnalysis((prefix_tags, wf.text, suffix_tags))
-                    for generated in strict_generator().lookup(analysis.smushed()):
-                        # Skip re-instantiating lemma
-                        if analysis == wf.analysis:
-                            continue
-
-                        Wordform.objects.create(
-                            # For now, leaving paradigm and linguist_info empty;
-                            # code can get that info from the lemma instead.
-                            text=generated,
-                            raw_analysis=analysis.tuple,
-                            lemma=wf,
-                            is_lemma=False,
-                        )
+                lemmas_to_instantiate.append(wf)
 
             if wf.raw_analysis is None:
                 self.index_unanalyzed_form(wf)
@@ -142,35 +199,136 @@ class Command(BaseCommand):
 
             self.create_definitions(wf, entry["senses"])
 
-            seen_slugs.add(wf.slug)
+        logger.info(
+            f"{len(changed_slugs):,} of {len(seen_slugs):,} entries changed"
+            " since the last import"
+        )
 
-        for entry in form_definitions:
-            try:
-                lemma = Wordform.objects.get(slug=entry["formOf"])
-            except Wordform.DoesNotExist:
-                raise Exception(
-                    f"Encountered wordform with formOf for unknown slug={entry['formOf']!r}"
+        # Before the form definitions, which may refer to instantiated forms
+        self.instantiate_paradigms(paradigm_manager, lemmas_to_instantiate)
+
+        for lemma_slug, entries in form_definitions.items():
+            # Already imported along with their unchanged lemma
+            if lemma_slug in seen_slugs and lemma_slug not in changed_slugs:
+                continue
+            # The lemma came from an earlier import, so these entries have no
+            # hash of their own; what is stored is compared against them below.
+            lemma_imported_earlier = lemma_slug not in seen_slugs
+
+            senses_by_form: dict[Wordform, list[dict]] = defaultdict(list)
+            for entry in entries:
+                try:
+                    lemma = Wordform.objects.get(slug=entry["formOf"])
+                except Wordform.DoesNotExist:
+                    raise Exception(
+                        f"Encountered wordform with formOf for unknown slug={entry['formOf']!r}"
+                    )
+
+                wf, created = Wordform.objects.get_or_create(
+                    lemma=lemma,
+                    text=entry["head"],
+                    smushed_analysis=smush_analysis(entry["analysis"]),
+                    defaults={"raw_analysis": entry["analysis"]},
                 )
+                senses_by_form[wf].extend(entry["senses"])
 
-            wf, created = Wordform.objects.get_or_create(
-                lemma=lemma, text=entry["head"], raw_analysis=entry["analysis"]
-            )
+            for wf, senses in senses_by_form.items():
+                if lemma_imported_earlier:
+                    if stored_senses(wf) == sense_keys(senses):
+                        continue
+                    wf.definitions.filter(auto_translation_source__isnull=True).delete()
+                    wf.target_language_keyword.all().delete()
+                    changed_slugs.add(lemma_slug)
 
-            self.create_definitions(wf, entry["senses"])
+                self.create_definitions(wf, senses)
 
+        purged_slugs = set()
         if purge:
-            rows, breakdown = Wordform.objects.filter(
-                slug__in=existing_slugs - seen_slugs
-            ).delete()
+            purged_slugs = existing_hashes.keys() - seen_slugs
+            rows, breakdown = Wordform.objects.filter(slug__in=purged_slugs).delete()
             if rows:
                 logger.warning(
                     f"Purged {rows:,} rows from database for existing entries not found in import file: %r",
                     breakdown,
                 )
-        call_command("builddefinitionvectors")
+
+        if not changed_slugs and not purged_slugs:
+            logger.info("Nothing changed; leaving vectors and indexes as they are")
+            return
+
+        # The later steps only redo the changed lemmas, unless most of them
+        # changed anyway, which is the case for the first import.
+        if incremental and len(changed_slugs) <= len(seen_slugs) // 2:
+            slugs = sorted(changed_slugs | purged_slugs)
+        else:
+            slugs = None
+
+        call_command("builddefinitionvectors", slugs=slugs)
 
         if settings.MORPHODICT_SUPPORTS_AUTO_DEFINITIONS:
-            call_command("translatewordforms")
+            call_command("translatewordforms", slugs=slugs)
+
+        call_command("buildlemmasnapshots", slugs=slugs)
+
+        # Tell running processes to throw away anything they’ve cached from the
+        # old lexicon.
+        bump_lexicon_generation()
+
+        # Index files are stamped with the new generation; until they are
+        # written, running processes fall back to querying the database.
+        # They are sorted files that can’t be patched in place, and writing
+        # them takes one pass over the table, so they are always rewritten.
+        call_command("buildsearchindexes")
+
+        for wf, entry_hash in pending_hashes:
+            wf.import_hash = entry_hash
+        Wordform.objects.bulk_update(
+            [wf for wf, _ in pending_hashes], ["import_hash"], batch_size=1000
+        )
+
+    def instantiate_paradigms(self, paradigm_manager, lemmas: list[Wordform]):
+        """Create a Wordform for every form in the paradigms of the lemmas
+
+        Generating forms one analysis at a time, and inserting them one row at
+        a time, is what used to make a full import take hours. Instead, all
+        the analyses are generated in batches, spread across processes, and
+        the forms are bulk-inserted.
+        """
+        to_generate = []
+        for lemma in lemmas:
+            for prefix_tags, suffix_tags in paradigm_manager.all_analysis_template_tags(
+                lemma.paradigm
+            ):
+                analysis = RichAnalysis((prefix_tags, lemma.text, suffix_tags))
+                # Skip re-instantiating lemma
+                if analysis == lemma.analysis:
+                    continue
+                to_generate.append((lemma, analysis))
+
+        generated = generate_forms(
+            {analysis.smushed() for _, analysis in to_generate},
+            jobs=self.jobs,
+            batch_size=self.generation_batch_size,
+        )
+
+        # Created after the lemmas, so that preassigned IDs come after theirs
+        wordform_buffer = InsertBuffer(manager=Wordform.objects, assign_id=True)
+        for lemma, analysis in to_generate:
+            smushed = analysis.smushed()
+            for text in generated.get(smushed, ()):
+                wordform_buffer.add(
+                    Wordform(
+                        # For now, leaving paradigm and linguist_info empty;
+                        # code can get that info from the lemma instead.
+                        text=text,
+                        raw_analysis=analysis.tuple,
+                        # bulk_create doesn’t call save(), which sets this
+                        smushed_analysis=smushed,
+                        lemma=lemma,
+                        is_lemma=False,
+                    )
+                )
+        wordform_buffer.save()
 
     def create_definitions(self, wordform, senses):
         keywords = set()
@@ -201,6 +359,92 @@ class Command(BaseCommand):
             SourceLanguageKeyword.objects.create(text=kw, wordform=wordform)
 
 
+def sense_keys(senses: list[dict]) -> list[tuple[str, list[str]]]:
+    """Return what create_definitions() would store for the senses, comparably"""
+    return sorted(
+        (sense["definition"], sorted(set(sense["sources"]))) for sense in senses
+    )
+
+
+def stored_senses(wordform: Wordform) -> list[tuple[str, list[str]]]:
+    """Return the sense_keys() of the imported definitions of the wordform"""
+    return sorted(
+        (definition.text, definition.source_ids)
+        for definition in wordform.definitions.filter(
+            auto_translation_source__isnull=True
+        ).prefetch_related("citations")
+    )
+
+
+def import_hash(entry: dict, form_entries: list[dict]) -> str:
+    """Return a hash of everything imported for a lemma
+
+    That is its importjson entry, and any formOf entries that refer to it.
+    Key order, and the order of the formOf entries, don’t matter.
+
+    >>> import_hash({"head": "a", "slug": "a"}, []) == import_hash(
+    ...     {"slug": "a", "head": "a"}, []
+    ... )
+    True
+    >>> import_hash({"head": "a", "slug": "a"}, []) == import_hash(
+    ...     {"head": "A", "slug": "a"}, []
+    ... )
+    False
+    """
+    canonical = json.dumps(
+        [
+            entry,
+            sorted(
+                json.dumps(e, sort_keys=True, ensure_ascii=False) for e in form_entries
+            ),
+        ],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("UTF-8")).hexdigest()
+
+
+def generate_forms(
+    analyses: Iterable[str], jobs: int, batch_size: int
+) -> dict[str, set[str]]:
+    """Run the strict generator FST over all the analyses
+
+    :return: the generated forms for each analysis, like
+        TransducerFile.bulk_lookup()
+    """
+    batches = list(batched(sorted(analyses), batch_size))
+    ret = {}
+
+    if jobs <= 1:
+        for batch in tqdm(batches, desc="Generating"):
+            ret.update(strict_generator().bulk_lookup(batch))
+        return ret
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=generator_pool.load_generator,
+        initargs=(str(FST_DIR / settings.STRICT_GENERATOR_FST_FILENAME),),
+    ) as executor:
+        for forms in tqdm(
+            executor.map(generator_pool.generate_batch, batches),
+            total=len(batches),
+            desc=f"Generating ({jobs} processes)",
+        ):
+            ret.update(forms)
+    return ret
+
+
+def batched(items: list, size: int) -> Iterator[list]:
+    """
+    >>> list(batched([1, 2, 3, 4, 5], 2))
+    [[1, 2], [3, 4], [5]]
+    >>> list(batched([], 2))
+    []
+    """
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
 def validate_slug_format(proposed_slug):
     """Raise an error if the proposed slug is invalid
 
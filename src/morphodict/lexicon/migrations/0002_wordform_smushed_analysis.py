@@ -0,0 +1,54 @@
+from django.db import migrations, models
+
+
+def smush_analysis(raw_analysis):
+    # A copy of what morphodict.lexicon.models.smush_analysis() did when this
+    # migration was written, so that changes to it don’t change this migration
+    prefix_tags, lemma, suffix_tags = raw_analysis
+    return "".join(prefix_tags) + lemma + "".join(suffix_tags)
+
+
+def populate_smushed_analysis(apps, schema_editor):
+    # Historical models don’t have the custom save() that normally fills this
+    # in, so do the same thing it does.
+    Wordform = apps.get_model("lexicon", "Wordform")
+
+    batch = []
+    for wordform in (
+        Wordform.objects.filter(raw_analysis__isnull=False)
+        .only("id", "raw_analysis")
+        .iterator()
+    ):
+        wordform.smushed_analysis = smush_analysis(wordform.raw_analysis)
+        batch.append(wordform)
+        if len(batch) >= 5000:
+            Wordform.objects.bulk_update(batch, ["smushed_analysis"])
+            batch = []
+    Wordform.objects.bulk_update(batch, ["smushed_analysis"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lexicon", "0001_initial_squashed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="wordform",
+            name="smushed_analysis",
+            field=models.CharField(
+                editable=False,
+                help_text="\n            The analysis as a single string, exactly as RichAnalysis.smushed()\n            returns it, e.g., “PV/e+nipâw+V+AI+Cnj+3Pl”. Set automatically from\n            raw_analysis on save. Look wordforms up by analysis using this\n            indexed field instead of by comparing JSON.\n        ",
+                max_length=200,
+                null=True,
+            ),
+        ),
+        migrations.RunPython(populate_smushed_analysis, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="wordform",
+            index=models.Index(
+                fields=["smushed_analysis"], name="lexicon_wor_smushed_bd2f65_idx"
+            ),
+        ),
+    ]
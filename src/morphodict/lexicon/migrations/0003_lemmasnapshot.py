@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+import morphodict.lexicon.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lexicon", "0002_wordform_smushed_analysis"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LemmaSnapshot",
+            fields=[
+                (
+                    "lemma",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="snapshot",
+                        serialize=False,
+                        to="lexicon.wordform",
+                    ),
+                ),
+                (
+                    "version",
+                    models.CharField(
+                        help_text="\n            Identifies the serialization code and label files that made this\n            snapshot. Snapshots made with different ones are ignored, and the\n            lemma is serialized on the fly instead, until the snapshots are\n            rebuilt.\n        ",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "serialized",
+                    models.JSONField(
+                        encoder=morphodict.lexicon.models.DiacriticPreservingJsonEncoder
+                    ),
+                ),
+            ],
+        ),
+    ]
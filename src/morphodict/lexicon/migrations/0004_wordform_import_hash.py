@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lexicon", "0003_lemmasnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="wordform",
+            name="import_hash",
+            field=models.CharField(
+                editable=False,
+                help_text="\n            For lemmas, a hash of the importjson entry this lemma was imported\n            from, along with any of its formOf entries. `importjsondict` skips\n            entries whose hash hasn’t changed.\n        ",
+                max_length=64,
+                null=True,
+            ),
+        ),
+    ]
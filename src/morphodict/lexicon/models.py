@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Dict, Literal, Union, Any
+from typing import Dict, Literal, Optional, Union, Any
 
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
@@ -19,6 +19,8 @@ from morphodict.analysis import RichAnalysis
 
 # How long a wordform or dictionary head can be. Not actually enforced in SQLite.
 MAX_WORDFORM_LENGTH = 60
+# How long a smushed analysis can be. Also not enforced in SQLite.
+MAX_ANALYSIS_LENGTH = 200
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +58,18 @@ class Wordform(models.Model):
 
     raw_analysis = models.JSONField(null=True, encoder=DiacriticPreservingJsonEncoder)
 
+    smushed_analysis = models.CharField(
+        max_length=MAX_ANALYSIS_LENGTH,
+        null=True,
+        editable=False,
+        help_text="""
+            The analysis as a single string, exactly as RichAnalysis.smushed()
+            returns it, e.g., “PV/e+nipâw+V+AI+Cnj+3Pl”. Set automatically from
+            raw_analysis on save. Look wordforms up by analysis using this
+            indexed field instead of by comparing JSON.
+        """,
+    )
+
     paradigm = models.CharField(
         max_length=MAX_WORDFORM_LENGTH,
         null=True,
@@ -106,6 +120,17 @@ class Wordform(models.Model):
         """,
     )
 
+    import_hash = models.CharField(
+        max_length=64,
+        null=True,
+        editable=False,
+        help_text="""
+            For lemmas, a hash of the importjson entry this lemma was imported
+            from, along with any of its formOf entries. `importjsondict` skips
+            entries whose hash hasn’t changed.
+        """,
+    )
+
     class Meta:
         indexes = [
             models.Index(fields=["text", "raw_analysis"]),
@@ -114,6 +139,8 @@ class Wordform(models.Model):
             #  - affix tree intialization
             #  - sitemap generation
             models.Index(fields=["is_lemma", "text"]),
+            # Used for looking up wordforms by FST analysis
+            models.Index(fields=["smushed_analysis"]),
         ]
 
     def __str__(self):
@@ -123,6 +150,10 @@ class Wordform(models.Model):
         cls_name = type(self).__name__
         return f"<{cls_name}: {self.text} {self.analysis}>"
 
+    def save(self, *args, **kwargs):
+        self.smushed_analysis = smush_analysis(self.raw_analysis)
+        super().save(*args, **kwargs)
+
     @property
     def analysis(self):
         if self.raw_analysis is None:
@@ -151,6 +182,20 @@ class Wordform(models.Model):
         return reverse("cree-dictionary-index-with-lemma", kwargs={"slug": self.slug})
 
 
+def smush_analysis(raw_analysis) -> Optional[str]:
+    """
+    Return the value of Wordform.smushed_analysis for the given raw_analysis
+
+    >>> smush_analysis([["PV/e+"], "nipâw", ["+V", "+AI", "+Cnj", "+3Pl"]])
+    'PV/e+nipâw+V+AI+Cnj+3Pl'
+    >>> smush_analysis(None) is None
+    True
+    """
+    if raw_analysis is None:
+        return None
+    return RichAnalysis(raw_analysis).smushed()
+
+
 class DictionarySource(models.Model):
     """
     Represents bibliographic information for a set of definitions.
@@ -238,6 +283,39 @@ class SourceLanguageKeyword(models.Model):
         indexes = [models.Index(fields=["text"])]
 
 
+class LemmaSnapshot(models.Model):
+    """
+    A lemma serialized ahead of time, exactly as serialize_wordform() in
+    CreeDictionary.API.search.presentation would serialize it.
+
+    Serializing a lemma takes its definitions, several relabellings and an
+    emoji, none of which change between imports, so `importjsondict` writes
+    them all here instead and presentation reads them back.
+    """
+
+    lemma = models.OneToOneField(
+        Wordform,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="snapshot",
+    )
+
+    version = models.CharField(
+        max_length=64,
+        help_text="""
+            Identifies the serialization code and label files that made this
+            snapshot. Snapshots made with different ones are ignored, and the
+            lemma is serialized on the fly instead, until the snapshots are
+            rebuilt.
+        """,
+    )
+
+    serialized = models.JSONField(encoder=DiacriticPreservingJsonEncoder)
+
+    def __repr__(self) -> str:
+        return f"<LemmaSnapshot of {self.lemma_id} ({self.version})>"
+
+
 class _WordformCache:
     @cached_property
     def MORPHEME_RANKINGS(self) -> Dict[str, float]:
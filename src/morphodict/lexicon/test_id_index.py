@@ -0,0 +1,140 @@
+import pytest
+
+from morphodict.lexicon.id_index import (
+    IdIndex,
+    IdIndexError,
+    StaleIdIndexError,
+    SubstringIndex,
+    write_id_index,
+    write_substring_index,
+)
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = tmp_path / "test.idx"
+    write_id_index(
+        path,
+        {"wolf": [7, 3, 3], "bear": [2], "âcimowin": [11, 5], "": [1]},
+        generation="abc",
+    )
+    return path
+
+
+def test_lookup(index_path):
+    index = IdIndex(index_path)
+
+    assert list(index.get("wolf")) == [3, 7]
+    assert list(index.get("bear")) == [2]
+    assert list(index.get("âcimowin")) == [5, 11]
+    assert list(index.get("")) == [1]
+    assert list(index.get("fox")) == []
+    assert list(index.get("wol")) == []
+    assert list(index.get("wolves")) == []
+
+    assert "bear" in index
+    assert "fox" not in index
+    assert len(index) == 4
+    assert list(index.keys()) == sorted(["wolf", "bear", "âcimowin", ""])
+
+
+def test_items_with_prefix(index_path):
+    index = IdIndex(index_path)
+
+    def keys_with_prefix(prefix):
+        return [key for key, _ in index.items_with_prefix(prefix)]
+
+    assert keys_with_prefix("wo") == ["wolf"]
+    assert keys_with_prefix("wolf") == ["wolf"]
+    assert keys_with_prefix("wolves") == []
+    assert keys_with_prefix("â") == ["âcimowin"]
+    assert keys_with_prefix("z") == []
+    assert keys_with_prefix("") == list(index.keys())
+    assert [list(ids) for _, ids in index.items_with_prefix("wol")] == [[3, 7]]
+
+
+def test_empty_index(tmp_path):
+    path = tmp_path / "empty.idx"
+    write_id_index(path, {}, generation="abc")
+
+    index = IdIndex(path)
+    assert len(index) == 0
+    assert list(index.get("wolf")) == []
+
+
+def test_generation_must_match(index_path):
+    assert IdIndex(index_path, expected_generation="abc").generation == "abc"
+    with pytest.raises(StaleIdIndexError):
+        IdIndex(index_path, expected_generation="def")
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not-an-index"
+    path.write_bytes(b"SQLite format 3\0" + b"\0" * 100)
+    with pytest.raises(IdIndexError):
+        IdIndex(path)
+
+    path.write_bytes(b"")
+    with pytest.raises(IdIndexError):
+        IdIndex(path)
+
+
+def test_best_ids_with_prefix(tmp_path):
+    path = tmp_path / "weighted.idx"
+    mapping = {f"word{i:03}": [i, i + 1000] for i in range(300)}
+    mapping["other"] = [5000]
+    weights = {i: (i * 37) % 101 for ids in mapping.values() for i in ids}
+    weights[5000] = 1000
+    write_id_index(path, mapping, generation="abc", weights=weights)
+    index = IdIndex(path)
+
+    def expected(prefix, k):
+        ids = {i for key, ids in mapping.items() if key.startswith(prefix) for i in ids}
+        return sorted(ids, key=lambda i: -weights[i])[:k]
+
+    for prefix in ["word", "word1", "word15", "word150", "", "o", "x"]:
+        for k in [0, 1, 5, 1000]:
+            best = index.best_ids_with_prefix(prefix, k)
+            assert [weights[i] for i in best] == [
+                weights[i] for i in expected(prefix, k)
+            ]
+            assert len(set(best)) == len(best)
+
+    assert index.best_ids_with_prefix("", 1) == [5000]
+
+
+def test_best_ids_needs_weights(index_path):
+    with pytest.raises(IdIndexError):
+        IdIndex(index_path).best_ids_with_prefix("wo", 3)
+
+
+def test_substring_index(tmp_path):
+    path = tmp_path / "substrings.idx"
+    mapping = {
+        "nipâw": [1],
+        "maci-nipâw": [3, 2],
+        "kinipâwin": [4],
+        "wâpamêw": [5],
+        "papapa": [6],
+        "": [7],
+    }
+    write_substring_index(path, mapping, generation="abc")
+    index = SubstringIndex(path, expected_generation="abc")
+
+    def keys_containing(substring):
+        return [key for key, _ in index.items_containing(substring)]
+
+    substrings = ["nip", "nipâ", "pâw", "âw", "p", "pa", "apa", "w", "x", "nipâwx"]
+    for substring in substrings:
+        assert keys_containing(substring) == sorted(
+            key for key in mapping if key and substring in key
+        )
+    assert dict((key, list(ids)) for key, ids in index.items_containing("maci")) == {
+        "maci-nipâw": [2, 3]
+    }
+    assert len(index) == 6
+
+    with pytest.raises(StaleIdIndexError):
+        SubstringIndex(path, expected_generation="def")
+    with pytest.raises(IdIndexError):
+        IdIndex(path)
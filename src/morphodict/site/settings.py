@@ -327,6 +327,51 @@ LOGGING = {
 
 # We only apply affix search for user queries longer than the threshold length
 AFFIX_SEARCH_THRESHOLD = 4
+# How many of the best prefix matches, and of the best suffix matches, affix
+# search returns; infix search returns this many of its shortest matches. Set
+# to 0 to return every match.
+AFFIX_SEARCH_MAX_RESULTS = env.int("AFFIX_SEARCH_MAX_RESULTS", default=50)
+# Whether to also search for lemmas and English keywords that contain the
+# query anywhere, not just at the start or end
+INFIX_SEARCH = env.bool("INFIX_SEARCH", default=False)
+
+# How many finished searches each process keeps in memory. The cache is cleared
+# whenever the lexicon is re-imported. Set to 0 to disable caching.
+SEARCH_RESULT_CACHE_SIZE = env.int("SEARCH_RESULT_CACHE_SIZE", default=1000)
+# How long a cached search may be served for, in seconds
+SEARCH_RESULT_CACHE_TTL_SECONDS = 60 * 60
+
+# How many relaxed analyses, strict analyses, and generated forms each process
+# remembers from the FSTs. Set to 0 to disable caching.
+FST_CACHE_SIZE = env.int("FST_CACHE_SIZE", default=10_000)
+
+# Whether to run the independent stages of a search (wordform and keyword
+# lookup, affix searches, CVD) at the same time in a thread pool, instead of
+# one after another. The results are the same either way.
+SEARCH_CONCURRENT_STAGES = env.bool("SEARCH_CONCURRENT_STAGES", default=False)
+# Size of the per-process thread pool for concurrent search stages
+SEARCH_STAGE_THREADS = 4
+
+# How many search results to show at once; the rest are a "more results" link
+# away, and are not prefetched or serialized until asked for.
+SEARCH_RESULTS_PAGE_SIZE = env.int("SEARCH_RESULTS_PAGE_SIZE", default=50)
+
+# Searches, or presentations of search results, that take at least this long
+# have their per-stage timings logged as warnings.
+SEARCH_SLOW_QUERY_SECONDS = env.float("SEARCH_SLOW_QUERY_SECONDS", default=0.5)
+
+# When nothing matches a query, lemmas within this get_modified_distance() of
+# it are suggested instead. Set to 0 to only suggest lemmas that differ in
+# unimportant ways, e.g., diacritics on ‘e’.
+FUZZY_SEARCH_MAX_DISTANCE = env.float("FUZZY_SEARCH_MAX_DISTANCE", default=2)
+# Only single-word queries up to this many characters get those suggestions.
+# The work grows with the square of the query length.
+FUZZY_SEARCH_MAX_QUERY_LENGTH = env.int("FUZZY_SEARCH_MAX_QUERY_LENGTH", default=30)
+# Whether the index for those suggestions includes inflected wordforms as well
+# as lemmas. This makes the index file many times larger.
+FUZZY_SEARCH_INCLUDE_INFLECTIONS = env.bool(
+    "FUZZY_SEARCH_INCLUDE_INFLECTIONS", default=False
+)
 
 # This defaults to False, because in order to work it requires that there
 # be correct tag mappings for all analyzable forms.